@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Solves many levels in parallel with the headless solver.
+
+Each level runs in its own worker process with its own state and time
+budget. Results are printed as soon as a level finishes, then written as
+a brute_force_results.md style table and a JSON file
+(level_data/batch_solve_results.md/.json by default).
+
+Usage:
+    python batch_solve.py                          # assets/levels/levels_27.json
+    python batch_solve.py --catalogue              # all 1557 levels from parsed_levels_complete.json
+    python batch_solve.py --jobs 16 --time-limit 60 --max-states 1000000
+    python batch_solve.py --catalogue --from 1 --to 200 --weight 3
+    python batch_solve.py --catalogue --strategy beam --beam-width 3000
+    python batch_solve.py --replay-log ../level_data/replays.cbjr   # keep solutions replayable by id
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+from replay_log import ReplayWriter, encode_solution
+from solver import (DEFAULT_BEAM_WIDTH, DEFAULT_LEVELS_PATH, DEFAULT_TABLE_MB, STRATEGIES, load_catalogue, load_levels,
+                    solve_one)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+# tools/brute_force_results.md holds the historical JS visualizer results and is not overwritten
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, 'level_data', 'batch_solve_results')
+
+
+def format_row(result):
+    if result['isSolvable']:
+        return (f"| {result['id']} | OK | {result['minMoves']} | {result['statesExplored']} | "
+                f"{result['searchTime']:.0f} | - |")
+    return (f"| {result['id']} | FAIL | - | {result['statesExplored']} | "
+            f"{result['searchTime']:.0f} | {result['error']} |")
+
+
+def write_markdown(path, results):
+    solved = sum(1 for r in results if r['isSolvable'])
+    lines = [
+        '# Brute-Force Analysis Results',
+        '',
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        '',
+        '| Level | Solvable | Min Moves | States | Time (ms) | Error |',
+        '|-------|----------|-----------|--------|-----------|-------|',
+    ]
+    lines += [format_row(r) for r in results]
+    lines += ['', f'**Summary:** {solved}/{len(results)} levels solvable', '']
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+
+def write_json(path, results, settings):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'settings': settings,
+            'solvable': sum(1 for r in results if r['isSolvable']),
+            'total': len(results),
+            'results': results,
+        }, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Solve levels in parallel')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--levels', help='Exported levels JSON (default: assets/levels/levels_27.json)')
+    source.add_argument('--catalogue', action='store_true', help='Use all levels from parsed_levels_complete.json')
+    parser.add_argument('--from', dest='first', type=int, default=1, help='First level id')
+    parser.add_argument('--to', dest='last', type=int, default=None, help='Last level id')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='astar',
+                        help='astar (default), ida (optimal, linear memory) or beam (deep levels)')
+    parser.add_argument('--max-states', type=int, default=1000000,
+                        help='State budget per level (0 = none, for ida/beam)')
+    parser.add_argument('--beam-width', type=int, default=DEFAULT_BEAM_WIDTH, help='States kept per beam layer')
+    parser.add_argument('--time-limit', type=float, default=60.0, help='Seconds per level')
+    parser.add_argument('--weight', type=float, default=1.0, help='Heuristic weight (1 = optimal)')
+    parser.add_argument('--table-mb', type=float, default=DEFAULT_TABLE_MB,
+                        help='Transposition table (and A* open list) memory ceiling per worker')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help='Output path without extension (.md and .json are written)')
+    parser.add_argument('--replay-log', help='Append every solution to this replay log (.cbjr)')
+    args = parser.parse_args()
+
+    levels = load_catalogue() if args.catalogue else load_levels(args.levels or DEFAULT_LEVELS_PATH)
+    levels = [lvl for lvl in levels
+              if lvl['id'] >= args.first and (args.last is None or lvl['id'] <= args.last)]
+    if not levels:
+        print('No levels selected.')
+        return 1
+
+    # Biggest levels first so a slow one does not start last
+    max_states = args.max_states or None
+    tasks = sorted(((lvl, args.strategy, max_states, args.time_limit, args.weight, args.table_mb, args.beam_width)
+                    for lvl in levels),
+                   key=lambda t: -len(t[0]['blocks']))
+
+    print(f'Solving {len(levels)} levels with {args.strategy} on {args.jobs} processes '
+          f'(max {max_states or "unlimited"} states, {args.time_limit:.0f}s per level, weight {args.weight})')
+    start = time.perf_counter()
+    results = []
+    by_id = {lvl['id']: lvl for lvl in levels}
+    writer = ReplayWriter(args.replay_log) if args.replay_log else None
+    with Pool(processes=args.jobs) as pool:
+        for result in pool.imap_unordered(solve_one, tasks):
+            results.append(result)
+            if writer and result['isSolvable']:
+                level = by_id[result['id']]
+                result['replayId'] = writer.append(level, encode_solution(level, result['solution']),
+                                                   'solver', won=True)
+            print(f'[{len(results)}/{len(levels)}] {format_row(result)}')
+            sys.stdout.flush()
+    if writer:
+        writer.close()
+
+    results.sort(key=lambda r: r['id'])
+    settings = {
+        'source': 'parsed_levels_complete.json' if args.catalogue else (args.levels or DEFAULT_LEVELS_PATH),
+        'strategy': args.strategy,
+        'maxStates': max_states,
+        'beamWidth': args.beam_width,
+        'timeLimit': args.time_limit,
+        'weight': args.weight,
+        'tableMB': args.table_mb,
+        'jobs': args.jobs,
+    }
+    write_markdown(args.output + '.md', results)
+    write_json(args.output + '.json', results, settings)
+
+    solved = sum(1 for r in results if r['isSolvable'])
+    print(f'\n{solved}/{len(results)} levels solvable in {time.perf_counter() - start:.1f}s')
+    print(f'Saved {args.output}.md and {args.output}.json')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
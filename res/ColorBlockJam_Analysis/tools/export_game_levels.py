@@ -1,10 +1,29 @@
 #!/usr/bin/env python3
-"""Exports levels to game-friendly JSON format with hardness and duration."""
+"""
+Exports levels to game-friendly JSON format with hardness and duration.
 
+Converted levels are cached in level_data/exported_levels_cache.json keyed
+by (GUID, hash of the parsed record + id + hardness, converter version), so
+only levels whose parsed record changed are converted again.
+
+Usage:
+    python export_game_levels.py                              # levels 1-27 -> assets/levels/levels_27.json
+    python export_game_levels.py --from 28 --to 100           # levels_28-100.json
+    python export_game_levels.py --from 1500                  # level 1500 to the end of the catalogue
+    python export_game_levels.py --all --shard-size 100       # whole catalogue in 100-level shards + manifest
+    python export_game_levels.py --all --shard-size 100 --format pack
+"""
+
+import argparse
 import json
+import math
 import os
+import sys
+from multiprocessing import Pool
 
-import math
+from level_cache import LevelCache, content_hash, source_version
+from level_pack import PackFormatError, write_pack
+from level_stream import iter_levels, parsed_levels_path, read_levels, write_levels
 
 def load_hardness_data(base_dir):
     """Load hardness and duration data from level_hardness.json."""
@@ -69,182 +88,345 @@ def get_door_edge(world_x, world_y, grid_width, grid_height, edge_info=None):
     else:
         return 'top' if world_y > 0 else 'bottom'
 
-def main():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    base_dir = os.path.dirname(script_dir)
-    
-    # Load data
-    with open(os.path.join(base_dir, 'level_data/parsed_levels_complete.json'), 'r', encoding='utf-8') as f:
-        levels_data = json.load(f)
-    
-    with open(os.path.join(base_dir, 'level_data/AllLevels_guids.json'), 'r', encoding='utf-8') as f:
-        guids_data = json.load(f)
-    
-    # Load hardness data
-    hardness_data = load_hardness_data(base_dir)
-    
-    guids = guids_data['level_guids']
-    guid_to_level = {level['guid']: level for level in levels_data}
-    
-    # Convert levels
-    game_levels = []
-    for i in range(27):
-        level = guid_to_level.get(guids[i])
-        if not level:
+def convert_level(level, level_id, hardness_data):
+    """Convert one parsed level (parsed_levels_complete.json) to the game format."""
+    grid_w = level['gridSize']['x']
+    grid_h = level['gridSize']['y']
+
+    # Use original grid height for world->grid conversion, then apply row offset
+    original_grid_h = level.get('originalGridHeight', grid_h)
+    removed_top_rows = level.get('removedTopRows', 0)
+
+    # Convert blocks - зберігаємо ЦЕНТР блоку (як у візуалізаторі)
+    has_hidden_cells = len(level.get('hiddenCoords', [])) > 0
+    blocks = []
+    for b in level['gameBlocks']:
+        # Use original grid height for world->grid conversion
+        center_row, center_col = world_to_grid(b['position']['x'], b['position']['y'], grid_w, original_grid_h)
+        rot_z = round(b.get('rotation', {}).get('z', 0) / 90) % 4
+        world_y = b['position']['y']
+
+        # Для L блоків (groupType=3) з rotZ=1 на високих гридах,
+        # коли row_calc закінчується на .5, використовуємо floor замість round
+        if b['blockGroupType'] == 3 and rot_z == 1 and original_grid_h >= 12:
+            offset_y = (original_grid_h - 1) / 2
+            row_calc = -world_y / 2.0 + offset_y
+            if row_calc % 1 == 0.5:
+                center_row = int(row_calc)  # floor
+
+        # Apply row offset for removed top rows
+        center_row -= removed_top_rows
+
+        # Прапорець для спеціальної обробки ShortL rotZ=2 в hidden levels
+        # Застосовується тільки якщо worldY < -2 (далеко від центру)
+        needs_row_offset = False
+        if b['blockGroupType'] == 5 and rot_z == 2:  # ShortL rotZ=2
+            if has_hidden_cells and world_y < -2:
+                needs_row_offset = True
+
+        blocks.append({
+            'blockType': b['blockType'],
+            'blockGroupType': b['blockGroupType'],
+            'gridRow': center_row,
+            'gridCol': center_col,
+            'rotationZ': rot_z,
+            'needsRowOffset': needs_row_offset,
+            'moveDirection': b.get('moveDirection', 2),  # 0=HORIZ, 1=VERT, 2=BOTH
+            'innerBlockType': b.get('innerBlockType', -1),  # -1 = no inner layer
+            'iceCount': b.get('iceCount', 0)  # 0 = not frozen, >0 = frozen for N exits
+        })
+
+    # Get edge column hidden info for this level (use original grid height for calculation)
+    edge_info = get_edge_column_hidden_info(level.get('hiddenCoords', []), grid_w, original_grid_h)
+
+    # Convert doors
+    doors = []
+    for d in level['doors']:
+        world_x = d['position']['x']
+        world_y = d['position']['y']
+
+        # Filter out doors that are too far from the grid bounds
+        # Normal side doors should be at approximately grid_w for right, -grid_w for left
+        # With some tolerance (1.5 units)
+        max_side_x = grid_w + 1.5
+        if abs(world_x) > max_side_x:
+            # Door is too far from the grid - skip it
             continue
-        
-        grid_w = level['gridSize']['x']
-        grid_h = level['gridSize']['y']
-        
-        # Use original grid height for world->grid conversion, then apply row offset
-        original_grid_h = level.get('originalGridHeight', grid_h)
-        removed_top_rows = level.get('removedTopRows', 0)
-        
-        # Convert blocks - зберігаємо ЦЕНТР блоку (як у візуалізаторі)
-        has_hidden_cells = len(level.get('hiddenCoords', [])) > 0
-        blocks = []
-        for b in level['gameBlocks']:
-            # Use original grid height for world->grid conversion
-            center_row, center_col = world_to_grid(b['position']['x'], b['position']['y'], grid_w, original_grid_h)
-            rot_z = round(b.get('rotation', {}).get('z', 0) / 90) % 4
-            world_y = b['position']['y']
-            
-            # Для L блоків (groupType=3) з rotZ=1 на високих гридах,
-            # коли row_calc закінчується на .5, використовуємо floor замість round
-            if b['blockGroupType'] == 3 and rot_z == 1 and original_grid_h >= 12:
-                offset_y = (original_grid_h - 1) / 2
-                row_calc = -world_y / 2.0 + offset_y
-                if row_calc % 1 == 0.5:
-                    center_row = int(row_calc)  # floor
-            
-            # Apply row offset for removed top rows
-            center_row -= removed_top_rows
-            
-            # Прапорець для спеціальної обробки ShortL rotZ=2 в hidden levels
-            # Застосовується тільки якщо worldY < -2 (далеко від центру)
-            needs_row_offset = False
-            if b['blockGroupType'] == 5 and rot_z == 2:  # ShortL rotZ=2
-                if has_hidden_cells and world_y < -2:
-                    needs_row_offset = True
-            
-            blocks.append({
-                'blockType': b['blockType'],
-                'blockGroupType': b['blockGroupType'],
-                'gridRow': center_row,
-                'gridCol': center_col,
-                'rotationZ': rot_z,
-                'needsRowOffset': needs_row_offset,
-                'moveDirection': b.get('moveDirection', 2),  # 0=HORIZ, 1=VERT, 2=BOTH
-                'innerBlockType': b.get('innerBlockType', -1),  # -1 = no inner layer
-                'iceCount': b.get('iceCount', 0)  # 0 = not frozen, >0 = frozen for N exits
-            })
-        
-        # Get edge column hidden info for this level (use original grid height for calculation)
-        edge_info = get_edge_column_hidden_info(level.get('hiddenCoords', []), grid_w, original_grid_h)
-        
-        # Convert doors
-        doors = []
-        for d in level['doors']:
-            world_x = d['position']['x']
-            world_y = d['position']['y']
-            
-            # Filter out doors that are too far from the grid bounds
-            # Normal side doors should be at approximately grid_w for right, -grid_w for left
-            # With some tolerance (1.5 units)
-            max_side_x = grid_w + 1.5
-            if abs(world_x) > max_side_x:
-                # Door is too far from the grid - skip it
-                continue
-            
-            edge = get_door_edge(world_x, world_y, grid_w, original_grid_h, edge_info)
-            row, col = world_to_grid(world_x, world_y, grid_w, original_grid_h)
-            parts = d['doorPartCount']
-            
-            # Adjust position for doors
-            if edge in ['left', 'right']:
-                col = 0 if edge == 'left' else grid_w - 1
-                offset_y = (original_grid_h - 1) / 2
-                if abs(world_y) < 0.5:
-                    row = (original_grid_h - parts) // 2
-                else:
-                    row_center = js_round(-world_y / 2.0 + offset_y)
-                    # Поріг залежить від offset_y - двері нижче центру позиціонуються інакше
-                    if world_y < -offset_y:
-                        row = row_center - (parts - 1) // 2
-                    else:
-                        row = row_center - parts // 2
-                row = max(0, min(row, original_grid_h - parts))
-                
-                # Apply row offset for removed top rows
-                row -= removed_top_rows
-                row = max(0, min(row, grid_h - parts))
-                
-                # Use inner boundary if edge columns are mostly hidden
-                if edge == 'left' and edge_info['leftHidden']:
-                    col = edge_info['leftCol']
-                elif edge == 'right' and edge_info['rightHidden']:
-                    col = edge_info['rightCol']
+
+        edge = get_door_edge(world_x, world_y, grid_w, original_grid_h, edge_info)
+        row, col = world_to_grid(world_x, world_y, grid_w, original_grid_h)
+        parts = d['doorPartCount']
+
+        # Adjust position for doors
+        if edge in ['left', 'right']:
+            col = 0 if edge == 'left' else grid_w - 1
+            offset_y = (original_grid_h - 1) / 2
+            if abs(world_y) < 0.5:
+                row = (original_grid_h - parts) // 2
             else:
-                # Для top/bottom дверей: row - це положення на межі (зовнішнє)
-                row = -1 if edge == 'top' else grid_h
-                if abs(world_x) < 0.5:
-                    col = (grid_w - parts) // 2
+                row_center = js_round(-world_y / 2.0 + offset_y)
+                # Поріг залежить від offset_y - двері нижче центру позиціонуються інакше
+                if world_y < -offset_y:
+                    row = row_center - (parts - 1) // 2
                 else:
-                    offset_x = (grid_w - 1) / 2
-                    col_center = js_round(world_x / 2.0 + offset_x)
-                    col = col_center - parts // 2
-                col = max(0, min(col, grid_w - parts))
-            
-            doors.append({
-                'blockType': d['blockType'],
-                'partCount': parts,
-                'edge': edge,
-                'startRow': int(row),
-                'startCol': int(col)
-            })
-        
-        # Convert hidden coords (use current grid_h since hiddenCoords already filtered)
-        hidden = []
-        for h in level.get('hiddenCoords', []):
-            hidden.append({
-                'row': grid_h - 1 - h['y'],  # grid_h is already adjusted
-                'col': h['x']
-            })
-        
-        # Get hardness and duration for this level
-        level_guid = guids[i]
-        hardness_info = hardness_data.get(level_guid, {})
-        duration = hardness_info.get('duration', 120)  # Default 2 minutes
-        hardness = hardness_info.get('hardness', 0)  # 0=Normal, 1=Hard, 2=VeryHard
-        
-        game_levels.append({
-            'id': i + 1,
-            'name': level['name'],
-            'gridWidth': grid_w,
-            'gridHeight': grid_h,
-            'blocks': blocks,
-            'doors': doors,
-            'hiddenCells': hidden,
-            'duration': duration,
-            'hardness': hardness
+                    row = row_center - parts // 2
+            row = max(0, min(row, original_grid_h - parts))
+
+            # Apply row offset for removed top rows
+            row -= removed_top_rows
+            row = max(0, min(row, grid_h - parts))
+
+            # Use inner boundary if edge columns are mostly hidden
+            if edge == 'left' and edge_info['leftHidden']:
+                col = edge_info['leftCol']
+            elif edge == 'right' and edge_info['rightHidden']:
+                col = edge_info['rightCol']
+        else:
+            # Для top/bottom дверей: row - це положення на межі (зовнішнє)
+            row = -1 if edge == 'top' else grid_h
+            if abs(world_x) < 0.5:
+                col = (grid_w - parts) // 2
+            else:
+                offset_x = (grid_w - 1) / 2
+                col_center = js_round(world_x / 2.0 + offset_x)
+                col = col_center - parts // 2
+            col = max(0, min(col, grid_w - parts))
+
+        doors.append({
+            'blockType': d['blockType'],
+            'partCount': parts,
+            'edge': edge,
+            'startRow': int(row),
+            'startCol': int(col)
         })
-    
-    # Save - go up 2 levels from ColorBlockJam_Analysis to project root
-    project_root = os.path.dirname(os.path.dirname(base_dir))
-    output_dir = os.path.join(project_root, 'assets', 'levels')
-    os.makedirs(output_dir, exist_ok=True)
-    
-    output_path = os.path.join(output_dir, 'levels_27.json')
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump({'levels': game_levels}, f, indent=2, ensure_ascii=False)
-    
-    print(f'Exported {len(game_levels)} levels to {output_path}')
+
+    # Convert hidden coords (use current grid_h since hiddenCoords already filtered)
+    hidden = []
+    for h in level.get('hiddenCoords', []):
+        hidden.append({
+            'row': grid_h - 1 - h['y'],  # grid_h is already adjusted
+            'col': h['x']
+        })
+
+    # Get hardness and duration for this level
+    hardness_info = hardness_data.get(level['guid'], {})
+    duration = hardness_info.get('duration', 120)  # Default 2 minutes
+    hardness = hardness_info.get('hardness', 0)  # 0=Normal, 1=Hard, 2=VeryHard
+
+    return {
+        'id': level_id,
+        'name': level['name'],
+        'gridWidth': grid_w,
+        'gridHeight': grid_h,
+        'blocks': blocks,
+        'doors': doors,
+        'hiddenCells': hidden,
+        'duration': duration,
+        'hardness': hardness
+    }
+
+def export_version():
+    """Changes whenever the conversion logic is edited (the whole module source)."""
+    return source_version(sys.modules[__name__])
+
+
+def select_levels(base_dir, first=1, last=None):
+    """
+    (game level id, parsed level) for ids first..last in AllLevels_guids order
+    (last=None: whole catalogue). Only the selected levels are read.
+    """
+    with open(os.path.join(base_dir, 'level_data/AllLevels_guids.json'), 'r', encoding='utf-8') as f:
+        guids = json.load(f)['level_guids']
+    last = len(guids) if last is None else min(last, len(guids))
+    wanted = guids[first - 1:last]
+    if not wanted:
+        return []
+    guid_to_level = read_levels(parsed_levels_path(base_dir), wanted)
+    return [(level_id, guid_to_level[guid]) for level_id, guid in enumerate(wanted, first)
+            if guid in guid_to_level]
+
+
+def convert_task(task):
+    """Worker entry point: (parsed level, id, hardness entries) -> game level."""
+    level, level_id, hardness_data = task
+    return convert_level(level, level_id, hardness_data)
+
+
+def convert_levels(selected, hardness_data, cache=None, jobs=1, chunk_size=32):
+    """
+    Yield converted levels in the order of `selected`.
+    Cache hits are reused; the rest is converted on a process pool when jobs > 1.
+    """
+    plan = []
+    tasks = []
+    for level_id, level in selected:
+        guid = level['guid']
+        digest = content_hash([level, level_id, hardness_data.get(guid)])
+        game_level = cache.get(guid, digest) if cache else LevelCache.MISSING
+        if game_level is LevelCache.MISSING:
+            # Workers only get the hardness entry they need
+            tasks.append((level, level_id, {guid: hardness_data[guid]} if guid in hardness_data else {}))
+        plan.append((guid, digest, game_level))
+
+    if jobs > 1 and len(tasks) > chunk_size:
+        pool = Pool(processes=jobs)
+        results = pool.imap(convert_task, tasks, chunksize=chunk_size)
+    else:
+        pool = None
+        results = map(convert_task, tasks)
+    try:
+        for guid, digest, game_level in plan:
+            if game_level is LevelCache.MISSING:
+                game_level = next(results)
+                if cache:
+                    cache.put(guid, digest, game_level)
+            yield game_level
+    finally:
+        if pool:
+            pool.terminate()
+
+
+def read_output(path):
+    """Levels of an existing output file, or None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        return list(iter_levels(path))
+    except (OSError, ValueError, PackFormatError):
+        return None
+
+
+def write_output(path, levels, fmt):
+    """Write one output file unless it already holds exactly these levels. Returns True if written."""
+    if read_output(path) == levels:
+        return False
+    if fmt == 'ndjson':
+        write_levels(path, levels)
+    elif fmt == 'pack':
+        write_pack(path, levels)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'levels': levels}, f, indent=2, ensure_ascii=False)
+    return True
+
+
+def iter_shards(levels, shard_size):
+    """Group a level stream into lists of shard_size (one list if shard_size is 0)."""
+    shard = []
+    for level in levels:
+        shard.append(level)
+        if shard_size and len(shard) == shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def catalogue_entry(game_level, guid, hardness_data, shard):
+    """Manifest entry of one level: what a level list needs without loading the level body."""
+    hardness_info = hardness_data.get(guid, {})
+    return {
+        'id': game_level['id'],
+        'guid': guid,
+        'name': game_level['name'],
+        'gridWidth': game_level['gridWidth'],
+        'gridHeight': game_level['gridHeight'],
+        'hardness': game_level['hardness'],
+        'hardnessType': hardness_info.get('hardnessType', 'Normal'),
+        'duration': game_level['duration'],
+        'shard': shard,
+    }
+
+
+def print_summary(game_levels):
     hardness_names = {0: 'Normal', 1: 'Hard', 2: 'VeryHard'}
     for lvl in game_levels:
         h_name = hardness_names.get(lvl['hardness'], 'Normal')
         h_marker = '[H]' if lvl['hardness'] == 1 else '[VH]' if lvl['hardness'] == 2 else '   '
         print(f"  {h_marker} Level {lvl['id']:2d}: {lvl['name'][:20]:20s} ({lvl['gridWidth']}x{lvl['gridHeight']}, {len(lvl['blocks'])} blocks, {lvl['duration']:3d}s {h_name})")
 
+
+def main():
+    parser = argparse.ArgumentParser(description='Export levels to the game format')
+    parser.add_argument('--from', dest='first', type=int, default=1, help='First game level id')
+    parser.add_argument('--to', dest='last', type=int, default=None,
+                        help='Last game level id (default: 27 without --from, else the last catalogue level)')
+    parser.add_argument('--all', action='store_true', help='Export the whole catalogue')
+    parser.add_argument('--shard-size', type=int, default=0,
+                        help='Levels per output file, with the levels_manifest.json catalogue (0: one file)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('--output-dir', help='Output directory (default: assets/levels)')
+    parser.add_argument('--no-cache', action='store_true', help='Convert every level again')
+    parser.add_argument('--format', choices=('json', 'ndjson', 'pack'), default='json',
+                        help='json: {"levels": [...]}; ndjson: one level per line + offset index; '
+                             'pack: binary pack (see level_pack.py)')
+    args = parser.parse_args()
+    if args.last is None and args.first == 1:
+        args.last = 27
+    if args.first < 1 or (args.last is not None and args.last < args.first):
+        parser.error(f'empty level range --from {args.first} --to {args.last}')
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    base_dir = os.path.dirname(script_dir)
+    # Go up 2 levels from ColorBlockJam_Analysis to project root
+    project_root = os.path.dirname(os.path.dirname(base_dir))
+    output_dir = args.output_dir or os.path.join(project_root, 'assets', 'levels')
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Load data
+    hardness_data = load_hardness_data(base_dir)
+    selected = select_levels(base_dir, args.first, None if args.all else args.last)
+    if not selected:
+        print(f'No levels selected: the catalogue has no levels from {args.first}.')
+        return 1
+    first_id, last_id = selected[0][0], selected[-1][0]
+
+    # Convert levels
+    cache = LevelCache(os.path.join(base_dir, 'level_data', 'exported_levels_cache.json'), export_version())
+    if args.no_cache:
+        cache.entries = {}
+    game_levels = convert_levels(selected, hardness_data, cache, args.jobs)
+
+    # Save
+    ext = args.format
+    shards = []
+    catalogue = []
+    guids = [level['guid'] for _, level in selected]
+    for shard in iter_shards(game_levels, args.shard_size):
+        if args.shard_size:
+            name = f"levels_{shard[0]['id']:04d}-{shard[-1]['id']:04d}.{ext}"
+        elif (first_id, last_id) == (1, 27):
+            name = f'levels_27.{ext}'
+        else:
+            name = f'levels_{first_id}-{last_id}.{ext}'
+        output_path = os.path.join(output_dir, name)
+        written = write_output(output_path, shard, args.format)
+        for lvl in shard:
+            catalogue.append(catalogue_entry(lvl, guids[len(catalogue)], hardness_data, len(shards)))
+        shards.append({'file': name, 'firstId': shard[0]['id'], 'lastId': shard[-1]['id'], 'count': len(shard)})
+        print(f"{'Wrote' if written else 'Unchanged'} {output_path} ({len(shard)} levels)")
+        if len(selected) <= 50:
+            print_summary(shard)
+    cache.save()
+    print(f'Converted {cache.misses} levels, {cache.hits} unchanged')
+
+    if args.shard_size:
+        manifest_path = os.path.join(output_dir, 'levels_manifest.json')
+        # Compact: the client reads it at every cold start
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': 1,
+                'format': args.format,
+                'shardSize': args.shard_size,
+                'levelCount': len(catalogue),
+                'firstId': first_id,
+                'lastId': last_id,
+                'shards': shards,
+                'levels': catalogue,
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        print(f'Manifest: {manifest_path} ({len(shards)} shards)')
+
+
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Per-level result cache shared by parse_from_unity.py and export_game_levels.py.
+
+Entries are stored per level GUID together with the hash of their input
+(raw MonoBehaviour bytes or a parsed record). The whole cache is tied to a
+logic version: the hash of the source of the functions that produce the
+results, so editing a heuristic invalidates it without a manual bump.
+Hashing the whole producing module is the safe default: a hand-picked list
+of functions silently misses constants and helpers added later.
+
+Usage:
+    cache = LevelCache(path, source_version(sys.modules[__name__]))
+    level = cache.get(guid, content_hash(raw))
+    if level is LevelCache.MISSING:
+        level = parse_level_data(raw)
+        cache.put(guid, content_hash(raw), level)
+    cache.save()
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from typing import Any
+
+
+def content_hash(value: Any) -> str:
+    """SHA-1 of raw bytes, or of the canonical JSON of a record."""
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        value = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.sha1(value).hexdigest()
+
+
+def source_version(*items: Any) -> str:
+    """Short hash of the source code of modules/functions/classes (and repr of plain values)."""
+    h = hashlib.sha1()
+    for item in items:
+        text = inspect.getsource(item) if callable(item) or inspect.ismodule(item) else repr(item)
+        h.update(text.encode('utf-8'))
+    return h.hexdigest()[:12]
+
+
+class LevelCache:
+    """JSON file of {guid: {'hash': input hash, 'value': result}} for one logic version."""
+
+    MISSING = object()
+
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == version:
+                self.entries = data.get('levels', {})
+
+    def get(self, guid: str, digest: str) -> Any:
+        """Cached value, or LevelCache.MISSING if absent or built from other input."""
+        entry = self.entries.get(guid)
+        if entry is not None and entry['hash'] == digest:
+            self.hits += 1
+            return entry['value']
+        self.misses += 1
+        return self.MISSING
+
+    def put(self, guid: str, digest: str, value: Any):
+        self.entries[guid] = {'hash': digest, 'value': value}
+        self.dirty = True
+
+    def retain(self, guids):
+        """Drop entries of levels that are no longer present."""
+        stale = set(self.entries) - set(guids)
+        for guid in stale:
+            del self.entries[guid]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        if not self.dirty:
+            return
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'levels': self.entries}, f, ensure_ascii=False)
+        self.dirty = False
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Lazy level catalogue over the sharded export (export_game_levels.py --shard-size).
+
+Mirrors what the game client does: at cold start only levels_manifest.json
+is read (ids, guids, grid size, hardness, duration, shard of every level),
+which is enough for the level list. A level body is loaded when the level
+is opened, from its shard; a few shards stay cached so playing levels in
+order hits memory. JSON shards are read whole, NDJSON shards seek through
+their offset index and pack shards through the pack index.
+
+Usage:
+    python level_catalogue.py                       # benchmark assets/levels/levels_manifest.json
+    python level_catalogue.py path/to/levels_manifest.json --repeat 20 --random 500
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+from level_pack import LevelPack
+from level_stream import index_path
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(SCRIPT_DIR)))
+DEFAULT_MANIFEST_PATH = os.path.join(PROJECT_ROOT, 'assets', 'levels', 'levels_manifest.json')
+
+
+class Shard:
+    """One loaded shard: level(id) without reading the other level bodies where the format allows."""
+
+    def __init__(self, path: str, fmt: str):
+        self.path = path
+        self.format = fmt
+        self._file = None
+        if fmt == 'pack':
+            self._pack = LevelPack(path)
+        elif fmt == 'ndjson':
+            with open(index_path(path), 'r', encoding='utf-8') as f:
+                self._index = {e['id']: (e['offset'], e['length']) for e in json.load(f)['levels']}
+            self._file = open(path, 'rb')
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._levels = {lvl['id']: lvl for lvl in data['levels']}
+
+    def level(self, level_id: int) -> Dict:
+        if self.format == 'pack':
+            return self._pack.level(level_id)
+        if self.format == 'ndjson':
+            offset, length = self._index[level_id]
+            self._file.seek(offset)
+            return json.loads(self._file.read(length))
+        return self._levels[level_id]
+
+    def close(self):
+        if self.format == 'pack':
+            self._pack.close()
+        elif self._file:
+            self._file.close()
+
+
+class LevelCatalogue:
+    """Manifest read eagerly, level bodies on demand with an LRU of open shards."""
+
+    def __init__(self, manifest_path: str = DEFAULT_MANIFEST_PATH, cached_shards: int = 2):
+        self.base_dir = os.path.dirname(os.path.abspath(manifest_path))
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.format = manifest['format']
+        self.shards = manifest['shards']
+        self.levels: List[Dict] = manifest['levels']
+        self._by_id = {entry['id']: entry for entry in self.levels}
+        self.cached_shards = max(1, cached_shards)
+        self._open: 'OrderedDict[int, Shard]' = OrderedDict()
+        self.shard_loads = 0
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def ids(self) -> List[int]:
+        return [entry['id'] for entry in self.levels]
+
+    def meta(self, level_id: int) -> Dict:
+        """Manifest entry (no level body). KeyError if the id is not in the catalogue."""
+        return self._by_id[level_id]
+
+    def level(self, level_id: int) -> Dict:
+        """Full level, loading its shard if it is not cached."""
+        return self._shard(self.meta(level_id)['shard']).level(level_id)
+
+    def _shard(self, index: int) -> Shard:
+        shard = self._open.get(index)
+        if shard is not None:
+            self._open.move_to_end(index)
+            return shard
+        shard = Shard(os.path.join(self.base_dir, self.shards[index]['file']), self.format)
+        self.shard_loads += 1
+        self._open[index] = shard
+        if len(self._open) > self.cached_shards:
+            _, evicted = self._open.popitem(last=False)
+            evicted.close()
+        return shard
+
+    def close(self):
+        for shard in self._open.values():
+            shard.close()
+        self._open.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _ms(samples: List[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (f'median {statistics.median(ordered) * 1000:8.3f} ms | p95 {p95 * 1000:8.3f} ms | '
+            f'max {ordered[-1] * 1000:8.3f} ms | n={len(ordered)}')
+
+
+def benchmark(manifest_path: str, repeat: int = 10, random_count: int = 200, seed: int = 0):
+    """Cold start, first level, sequential play and random access latencies."""
+    cold, first = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        catalogue = LevelCatalogue(manifest_path)
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        catalogue.level(catalogue.levels[0]['id'])
+        first.append(time.perf_counter() - start)
+        catalogue.close()
+
+    with LevelCatalogue(manifest_path) as catalogue:
+        sequential = []
+        for level_id in catalogue.ids():
+            start = time.perf_counter()
+            catalogue.level(level_id)
+            sequential.append(time.perf_counter() - start)
+        sequential_loads = catalogue.shard_loads
+
+    rng = random.Random(seed)
+    with LevelCatalogue(manifest_path) as catalogue:
+        ids = catalogue.ids()
+        random_access = []
+        for _ in range(random_count):
+            level_id = rng.choice(ids)
+            start = time.perf_counter()
+            catalogue.level(level_id)
+            random_access.append(time.perf_counter() - start)
+        random_loads = catalogue.shard_loads
+        count, fmt, shards = len(catalogue), catalogue.format, len(catalogue.shards)
+
+    print(f'Catalogue: {manifest_path} ({count} levels, {shards} {fmt} shards)')
+    print(f"  {'Cold start (manifest)':26s}{_ms(cold)}")
+    print(f"  {'First level (cold shard)':26s}{_ms(first)}")
+    print(f"  {'Sequential play':26s}{_ms(sequential)} | shard loads {sequential_loads}")
+    print(f"  {'Random access':26s}{_ms(random_access)} | shard loads {random_loads}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark lazy loading of a sharded level catalogue')
+    parser.add_argument('manifest', nargs='?', default=DEFAULT_MANIFEST_PATH, help='levels_manifest.json')
+    parser.add_argument('--repeat', type=int, default=10, help='Cold start repetitions')
+    parser.add_argument('--random', type=int, default=200, help='Random level opens')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.manifest):
+        print(f'No manifest at {args.manifest} (run export_game_levels.py --all --shard-size 100)')
+        return 1
+    benchmark(args.manifest, args.repeat, args.random, args.seed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
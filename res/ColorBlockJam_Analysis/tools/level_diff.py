@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Semantic diff of exported game levels (levels_27.json format).
+
+Every level is reduced to a canonical tuple: name and grid size plus the
+sorted tuples of its blocks, doors and hidden cells, so list order in the
+export does not matter. Catalogues are compared by the hash of that tuple
+first; only levels whose canonical form differs are diffed element by
+element. Elements present on both sides are matched as multisets, the rest
+is paired by the fewest differing fields (a moved block is one 'changed'
+block, not a removal plus an addition) and leftovers are reported as
+added / removed.
+
+duration and hardness come from level_hardness.json rather than the parser
+and are not part of the canonical form.
+
+Usage:
+    from level_diff import diff_catalogues, format_diff
+    for diff in diff_catalogues(reference_by_id, current_by_id):
+        print(format_diff(diff))
+"""
+
+import hashlib
+from collections import Counter
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+LEVEL_FIELDS = ('name', 'gridWidth', 'gridHeight')
+BLOCK_FIELDS = ('blockType', 'blockGroupType', 'gridRow', 'gridCol', 'rotationZ',
+                'needsRowOffset', 'moveDirection', 'innerBlockType', 'iceCount')
+DOOR_FIELDS = ('blockType', 'partCount', 'edge', 'startRow', 'startCol')
+HIDDEN_FIELDS = ('row', 'col')
+
+# kind -> (list key in the level, default fields)
+ELEMENTS = {
+    'block': ('blocks', BLOCK_FIELDS),
+    'door': ('doors', DOOR_FIELDS),
+    'hidden': ('hiddenCells', HIDDEN_FIELDS),
+}
+
+Diff = Dict
+
+
+def recorded_fields(levels: Iterable[Dict], kind: str) -> Tuple[str, ...]:
+    """
+    Default fields of an element kind that every element of the given levels has.
+    Lets an older snapshot (e.g. blocks without iceCount) be compared on what it recorded.
+    """
+    key, fields = ELEMENTS[kind]
+    present = set(fields)
+    for level in levels:
+        for element in level.get(key, ()):
+            present.intersection_update(element)
+    return tuple(f for f in fields if f in present)
+
+
+def _rows(elements: Sequence[Dict], fields: Sequence[str]) -> List[Tuple]:
+    if len(fields) > 1:
+        try:
+            return list(map(itemgetter(*fields), elements))
+        except KeyError:
+            pass
+    return [tuple(e.get(f) for f in fields) for e in elements]
+
+
+def _sorted(rows: List[Tuple]) -> Tuple:
+    try:
+        return tuple(sorted(rows))
+    except TypeError:  # None next to a value when some elements lack a field
+        return tuple(sorted(rows, key=repr))
+
+
+def canonical_level(level: Dict, fields: Optional[Dict[str, Sequence[str]]] = None) -> Tuple:
+    """Order-independent tuple of everything the parser produces for a level."""
+    fields = fields or {}
+    parts = [tuple(level.get(f) for f in LEVEL_FIELDS)]
+    for kind, (key, default) in ELEMENTS.items():
+        parts.append(_sorted(_rows(level.get(key, ()), fields.get(kind, default))))
+    return tuple(parts)
+
+
+def level_digest(level: Dict) -> str:
+    """Stable SHA-1 of the canonical form (same across runs, unlike hash())."""
+    return hashlib.sha1(repr(canonical_level(level)).encode('utf-8')).hexdigest()
+
+
+def _changed_fields(old: Tuple, new: Tuple, fields: Sequence[str]) -> Dict:
+    return {f: [a, b] for f, a, b in zip(fields, old, new) if a != b}
+
+
+def _diff_elements(level_id, kind: str, ref: Sequence[Dict], cur: Sequence[Dict],
+                   fields: Sequence[str]) -> List[Diff]:
+    ref_rows = _rows(ref, fields)
+    cur_rows = _rows(cur, fields)
+    common = Counter(ref_rows) & Counter(cur_rows)
+
+    def unmatched(rows):
+        left = Counter(common)
+        out = []
+        for index, row in enumerate(rows):
+            if left[row]:
+                left[row] -= 1
+            else:
+                out.append((index, row))
+        return out
+
+    removed = unmatched(ref_rows)
+    added = unmatched(cur_rows)
+
+    # Pair leftovers that agree on at least half of their fields, closest first
+    candidates = []
+    for i, (_, old) in enumerate(removed):
+        for j, (_, new) in enumerate(added):
+            distance = sum(a != b for a, b in zip(old, new))
+            if distance * 2 <= len(fields):
+                candidates.append((distance, i, j))
+    candidates.sort()
+
+    diffs = []
+    used_old, used_new = set(), set()
+    for _, i, j in candidates:
+        if i in used_old or j in used_new:
+            continue
+        used_old.add(i)
+        used_new.add(j)
+        (index, old), (_, new) = removed[i], added[j]
+        diffs.append({'level': level_id, 'kind': kind, 'change': 'changed', 'index': index + 1,
+                      'fields': _changed_fields(old, new, fields)})
+    for i, (index, old) in enumerate(removed):
+        if i not in used_old:
+            diffs.append({'level': level_id, 'kind': kind, 'change': 'removed', 'index': index + 1,
+                          'old': dict(zip(fields, old))})
+    for j, (index, new) in enumerate(added):
+        if j not in used_new:
+            diffs.append({'level': level_id, 'kind': kind, 'change': 'added', 'index': index + 1,
+                          'new': dict(zip(fields, new))})
+    diffs.sort(key=lambda d: d['index'])
+    return diffs
+
+
+def diff_levels(ref: Dict, cur: Dict, fields: Optional[Dict[str, Sequence[str]]] = None) -> List[Diff]:
+    """Structured differences between two versions of one level."""
+    fields = fields or {}
+    level_id = ref.get('id', cur.get('id'))
+    diffs = []
+    changed = _changed_fields(tuple(ref.get(f) for f in LEVEL_FIELDS),
+                              tuple(cur.get(f) for f in LEVEL_FIELDS), LEVEL_FIELDS)
+    if changed:
+        diffs.append({'level': level_id, 'kind': 'level', 'change': 'changed', 'fields': changed})
+    for kind, (key, default) in ELEMENTS.items():
+        diffs.extend(_diff_elements(level_id, kind, ref.get(key, ()), cur.get(key, ()),
+                                    fields.get(kind, default)))
+    return diffs
+
+
+def diff_catalogues(ref: Dict, cur: Dict, ids: Optional[Iterable] = None,
+                    fields: Optional[Dict[str, Sequence[str]]] = None) -> List[Diff]:
+    """
+    Differences between two {id: level} catalogues, over ids (default: all ids of ref).
+    Levels with equal canonical hashes are skipped without an element-wise diff.
+    """
+    diffs = []
+    for level_id in (sorted(ref) if ids is None else ids):
+        ref_level, cur_level = ref.get(level_id), cur.get(level_id)
+        if ref_level is None or cur_level is None:
+            diffs.append({'level': level_id, 'kind': 'level', 'change': 'missing',
+                          'side': 'reference' if ref_level is None else 'current'})
+            continue
+        ref_key, cur_key = canonical_level(ref_level, fields), canonical_level(cur_level, fields)
+        if hash(ref_key) == hash(cur_key) and ref_key == cur_key:
+            continue
+        diffs.extend(diff_levels(ref_level, cur_level, fields))
+    return diffs
+
+
+def _values(values: Dict) -> str:
+    return ', '.join(f'{k}={v}' for k, v in values.items())
+
+
+def format_diff(diff: Diff) -> str:
+    """One-line description, in the wording verify_levels.py always used."""
+    where = f"Level {diff['level']}"
+    if diff['change'] == 'missing':
+        return f"{where}: missing in {diff['side']}"
+    if diff['kind'] != 'level':
+        where += f", {diff['kind'].capitalize()} {diff['index']}"
+    if diff['change'] == 'removed':
+        return f"{where}: removed ({_values(diff['old'])})"
+    if diff['change'] == 'added':
+        return f"{where}: added ({_values(diff['new'])})"
+    return f"{where}: " + ', '.join(f'{k}: {a} -> {b}' for k, (a, b) in diff['fields'].items())
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Shared block geometry for exported levels (levels_27.json format).
+
+block_cells() is the Python port of getBlockCells() from the visualizers
+(same special cases as game_models.dart). GridGeometry precomputes the
+cell mask of every (blockGroupType, rotationZ, needsRowOffset) at every
+anchor of a grid once, so collision and door checks become int ANDs.
+
+Usage:
+    geometry = grid_geometry(level['gridWidth'], level['gridHeight'])
+    mask = geometry.block_mask(block)
+    if mask & geometry.hidden_mask(level): ...
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Block group type enum (same as parse_from_unity.py)
+BLOCK_GROUP_TYPES = {
+    0: 'One', 1: 'Two', 2: 'Three', 3: 'L', 4: 'ReverseL',
+    5: 'ShortL', 6: 'Plus', 7: 'TwoSquare', 8: 'ShortT',
+    9: 'Z', 10: 'ReverseZ', 11: 'U'
+}
+
+# Same offsets as SHAPES in brute_force_visualizer.html / game_models.dart
+# Each entry is [dx, dy] relative to the block anchor
+SHAPES = {
+    0: [[0, 0]],                                          # One
+    1: [[0, -1], [0, 0]],                                 # Two
+    2: [[0, -1], [0, 0], [0, 1]],                         # Three
+    3: [[0, -1], [0, 0], [0, 1], [1, 1]],                 # L
+    4: [[-1, -1], [0, -1], [-1, 0], [-1, 1]],             # ReverseL
+    5: [[-1, -1], [0, -1], [0, 0]],                       # ShortL
+    6: [[0, 0], [-1, 0], [1, 0], [0, -1], [0, 1]],        # Plus
+    7: [[-1, -1], [0, -1], [-1, 0], [0, 0]],              # TwoSquare
+    8: [[-1, 0], [0, 0], [1, 0], [0, 1]],                 # ShortT
+    9: [[0, 0], [1, 0], [1, 1], [2, 1]],                  # Z
+    10: [[1, 0], [2, 0], [0, 1], [1, 1]],                 # ReverseZ
+    11: [[0, 0], [2, 0], [0, 1], [1, 1], [2, 1]],         # U
+}
+
+# Shape offsets reach at most 3 cells from the anchor, so a padding of 3
+# lets a block step one cell past the grid edge without wrapping rows
+PAD = 3
+
+
+def block_cells(group_type: int, rotation: int, row: int, col: int,
+                grid_height: int, needs_row_offset: bool = False) -> List[Tuple[int, int]]:
+    """Return (row, col) cells of a block. Port of getBlockCells()."""
+    shape = SHAPES.get(group_type, [[0, 0]])
+    rot_z = (rotation or 0) % 4
+
+    rotated = [list(cell) for cell in shape]
+    for _ in range(rot_z):
+        rotated = [[-cell[1], cell[0]] for cell in rotated]
+
+    if group_type == 1:  # Two
+        if rot_z == 1:
+            col -= 1
+        elif rot_z == 2:
+            row -= 1
+    elif group_type == 3:  # L
+        if rot_z == 0:
+            rotated = [[0, -1], [1, -1], [1, 0], [1, 1]]
+            col -= 1
+        elif rot_z == 2:
+            rotated = [[0, -1], [0, 0], [0, 1], [1, 1]]
+            col -= 1
+    elif group_type == 4:  # ReverseL
+        rotated = {
+            0: [[-1, -1], [0, -1], [-1, 0], [-1, 1]],
+            1: [[-1, -1], [-1, 0], [0, 0], [1, 0]],
+            2: [[1, -1], [1, 0], [0, 1], [1, 1]],
+            3: [[-1, 0], [0, 0], [1, 0], [1, 1]],
+        }[rot_z]
+        if rot_z == 2:
+            col -= 1
+        elif rot_z == 3:
+            row -= 1
+    elif group_type == 5:  # ShortL
+        if rot_z == 0:
+            rotated = [[-1, -1], [0, -1], [0, 0]]
+        elif rot_z == 1:
+            rotated = [[0, 0], [1, 0], [0, 1]]
+            row -= 1
+            col -= 1
+        elif rot_z == 2:
+            rotated = [[0, 0], [0, 1], [1, 1]]
+            col -= 1
+            if needs_row_offset:
+                row -= 1
+            elif row <= 1 or row + 1 >= grid_height:
+                row -= 1
+        else:
+            rotated = [[-1, 0], [0, -1], [0, 0]]
+    elif group_type == 8:  # ShortT
+        rotated = {
+            0: [[-1, 0], [0, 0], [1, 0], [0, 1]],
+            1: [[0, -1], [0, 0], [1, 0], [0, 1]],
+            2: [[0, -1], [-1, 0], [0, 0], [1, 0]],
+            3: [[0, -1], [-1, 0], [0, 0], [0, 1]],
+        }[rot_z]
+        if rot_z == 0:
+            row -= 1
+        elif rot_z == 1:
+            col -= 1
+        elif rot_z == 2 and row < grid_height / 2 - 0.5:
+            # Offset only for blocks in the upper half of the grid
+            row += 1
+
+    return [(row + dy, col + dx) for dx, dy in rotated]
+
+
+class GridGeometry:
+    """
+    Precomputed cell masks for one grid size.
+
+    Cells and anchors share one index space: (row + PAD) * stride + col + PAD.
+    Masks are ints with one bit per padded cell.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.stride = width + 2 * PAD
+        self.rows = height + 2 * PAD
+        self.size = self.stride * self.rows
+
+        self.inside = 0
+        for r in range(height):
+            for c in range(width):
+                self.inside |= self.bit(r, c)
+        self.outside = ((1 << self.size) - 1) & ~self.inside
+        self._tables: Dict[Tuple[int, int, bool], List[Optional[int]]] = {}
+
+    def bit(self, row: int, col: int) -> int:
+        return 1 << ((row + PAD) * self.stride + col + PAD)
+
+    def anchor(self, row: int, col: int) -> int:
+        """Encode a (gridRow, gridCol) anchor as a single int."""
+        return (row + PAD) * self.stride + col + PAD
+
+    def anchor_row_col(self, anchor: int) -> Tuple[int, int]:
+        return anchor // self.stride - PAD, anchor % self.stride - PAD
+
+    def table(self, group_type: int, rotation: int, needs_row_offset: bool = False) -> List[Optional[int]]:
+        """
+        Mask of one shape at every anchor, indexed by anchor.
+        None where part of the shape falls outside the padded board.
+        """
+        key = (group_type, (rotation or 0) % 4, bool(needs_row_offset))
+        table = self._tables.get(key)
+        if table is None:
+            table = []
+            for anchor in range(self.size):
+                row, col = self.anchor_row_col(anchor)
+                m = 0
+                for r, c in block_cells(key[0], key[1], row, col, self.height, key[2]):
+                    if not (-PAD <= r < self.height + PAD and -PAD <= c < self.width + PAD):
+                        m = None
+                        break
+                    m |= self.bit(r, c)
+                table.append(m)
+            self._tables[key] = table
+        return table
+
+    def block_table(self, block: Dict) -> List[Optional[int]]:
+        return self.table(block['blockGroupType'], block.get('rotationZ', 0), block.get('needsRowOffset', False))
+
+    def block_mask(self, block: Dict, row: Optional[int] = None, col: Optional[int] = None) -> Optional[int]:
+        """Mask of a block at its own position, or at (row, col) if given."""
+        row = block['gridRow'] if row is None else row
+        col = block['gridCol'] if col is None else col
+        if not (-PAD <= row < self.height + PAD and -PAD <= col < self.width + PAD):
+            return None
+        return self.block_table(block)[self.anchor(row, col)]
+
+    def hidden_mask(self, level: Dict) -> int:
+        m = 0
+        for h in level.get('hiddenCells', []):
+            m |= self.bit(h['row'], h['col'])
+        return m
+
+    def door_cells_mask(self, door: Dict) -> int:
+        """
+        Cells a block of the door's color enters when passing the door. Port of getDoorCells().
+        Left and right doors sit next to startCol, which may be an inner column (level 19).
+        """
+        m = 0
+        for i in range(door['partCount']):
+            if door['edge'] == 'left':
+                m |= self.bit(door['startRow'] + i, door['startCol'] - 1)
+            elif door['edge'] == 'right':
+                m |= self.bit(door['startRow'] + i, door['startCol'] + 1)
+            else:
+                m |= self.bit(door['startRow'], door['startCol'] + i)
+        return m
+
+    def door_band(self, door: Dict) -> int:
+        """
+        All board cells in the rows (left/right) or columns (top/bottom) a door spans.
+        A block is aligned with the door when mask & ~band == 0.
+        """
+        m = 0
+        if door['edge'] in ('left', 'right'):
+            first, limit = door['startRow'], self.height + PAD
+        else:
+            first, limit = door['startCol'], self.width + PAD
+        for k in range(max(first, -PAD), min(first + door['partCount'], limit)):
+            if door['edge'] in ('left', 'right'):
+                for c in range(-PAD, self.width + PAD):
+                    m |= self.bit(k, c)
+            else:
+                for r in range(-PAD, self.height + PAD):
+                    m |= self.bit(r, k)
+        return m
+
+    def mask_cells(self, mask: int) -> List[Tuple[int, int]]:
+        """Decode a mask back to (row, col) cells."""
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(self.anchor_row_col(low.bit_length() - 1))
+            mask ^= low
+        return cells
+
+
+@lru_cache(maxsize=None)
+def grid_geometry(width: int, height: int) -> GridGeometry:
+    """Shared GridGeometry per grid size (levels of the same size reuse the tables)."""
+    return GridGeometry(width, height)
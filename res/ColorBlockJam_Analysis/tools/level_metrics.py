@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Difficulty metrics for many levels in parallel, for balancing.
+
+For every level the full move graph is enumerated (solver.graph) and the
+following is reported next to the game's own hardness and duration:
+
+    branchingFactor  average number of legal moves per state
+    solutions        distinct move sequences of at most k moves that solve the level
+                     (k = optimal move count unless --k is given)
+    deadEndRatio     share of reachable states from which the level can't be solved
+    forcedMoves      moves on an optimal line where only one move stays optimal
+    exitReady        blocks that can leave the board with the first move
+
+Levels whose graph exceeds --max-states ("complete": false; with the default
+budget every level of levels_27 except 1-5, 10 and 25) get estimates instead
+("method": "estimate"): minMoves from the solver (A*, or beam search when A*
+runs out of states - see "strategy"; beam lengths are not proven optimal),
+branchingFactor and deadEndRatio from --walks random walks (the dead-end
+ratio only counts provably dead states, a lower bound). solutions and
+forcedMoves need the whole graph and stay empty; --walks 0 skips the
+estimates. --exits-first prunes the graph like the A* search (a possible exit
+is the only move): it keeps minMoves exact and also completes level 7, but
+solutions, deadEndRatio, forcedMoves and branchingFactor then count the
+pruned graph.
+
+Results are written to level_data/level_metrics.json and .csv, next to
+level_hardness.json.
+
+Usage:
+    python level_metrics.py                        # assets/levels/levels_27.json
+    python level_metrics.py --catalogue --jobs 16  # all 1557 levels
+    python level_metrics.py --k 12 --max-states 500000
+    python level_metrics.py --exits-first
+    python level_metrics.py --walks 0              # graph metrics only, no estimates
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+from solver import (DEFAULT_GRAPH_STATES, DEFAULT_LEVELS_PATH, DEFAULT_WALKS, level_metrics, load_catalogue,
+                    load_levels)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, 'level_data', 'level_metrics')
+
+COLUMNS = ('id', 'name', 'hardness', 'duration', 'blocks', 'complete', 'method', 'strategy', 'exitsFirst', 'states',
+           'branchingFactor', 'exitReady', 'minMoves', 'k', 'solutions', 'deadEndRatio', 'forcedMoves', 'error')
+
+
+def metrics_one(task):
+    """Worker entry point: metrics of one level."""
+    level, k, max_states, exits_first, walks, seed = task
+    try:
+        result = level_metrics(level, k=k, max_states=max_states, exits_first=exits_first,
+                               walks=walks, seed=seed)
+    except Exception as e:
+        result = {'id': level['id'], 'complete': False, 'error': f'Crash: {e}'}
+    result['name'] = level['name']
+    result['hardness'] = level.get('hardness')
+    result['duration'] = level.get('duration')
+    return {column: result.get(column) for column in COLUMNS}
+
+
+def write_csv(path, results):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def write_json(path, results, settings):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'settings': settings,
+            'levels': results,
+        }, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compute level difficulty metrics in parallel')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--levels', help='Exported levels JSON (default: assets/levels/levels_27.json)')
+    source.add_argument('--catalogue', action='store_true', help='Use all levels from parsed_levels_complete.json')
+    parser.add_argument('--from', dest='first', type=int, default=1, help='First level id')
+    parser.add_argument('--to', dest='last', type=int, default=None, help='Last level id')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('--k', type=int, default=None,
+                        help='Count solutions of at most k moves (default: the optimal move count)')
+    parser.add_argument('--max-states', type=int, default=DEFAULT_GRAPH_STATES,
+                        help='State graph budget per level')
+    parser.add_argument('--exits-first', action='store_true',
+                        help='Prune the graph like the solver: a possible exit is the only move')
+    parser.add_argument('--walks', type=int, default=DEFAULT_WALKS,
+                        help='Random walks per level for the estimates of levels whose graph does not fit '
+                             '(0: no estimates)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the random walks')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help='Output path without extension (.json and .csv are written)')
+    args = parser.parse_args()
+
+    levels = load_catalogue() if args.catalogue else load_levels(args.levels or DEFAULT_LEVELS_PATH)
+    levels = [lvl for lvl in levels
+              if lvl['id'] >= args.first and (args.last is None or lvl['id'] <= args.last)]
+    if not levels:
+        print('No levels selected.')
+        return 1
+
+    # Biggest levels first so a slow one does not start last
+    tasks = sorted(((lvl, args.k, args.max_states, args.exits_first, args.walks, args.seed) for lvl in levels),
+                   key=lambda t: -len(t[0]['blocks']))
+
+    print(f'Analysing {len(levels)} levels on {args.jobs} processes (max {args.max_states} states)')
+    start = time.perf_counter()
+    results = []
+    with Pool(processes=args.jobs) as pool:
+        for result in pool.imap_unordered(metrics_one, tasks):
+            results.append(result)
+            status = 'full' if result['complete'] else result['method'] or 'partial'
+            print(f"[{len(results)}/{len(levels)}] Level {result['id']}: {status}, "
+                  f"moves {result['minMoves']} ({result['strategy']}), "
+                  f"branching {result['branchingFactor']}, dead ends {result['deadEndRatio']}, "
+                  f"solutions {result['solutions']}, forced {result['forcedMoves']}, "
+                  f"exit-ready {result['exitReady']}")
+            sys.stdout.flush()
+
+    results.sort(key=lambda r: r['id'])
+    settings = {
+        'source': 'parsed_levels_complete.json' if args.catalogue else (args.levels or DEFAULT_LEVELS_PATH),
+        'k': args.k,
+        'maxStates': args.max_states,
+        'exitsFirst': args.exits_first,
+        'walks': args.walks,
+        'seed': args.seed,
+    }
+    write_json(args.output + '.json', results, settings)
+    write_csv(args.output + '.csv', results)
+
+    complete = sum(1 for r in results if r['complete'])
+    estimated = sum(1 for r in results if r['method'] == 'estimate')
+    print(f'\n{complete}/{len(results)} levels fully analysed, {estimated} estimated, '
+          f'in {time.perf_counter() - start:.1f}s')
+    print(f'Saved {args.output}.json and {args.output}.csv')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Compact binary level pack for exported game levels (levels_27.json format).
+
+Layout (little-endian):
+    header   magic 'CBJP', version u16, level count u16
+    index    per level: id u16, offset u32, length u32 (offsets from file start)
+    records  per level:
+             id u16, gridWidth u8, gridHeight u8, duration u16, hardness u8,
+             name length u8, block count u8, door count u8, hidden count u8,
+             name (UTF-8), then fixed-width records:
+             block  8 B: gridRow i8, gridCol i8, blockType u8, blockGroupType u8,
+                         rotationZ u8, flags u8 (bit 0 needsRowOffset, bits 1-2 moveDirection),
+                         innerBlockType i8, iceCount u8
+             door   5 B: edge u8, blockType u8, partCount u8, startRow i8, startCol i8
+             hidden 2 B: row i8, col i8
+
+Level N is one seek + one read through the index. read_pack() returns the
+same dicts (same key order) as the JSON export.
+
+Usage:
+    python level_pack.py                                 # assets/levels/levels_27.json -> levels_27.pack
+    python level_pack.py path/to/levels.json --output levels.pack
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List
+
+MAGIC = b'CBJP'
+PACK_VERSION = 2  # 2: level ids in the index are u16, like in the records
+
+HEADER = struct.Struct('<4sHH')
+INDEX_ENTRY = struct.Struct('<HII')
+LEVEL = struct.Struct('<HBBHBBBBB')
+BLOCK = struct.Struct('<bbBBBBbB')
+DOOR = struct.Struct('<BBBbb')
+HIDDEN = struct.Struct('<bb')
+
+MAX_LEVEL_ID = 0xFFFF
+
+EDGES = ('top', 'bottom', 'left', 'right')
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(SCRIPT_DIR)))
+DEFAULT_LEVELS_PATH = os.path.join(PROJECT_ROOT, 'assets', 'levels', 'levels_27.json')
+
+
+class PackFormatError(Exception):
+    """File is not a level pack or has an unsupported version."""
+
+
+def encode_level(level: Dict) -> bytes:
+    """One level record. The id is u16 both here and in the index."""
+    if not 0 <= level['id'] <= MAX_LEVEL_ID:
+        raise ValueError(f"Level id {level['id']} does not fit the pack format (u16)")
+    name = level['name'].encode('utf-8')
+    try:
+        parts = [LEVEL.pack(level['id'], level['gridWidth'], level['gridHeight'], level['duration'],
+                            level['hardness'], len(name), len(level['blocks']), len(level['doors']),
+                            len(level['hiddenCells'])),
+                 name]
+        for b in level['blocks']:
+            flags = int(bool(b['needsRowOffset'])) | (b['moveDirection'] << 1)
+            parts.append(BLOCK.pack(b['gridRow'], b['gridCol'], b['blockType'], b['blockGroupType'],
+                                    b['rotationZ'], flags, b['innerBlockType'], b['iceCount']))
+        for d in level['doors']:
+            parts.append(DOOR.pack(EDGES.index(d['edge']), d['blockType'], d['partCount'],
+                                   d['startRow'], d['startCol']))
+        for h in level['hiddenCells']:
+            parts.append(HIDDEN.pack(h['row'], h['col']))
+    except struct.error as e:
+        raise ValueError(f"Level {level['id']} does not fit the pack format: {e}")
+    return b''.join(parts)
+
+
+def decode_level(data: bytes) -> Dict:
+    """Inverse of encode_level()."""
+    (level_id, grid_w, grid_h, duration, hardness,
+     name_len, block_count, door_count, hidden_count) = LEVEL.unpack_from(data, 0)
+    offset = LEVEL.size
+    name = data[offset:offset + name_len].decode('utf-8')
+    offset += name_len
+
+    blocks = []
+    for row, col, block_type, group_type, rot_z, flags, inner, ice in BLOCK.iter_unpack(
+            data[offset:offset + block_count * BLOCK.size]):
+        blocks.append({
+            'blockType': block_type,
+            'blockGroupType': group_type,
+            'gridRow': row,
+            'gridCol': col,
+            'rotationZ': rot_z,
+            'needsRowOffset': bool(flags & 1),
+            'moveDirection': flags >> 1,
+            'innerBlockType': inner,
+            'iceCount': ice
+        })
+    offset += block_count * BLOCK.size
+
+    doors = []
+    for edge, block_type, parts, start_row, start_col in DOOR.iter_unpack(
+            data[offset:offset + door_count * DOOR.size]):
+        doors.append({
+            'blockType': block_type,
+            'partCount': parts,
+            'edge': EDGES[edge],
+            'startRow': start_row,
+            'startCol': start_col
+        })
+    offset += door_count * DOOR.size
+
+    hidden = [{'row': row, 'col': col}
+              for row, col in HIDDEN.iter_unpack(data[offset:offset + hidden_count * HIDDEN.size])]
+
+    return {
+        'id': level_id,
+        'name': name,
+        'gridWidth': grid_w,
+        'gridHeight': grid_h,
+        'blocks': blocks,
+        'doors': doors,
+        'hiddenCells': hidden,
+        'duration': duration,
+        'hardness': hardness
+    }
+
+
+def write_pack(path: str, levels: Iterable[Dict]) -> int:
+    """Write levels to a pack file. Returns the file size in bytes."""
+    records = [(level['id'], encode_level(level)) for level in levels]
+    offset = HEADER.size + INDEX_ENTRY.size * len(records)
+    index = []
+    for level_id, record in records:
+        index.append(INDEX_ENTRY.pack(level_id, offset, len(record)))
+        offset += len(record)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, PACK_VERSION, len(records)))
+        f.write(b''.join(index))
+        f.write(b''.join(record for _, record in records))
+    return offset
+
+
+class LevelPack:
+    """Random access to a pack: the header and index are read once, levels on demand."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        magic, version, count = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            self._file.close()
+            raise PackFormatError(f'{path} is not a level pack')
+        if version != PACK_VERSION:
+            self._file.close()
+            raise PackFormatError(f'{path}: pack version {version}, expected {PACK_VERSION}')
+        self.version = version
+        self.index = {}
+        self.ids: List[int] = []
+        for level_id, offset, length in INDEX_ENTRY.iter_unpack(self._file.read(INDEX_ENTRY.size * count)):
+            self.index[level_id] = (offset, length)
+            self.ids.append(level_id)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for level_id in self.ids:
+            yield self.level(level_id)
+
+    def level(self, level_id: int) -> Dict:
+        """Level by id (KeyError if it is not in the pack)."""
+        offset, length = self.index[level_id]
+        self._file.seek(offset)
+        return decode_level(self._file.read(length))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_pack(path: str) -> List[Dict]:
+    with LevelPack(path) as pack:
+        return list(pack)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a binary level pack and check it round-trips')
+    parser.add_argument('levels', nargs='?', default=DEFAULT_LEVELS_PATH, help='Exported levels JSON')
+    parser.add_argument('--output', help='Pack path (default: same name with .pack)')
+    args = parser.parse_args()
+
+    with open(args.levels, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    levels = data['levels'] if isinstance(data, dict) else data
+    output = args.output or os.path.splitext(args.levels)[0] + '.pack'
+
+    size = write_pack(output, levels)
+    if read_pack(output) != levels:
+        print(f'[FAIL] {output} does not round-trip')
+        return 1
+    json_size = os.path.getsize(args.levels)
+    print(f'[OK] {len(levels)} levels, {size} bytes ({json_size} bytes as JSON): {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Streaming level files: NDJSON (one compact level per line) with an offset index.
+
+write_levels() writes levels one at a time, either as NDJSON or as the usual
+indent=2 JSON array (byte-identical to json.dump(levels, f, indent=2)).
+Next to an NDJSON file it writes <name>.index.json with the byte offset and
+length of every line, so read_level() can seek straight to one level by
+guid, name or id instead of loading the whole catalogue.
+
+Usage:
+    from level_stream import iter_levels, read_level
+    for level in iter_levels('level_data/parsed_levels_complete.ndjson'):
+        ...
+    level = read_level('level_data/parsed_levels_complete.ndjson', 'Level 18')
+"""
+
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+LevelKey = Union[str, int]
+
+
+def parsed_levels_path(base_dir: str) -> str:
+    """level_data/parsed_levels_complete.ndjson if it was generated, else the .json file."""
+    stem = os.path.join(base_dir, 'level_data', 'parsed_levels_complete')
+    return stem + '.ndjson' if os.path.exists(stem + '.ndjson') else stem + '.json'
+
+
+def index_path(path: str) -> str:
+    """Offset index of an NDJSON file: levels.ndjson -> levels.index.json."""
+    return os.path.splitext(path)[0] + '.index.json'
+
+
+def is_ndjson(path: str) -> bool:
+    return path.endswith(('.ndjson', '.jsonl'))
+
+
+def _index_entry(level: Dict, offset: int, length: int) -> Dict:
+    entry = {key: level[key] for key in ('id', 'name', 'guid') if key in level}
+    entry['offset'] = offset
+    entry['length'] = length
+    return entry
+
+
+def write_levels(path: str, levels: Iterable[Dict]) -> int:
+    """
+    Write levels as they arrive. NDJSON (by extension) also gets an offset index;
+    anything else is written as an indent=2 JSON array. Returns the level count.
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        if is_ndjson(path):
+            index = []
+            for level in levels:
+                line = json.dumps(level, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+                index.append(_index_entry(level, f.tell(), len(line)))
+                f.write(line)
+                count += 1
+            with open(index_path(path), 'w', encoding='utf-8') as idx:
+                json.dump({'source': os.path.basename(path), 'levels': index}, idx, ensure_ascii=False)
+        else:
+            for level in levels:
+                item = json.dumps(level, indent=2, ensure_ascii=False).replace('\n', '\n  ')
+                f.write((',\n  ' if count else '[\n  ').encode('utf-8') + item.encode('utf-8'))
+                count += 1
+            f.write(b'\n]' if count else b'[]')
+    return count
+
+
+def iter_levels(path: str) -> Iterator[Dict]:
+    """Yield levels one by one from NDJSON, a level pack, or a JSON list / {'levels': [...]} file."""
+    if path.endswith('.pack'):
+        from level_pack import LevelPack
+        with LevelPack(path) as pack:
+            yield from pack
+        return
+    if is_ndjson(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    yield from data['levels'] if isinstance(data, dict) else data
+
+
+def load_index(path: str) -> Optional[List[Dict]]:
+    """Offset index entries of an NDJSON file, or None if there is none."""
+    idx = index_path(path)
+    if not is_ndjson(path) or not os.path.exists(idx):
+        return None
+    with open(idx, 'r', encoding='utf-8') as f:
+        return json.load(f)['levels']
+
+
+def _matches(entry: Dict, key: LevelKey) -> bool:
+    if isinstance(key, int):
+        return entry.get('id') == key
+    return key in (entry.get('guid'), entry.get('name'))
+
+
+def read_levels(path: str, keys: Iterable[LevelKey]) -> Dict[LevelKey, Dict]:
+    """
+    Levels for the given guids, names or ids ({key: level}, missing keys left out).
+    With an offset index each level is one seek + one line; otherwise the file is streamed.
+    """
+    keys = list(keys)
+    found = {}
+    index = load_index(path)
+    if index is not None:
+        by_key = {}
+        for entry in index:
+            for field in ('guid', 'name', 'id'):
+                if field in entry:
+                    by_key.setdefault(entry[field], entry)
+        with open(path, 'rb') as f:
+            for key in keys:
+                entry = by_key.get(key)
+                if entry is not None:
+                    f.seek(entry['offset'])
+                    found[key] = json.loads(f.read(entry['length']))
+        return found
+    pending = set(keys)
+    for level in iter_levels(path):
+        for field in ('guid', 'name', 'id'):
+            key = level.get(field)
+            if key in pending and _matches(level, key):
+                found[key] = level
+                pending.discard(key)
+        if not pending:
+            break
+    return found
+
+
+def read_level(path: str, key: LevelKey) -> Optional[Dict]:
+    """One level by guid, name or id, or None."""
+    return read_levels(path, [key]).get(key)
@@ -2,14 +2,47 @@
 """
 Parse all levels from Unity assets and save to JSON.
 Uses improved door parsing logic.
+
+Level objects are located through the offset index of unity_asset_index.py
+(cached in level_data/level_object_index.json), so only the level
+MonoBehaviours are read from the memory-mapped asset file.
+
+Parsed levels are cached in level_data/parsed_levels_cache.json keyed by
+(GUID, hash of the raw bytes, PARSER_VERSION). PARSER_VERSION is the hash of
+this module's source, so editing a heuristic re-decodes levels and
+an unchanged parser only re-decodes levels whose bytes changed.
+
+Usage:
+    python parse_from_unity.py
+    python parse_from_unity.py --assets <path/to/_combined_sharedassets2.assets> --rebuild-index
+    python parse_from_unity.py --no-cache
+    python parse_from_unity.py --no-numpy     # struct-only scanning (same output, slower)
+    python parse_from_unity.py --jobs 1       # decode in this process only
+    python parse_from_unity.py --format ndjson  # parsed_levels_complete.ndjson + offset index
 """
 
-import UnityPy
+import argparse
 import struct
 import json
 import os
 import re
-from typing import Dict, List, Any
+import sys
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Any
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from level_cache import LevelCache, content_hash, source_version
+from level_stream import write_levels
+from unity_asset_index import INDEX_PATH, get_index, iter_level_objects
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+PARSE_CACHE_PATH = os.path.join(BASE_DIR, 'level_data', 'parsed_levels_cache.json')
+PARSE_CHUNK = 64  # Blobs per worker task
 
 # Block group type enum
 BLOCK_GROUP_TYPES = {
@@ -20,6 +53,9 @@ BLOCK_GROUP_TYPES = {
 
 BLOCK_SIZE = 44
 
+# Vectorized candidate scanning (identical results, used when NumPy is installed)
+USE_NUMPY = np is not None
+
 
 def read_int32(data: bytes, offset: int) -> int:
     if offset + 4 > len(data):
@@ -92,6 +128,35 @@ def find_doors_in_region(data: bytes, start: int, end: int, expected_count: int
     search_end = min(len(data) - 32, max(end, 0x900))
     
     # Scan through the region looking for valid door patterns
+    scan = scan_door_offsets_numpy if USE_NUMPY else scan_door_offsets
+    for offset in scan(data, start, search_end, side_edge_threshold, side_edge_max,
+                       top_bottom_edge_threshold, grid_y):
+        parts = read_int32(data, offset + 24)
+        btype = read_int32(data, offset + 28)
+        pos = read_vector3(data, offset)
+        rot = read_vector3(data, offset + 12)
+
+        # Avoid duplicates (same position)
+        is_duplicate = False
+        for existing in doors:
+            if abs(existing['position']['x'] - pos['x']) < 0.5 and abs(existing['position']['y'] - pos['y']) < 0.5:
+                is_duplicate = True
+                break
+
+        if not is_duplicate:
+            doors.append({
+                'position': pos,
+                'rotation': rot,
+                'doorPartCount': parts,
+                'blockType': btype
+            })
+
+    return doors
+
+
+def scan_door_offsets(data: bytes, start: int, search_end: int, side_edge_threshold: float,
+                      side_edge_max: float, top_bottom_edge_threshold: float, grid_y: int):
+    """Yield offsets of door entries between start and search_end (4-byte steps)."""
     offset = start
     while offset + 32 <= search_end:
         pos_x = read_float(data, offset)
@@ -114,30 +179,62 @@ def find_doors_in_region(data: bytes, start: int, end: int, expected_count: int
             btype = read_int32(data, offset + 28)
             
             if is_valid_door(pos_x, pos_y, parts, btype):
-                pos = read_vector3(data, offset)
-                rot = read_vector3(data, offset + 12)
-                
-                # Avoid duplicates (same position)
-                is_duplicate = False
-                for existing in doors:
-                    if abs(existing['position']['x'] - pos['x']) < 0.5 and abs(existing['position']['y'] - pos['y']) < 0.5:
-                        is_duplicate = True
-                        break
-                
-                if not is_duplicate:
-                    doors.append({
-                        'position': pos,
-                        'rotation': rot,
-                        'doorPartCount': parts,
-                        'blockType': btype
-                    })
-                
+                yield offset
                 offset += 32  # Move past this door
                 continue
         
         offset += 4  # Try next alignment
-    
-    return doors
+
+
+def word_views(data: bytes):
+    """
+    The blob as float32 and int32 words (word i = bytes 4*i..4*i+3).
+    int32 is a zero-copy view; floats are widened to float64 once so every
+    threshold compares exactly like the struct-based readers.
+    """
+    count = len(data) // 4
+    with np.errstate(invalid='ignore'):  # signalling NaN bit patterns
+        floats = np.frombuffer(data, dtype='<f4', count=count).astype(np.float64)
+    ints = np.frombuffer(data, dtype='<i4', count=count)
+    return floats, ints
+
+
+def scan_door_offsets_numpy(data: bytes, start: int, search_end: int, side_edge_threshold: float,
+                            side_edge_max: float, top_bottom_edge_threshold: float, grid_y: int) -> List[int]:
+    """scan_door_offsets() with all predicates evaluated as masks over every aligned offset."""
+    last = search_end - 32
+    if last < start:
+        return []
+    if start % 4:
+        return list(scan_door_offsets(data, start, search_end, side_edge_threshold, side_edge_max,
+                                      top_bottom_edge_threshold, grid_y))
+    floats, ints = word_views(data)
+    lo, hi = start // 4, last // 4 + 1
+    ax = np.abs(floats[lo:hi])
+    ay = np.abs(floats[lo + 1:hi + 1])
+    az = np.abs(floats[lo + 2:hi + 2])
+    parts = ints[lo + 6:hi + 6]
+    btype = ints[lo + 7:hi + 7]
+
+    is_side_edge = (side_edge_threshold <= ax) & (ax <= side_edge_max)
+    is_top_bottom_edge = (ay >= top_bottom_edge_threshold) & (ax < side_edge_threshold)
+    is_first_entry_false_positive = np.zeros(hi - lo, dtype=bool)
+    is_first_entry_false_positive[0] = (is_side_edge[0] and ay[0] >= top_bottom_edge_threshold
+                                        and ay[0] < grid_y + 0.5)
+    is_candidate = ((is_side_edge | is_top_bottom_edge) & ~is_first_entry_false_positive
+                    & (ax < 20) & (ay < 20) & (az < 5))
+    # is_valid_door()
+    is_candidate &= ~((ax < 0.1) & (ay < 0.1)) & ~(ax > 30) & ~(ay > 30)
+    is_candidate &= (parts >= 1) & (parts <= 4) & (btype >= 0) & (btype <= 15)
+
+    # A door consumes 32 bytes, so later hits inside it are skipped like in the scalar scan
+    offsets = []
+    next_free = start
+    for offset in (np.flatnonzero(is_candidate) * 4 + start).tolist():
+        if offset >= next_free:
+            offsets.append(offset)
+            next_free = offset + 32
+    return offsets
 
 
 GAME_BLOCK_SIZE = 0x9C  # 156 bytes per game block
@@ -170,6 +267,8 @@ def get_fully_hidden_top_rows(hidden_coords, grid_width, grid_height):
 
 def find_frame_data(data: bytes, search_start: int = 0x150) -> tuple:
     """Find frame element count and offset (decorative blocks)."""
+    if USE_NUMPY and search_start % 4 == 0:
+        return find_frame_data_numpy(data, search_start)
     for offset in range(search_start, min(len(data) - 100, 0x800), 4):
         count = read_int32(data, offset)
         if 1 <= count <= 100:
@@ -193,6 +292,32 @@ def find_frame_data(data: bytes, search_start: int = 0x150) -> tuple:
     return 0, 0
 
 
+def find_frame_data_numpy(data: bytes, search_start: int = 0x150) -> tuple:
+    """find_frame_data() with the per-offset checks evaluated as masks."""
+    stop = min(len(data) - 100, 0x800)
+    n = len(range(search_start, stop, 4))
+    if n == 0:
+        return 0, 0
+    floats, ints = word_views(data)
+    lo = search_start // 4
+    hi = lo + n
+    count = ints[lo:hi]
+    px, py, pz, rx = (floats[lo + k:hi + k] for k in (1, 2, 3, 4))
+    step = BLOCK_SIZE // 4
+    px2, py2 = floats[lo + 1 + step:hi + 1 + step], floats[lo + 2 + step:hi + 2 + step]
+
+    arx = np.abs(rx)
+    found = ((count >= 1) & (count <= 100)
+             & (-15 < px) & (px < 15) & (-15 < py) & (py < 15) & (-5 < pz) & (pz < 10)
+             & ((arx < 0.5) | ((89 < arx) & (arx < 271)) | (np.abs(rx - 345) < 1))
+             & (((count >= 2) & (-15 < px2) & (px2 < 15) & (-15 < py2) & (py2 < 15)) | (count == 1)))
+    hits = np.flatnonzero(found)
+    if len(hits) == 0:
+        return 0, 0
+    first = int(hits[0])
+    return int(count[first]), search_start + first * 4 + 4
+
+
 def find_game_blocks(data: bytes, grid_x: int, grid_y: int) -> List[Dict]:
     """Find actual game blocks by locating the block array count marker."""
     blocks = []
@@ -201,36 +326,8 @@ def find_game_blocks(data: bytes, grid_x: int, grid_y: int) -> List[Dict]:
     # The count is typically 1-20, followed immediately by position data
     
     # Search for the block array count marker
-    block_array_offset = -1
-    block_count = 0
-    
-    # Expanded search range to cover all levels (small levels have blocks earlier)
-    for offset in range(0x150, min(len(data) - 200, 0x1000), 4):
-        count = read_int32(data, offset)
-        
-        # Valid block count: 1-30 (some levels have many blocks)
-        if 1 <= count <= 30:
-            # Check if followed by valid position
-            px = read_float(data, offset + 4)
-            py = read_float(data, offset + 8)
-            pz = read_float(data, offset + 12)
-            
-            # Position should be inside field (allow larger values for tall grids)
-            if abs(px) <= 12 and abs(py) <= 12 and abs(pz) <= 3:
-                # Check for valid groupType at +28 (offset + 4 + 24)
-                group_type = read_int32(data, offset + 4 + 24)
-                block_type = read_int32(data, offset + 4 + 28)
-                
-                if 0 <= group_type <= 11 and 0 <= block_type <= 10:
-                    # At least one of: non-origin position OR non-zero types
-                    # This filters out padding arrays where everything is 0
-                    is_valid = (abs(px) > 0.5 or abs(py) > 0.5 or 
-                               group_type > 0 or block_type > 0)
-                    
-                    if is_valid:
-                        block_array_offset = offset + 4  # Skip the count
-                        block_count = count
-                        break
+    find = find_block_array_numpy if USE_NUMPY else find_block_array
+    block_array_offset, block_count = find(data)
     
     if block_array_offset < 0:
         return blocks
@@ -339,6 +436,58 @@ def find_game_blocks(data: bytes, grid_x: int, grid_y: int) -> List[Dict]:
     return blocks
 
 
+def find_block_array(data: bytes) -> tuple:
+    """Offset of the first game block (after the count marker) and the block count, or (-1, 0)."""
+    # Expanded search range to cover all levels (small levels have blocks earlier)
+    for offset in range(0x150, min(len(data) - 200, 0x1000), 4):
+        count = read_int32(data, offset)
+        
+        # Valid block count: 1-30 (some levels have many blocks)
+        if 1 <= count <= 30:
+            # Check if followed by valid position
+            px = read_float(data, offset + 4)
+            py = read_float(data, offset + 8)
+            pz = read_float(data, offset + 12)
+            
+            # Position should be inside field (allow larger values for tall grids)
+            if abs(px) <= 12 and abs(py) <= 12 and abs(pz) <= 3:
+                # Check for valid groupType at +28 (offset + 4 + 24)
+                group_type = read_int32(data, offset + 4 + 24)
+                block_type = read_int32(data, offset + 4 + 28)
+                
+                if 0 <= group_type <= 11 and 0 <= block_type <= 10:
+                    # At least one of: non-origin position OR non-zero types
+                    # This filters out padding arrays where everything is 0
+                    is_valid = (abs(px) > 0.5 or abs(py) > 0.5 or 
+                               group_type > 0 or block_type > 0)
+                    
+                    if is_valid:
+                        return offset + 4, count  # Skip the count
+    return -1, 0
+
+
+def find_block_array_numpy(data: bytes) -> tuple:
+    """find_block_array() with the marker checks evaluated as masks."""
+    n = len(range(0x150, min(len(data) - 200, 0x1000), 4))
+    if n <= 0:
+        return -1, 0
+    floats, ints = word_views(data)
+    lo = 0x150 // 4
+    hi = lo + n
+    count = ints[lo:hi]
+    ax, ay, az = (np.abs(floats[lo + k:hi + k]) for k in (1, 2, 3))
+    group_type, block_type = ints[lo + 7:hi + 7], ints[lo + 8:hi + 8]
+
+    found = ((count >= 1) & (count <= 30) & (ax <= 12) & (ay <= 12) & (az <= 3)
+             & (group_type >= 0) & (group_type <= 11) & (block_type >= 0) & (block_type <= 10)
+             & ((ax > 0.5) | (ay > 0.5) | (group_type > 0) | (block_type > 0)))
+    hits = np.flatnonzero(found)
+    if len(hits) == 0:
+        return -1, 0
+    first = int(hits[0])
+    return 0x150 + first * 4 + 4, int(count[first])
+
+
 def find_block_data(data: bytes, search_start: int = 0x150) -> tuple:
     """Find block count and offset (kept for backwards compatibility)."""
     return find_frame_data(data, search_start)
@@ -473,62 +622,141 @@ def parse_level_data(data: bytes, name_hint: str = "") -> Dict[str, Any]:
     return result
 
 
+def read_level_guid(data: bytes) -> str:
+    """GUID of a level object (the string after m_Name), without parsing the rest."""
+    _, offset = read_string(data, 0x1C)
+    guid, _ = read_string(data, offset)
+    return guid
+
+
+def parse_blob(task):
+    """Worker entry point: (raw, name) -> (ok, parsed level or None)."""
+    raw, name = task
+    try:
+        return True, parse_level_data(raw, name)
+    except:
+        return False, None
+
+
+def init_worker(use_numpy: bool):
+    global USE_NUMPY
+    USE_NUMPY = use_numpy
+
+
+def parse_blobs(tasks: List[tuple], jobs: int = 1) -> Iterator[tuple]:
+    """
+    parse_blob() over all tasks, yielded in task order as they finish.
+    Fanned out to a process pool in chunks when jobs > 1.
+    """
+    if jobs <= 1 or len(tasks) <= PARSE_CHUNK:
+        yield from map(parse_blob, tasks)
+        return
+    with Pool(processes=jobs, initializer=init_worker, initargs=(USE_NUMPY,)) as pool:
+        yield from pool.imap(parse_blob, tasks, chunksize=PARSE_CHUNK)
+
+
+def get_level_num(name: str) -> int:
+    """Level number from the end of the name (9999 if there is none)."""
+    match = re.search(r'(\d+)$', name)
+    if match:
+        return int(match.group(1))
+    return 9999
+
+
+# The whole module source: every function, table and constant that shapes
+# parse_level_data() output is covered, including ones added later
+PARSER_VERSION = source_version(sys.modules[__name__])
+
+
 def main():
     data_path = r'D:\Work\Playcus\Flutter\color_block_jam\res\ColorBlockJam_Analysis\xapk_extracted\game_apk\assets\bin\Data'
     combined_path = os.path.join(data_path, '_combined_sharedassets2.assets')
     output_path = r'D:\Work\Playcus\Flutter\color_block_jam\res\ColorBlockJam_Analysis\level_data\parsed_levels_complete.json'
-    
-    print(f"Loading Unity assets from: {combined_path}")
-    env = UnityPy.load(combined_path)
-    
-    levels = []
-    # Match "Level X", "Level XX", "Level XXX" etc., or variants like "Derin Level X"
-    level_pattern = re.compile(r'Level \d+$')
-    
-    print("Parsing levels...")
-    for obj in env.objects:
-        if obj.type.name == 'MonoBehaviour':
-            raw = obj.get_raw_data()
-            
-            # Quick check for level name pattern
-            try:
-                name_len = struct.unpack('<i', raw[0x1c:0x20])[0]
-                if 5 <= name_len <= 30:
-                    name = raw[0x20:0x20+name_len].decode('utf-8', errors='ignore')
-                    if level_pattern.search(name):  # Use search instead of match
-                        level_data = parse_level_data(raw, name)
-                        if level_data:
-                            levels.append(level_data)
-            except:
-                pass
-    
-    # Sort by level number (extract number from name)
-    def get_level_num(level):
+
+    parser = argparse.ArgumentParser(description='Parse all levels from Unity assets')
+    parser.add_argument('--assets', default=combined_path, help='Path to _combined_sharedassets2.assets')
+    parser.add_argument('--output', default=output_path, help='Output JSON path')
+    parser.add_argument('--index', default=INDEX_PATH, help='Level object index cache')
+    parser.add_argument('--rebuild-index', action='store_true', help='Rescan the asset file even if the index is valid')
+    parser.add_argument('--cache', default=PARSE_CACHE_PATH, help='Parsed level cache')
+    parser.add_argument('--no-cache', action='store_true', help='Re-decode every level')
+    parser.add_argument('--no-numpy', action='store_true', help='Scan with the struct-based readers only')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('--format', choices=('json', 'ndjson'), default='json',
+                        help='json: indented array; ndjson: one level per line + offset index')
+    args = parser.parse_args()
+    global USE_NUMPY
+    USE_NUMPY = USE_NUMPY and not args.no_numpy
+    combined_path = args.assets
+    output_path = args.output
+    if args.format == 'ndjson' and output_path == parser.get_default('output'):
+        output_path = os.path.splitext(output_path)[0] + '.ndjson'
+
+    print(f"Indexing Unity assets: {combined_path}")
+    entries = get_index(combined_path, args.index, rebuild=args.rebuild_index)
+    print(f"Found {len(entries)} level objects (index: {args.index})")
+
+    cache = LevelCache(args.cache, PARSER_VERSION)
+    if args.no_cache:
+        cache.entries = {}
+
+    # Objects in output order (by level number, stable like sorting the parsed levels),
+    # so every level can be written as soon as it is decoded
+    entries = sorted(entries, key=lambda entry: get_level_num(entry['name']))
+    seen = set()
+    plan = []
+    pending = []
+    print(f"Parsing levels (parser {PARSER_VERSION})...")
+    for entry, raw in iter_level_objects(combined_path, entries):
         try:
-            # Extract the last number from the name
-            match = re.search(r'(\d+)$', level['name'])
-            if match:
-                return int(match.group(1))
-            return 9999
+            key = read_level_guid(raw) or f"pathId:{entry['pathId']}"
+            digest = content_hash(raw)
         except:
-            return 9999
-    
-    levels.sort(key=get_level_num)
-    
-    print(f"\nParsed {len(levels)} levels")
-    
-    # Statistics
+            continue
+        seen.add(key)
+        level_data = cache.get(key, digest)
+        if level_data is LevelCache.MISSING:
+            pending.append((raw, entry['name']))
+        plan.append((key, digest, level_data))
+    cache.retain(seen)
+    changed = cache.dirty or bool(pending)
+
     door_counts = {}
-    for level in levels:
-        dc = len(level.get('doors', []))
-        door_counts[dc] = door_counts.get(dc, 0) + 1
-    
+    samples = []
+
+    def iter_parsed() -> Iterable[Dict]:
+        results = parse_blobs(pending, args.jobs)
+        for key, digest, level_data in plan:
+            if level_data is LevelCache.MISSING:
+                ok, level_data = next(results)
+                if not ok:
+                    continue
+                cache.put(key, digest, level_data)
+            if not level_data:
+                continue
+            dc = len(level_data.get('doors', []))
+            door_counts[dc] = door_counts.get(dc, 0) + 1
+            if len(samples) < 5:
+                samples.append(level_data)
+            yield level_data
+
+    if not changed and os.path.exists(output_path):
+        total = sum(1 for _ in iter_parsed())
+        print(f"No level changed, {output_path} is up to date")
+    else:
+        print(f"Saving to {output_path}...")
+        total = write_levels(output_path, iter_parsed())
+    cache.save()
+    print(f"Decoded {cache.misses} levels, {cache.hits} unchanged from cache")
+
+    print(f"\nParsed {total} levels")
+
     print("\nDoor count distribution:")
     for dc, count in sorted(door_counts.items()):
         print(f"  {dc} doors: {count} levels")
     
-    # Sample check: Level 1 and Level 2 doors
-    for level in levels[:5]:
+    # Sample check: first levels and their doors
+    for level in samples:
         print(f"\n{level['name']}:")
         print(f"  Grid: {level['gridSize']['x']}x{level['gridSize']['y']}")
         print(f"  Doors ({len(level['doors'])}):")
@@ -536,11 +764,6 @@ def main():
             pos = door['position']
             print(f"    pos=({pos['x']:.1f}, {pos['y']:.1f}), parts={door['doorPartCount']}, type={door['blockType']}")
     
-    # Save to file
-    print(f"\nSaving to {output_path}...")
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(levels, f, indent=2, ensure_ascii=False)
-    
     print("Done!")
 
 
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Append-only binary replay log of solver and emulation runs ("View Retry by ID").
+
+Layout (little-endian):
+    header   magic 'CBJR', version u16, engine version 6 B
+    records  per run (run id = position in the log, from 1):
+             level hash 8 B (level_cache.content_hash prefix, blocks in stored order), level id u16,
+             seed u32, emulation u32, attempt u16, kind u8, flags u8 (bit 0 won),
+             move bytes u16, then the moves as varints
+
+A move is stored as its index in the legal move list of the position
+(Search.successors(..., exits_first=False) order), one byte for almost every
+swipe, so 100k playouts take a few MB. replay() re-simulates a run on the
+level and returns the usual {blockIndex, direction, steps} moves without any
+search. The engine version is the hash of the move generator (the whole
+solver.board, solver.search and level_geometry modules): a log written by a
+different generator, or a run replayed on a changed level, raises
+ReplayMismatch instead of replaying wrong moves. The level hash keeps the
+stored block order, since moves refer to blocks by index.
+
+Usage:
+    python replay_log.py level_data/replays.cbjr             # summary
+    python replay_log.py level_data/replays.cbjr --id 1234   # replay one run
+"""
+
+import argparse
+import os
+import struct
+import sys
+from typing import Dict, Iterator, List, Optional
+
+import level_geometry
+from level_cache import content_hash, source_version
+from level_stream import read_level
+from solver import DEFAULT_LEVELS_PATH, Board, Search
+from solver import board as solver_board, search as solver_search
+
+MAGIC = b'CBJR'
+LOG_VERSION = 1
+
+HEADER = struct.Struct('<4sH6s')
+RECORD = struct.Struct('<8sHIIHBBH')
+
+KINDS = ('solver', 'random', 'heuristic')
+FLAG_WON = 1
+
+ENGINE_VERSION = bytes.fromhex(source_version(solver_board, solver_search, level_geometry))[:6]
+
+
+class ReplayFormatError(Exception):
+    """File is not a replay log or has an unsupported version."""
+
+
+class ReplayMismatch(Exception):
+    """A run does not fit the level or move generator it is replayed with."""
+
+
+def encode_moves(indices: List[int]) -> bytes:
+    """Unsigned LEB128 varints."""
+    out = bytearray()
+    for value in indices:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_moves(data: bytes) -> List[int]:
+    indices = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            indices.append(value)
+            value = shift = 0
+    return indices
+
+
+def level_hash(level: Dict) -> bytes:
+    """Hash of the level as stored: reordering its blocks changes it."""
+    return bytes.fromhex(content_hash(level))[:8]
+
+
+def encode_solution(level: Dict, solution: List[Dict]) -> List[int]:
+    """Move indices of a solver solution ({blockIndex, direction, steps} records)."""
+    search = Search(Board(level))
+    anchors = tuple(search.board.initial_anchors())
+    layers = 0
+    indices = []
+    for step in solution:
+        options = list(search.successors(anchors, layers, exits_first=False))
+        for index, (i, direction, steps, na, layer_event) in enumerate(options):
+            if (i, direction, steps) == (step['blockIndex'], step['direction'], step['steps']):
+                break
+        else:
+            raise ReplayMismatch(f"Level {level.get('id')}: move {step} is not legal")
+        indices.append(index)
+        anchors = anchors[:i] + (na,) + anchors[i + 1:]
+        layers |= layer_event << i
+    return indices
+
+
+class ReplayWriter:
+    """Appends runs to a log as they finish; ids continue after the runs already in it."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.next_id = 1
+        if os.path.exists(path) and os.path.getsize(path):
+            existing = ReplayLog(path)
+            if existing.engine != ENGINE_VERSION:
+                raise ReplayFormatError(f'{path} was written by move generator {existing.engine.hex()}, '
+                                        f'this one is {ENGINE_VERSION.hex()}; start a new log')
+            self.next_id += len(existing)
+        self._file = open(path, 'ab')
+        if self.next_id == 1:
+            self._file.write(HEADER.pack(MAGIC, LOG_VERSION, ENGINE_VERSION))
+
+    def append(self, level: Dict, indices: List[int], kind: str, seed: int = 0,
+               emulation: int = 0, attempt: int = 0, won: bool = False) -> int:
+        """Write one run, return its id."""
+        moves = encode_moves(indices)
+        self._file.write(RECORD.pack(level_hash(level), level['id'], seed, emulation, attempt,
+                                     KINDS.index(kind), FLAG_WON if won else 0, len(moves)))
+        self._file.write(moves)
+        self.next_id += 1
+        return self.next_id - 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayLog:
+    """A whole log in memory (a few MB) with the offset of every run."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = f.read()
+        if len(self._data) < HEADER.size:
+            raise ReplayFormatError(f'{path} is not a replay log')
+        magic, version, engine = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC:
+            raise ReplayFormatError(f'{path} is not a replay log')
+        if version != LOG_VERSION:
+            raise ReplayFormatError(f'{path}: log version {version}, expected {LOG_VERSION}')
+        self.engine = engine
+        self.offsets: List[int] = []
+        offset = HEADER.size
+        # A run cut off by an interrupted writer is ignored
+        while offset + RECORD.size <= len(self._data):
+            end = offset + RECORD.size + RECORD.unpack_from(self._data, offset)[-1]
+            if end > len(self._data):
+                break
+            self.offsets.append(offset)
+            offset = end
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for run_id in range(1, len(self.offsets) + 1):
+            yield self.run(run_id)
+
+    def run(self, run_id: int) -> Dict:
+        """Run by id (1-based). KeyError if there is no such run."""
+        if not 1 <= run_id <= len(self.offsets):
+            raise KeyError(run_id)
+        offset = self.offsets[run_id - 1]
+        digest, level_id, seed, emulation, attempt, kind, flags, size = RECORD.unpack_from(self._data, offset)
+        start = offset + RECORD.size
+        return {
+            'id': run_id,
+            'levelId': level_id,
+            'levelHash': digest.hex(),
+            'seed': seed,
+            'kind': KINDS[kind],
+            'emulation': emulation,
+            'attempt': attempt,
+            'won': bool(flags & FLAG_WON),
+            'moves': decode_moves(self._data[start:start + size]),
+        }
+
+
+def replay(level: Dict, run: Dict, engine: bytes = ENGINE_VERSION) -> Dict:
+    """Re-simulate a run: {'moves': [{blockIndex, direction, steps}], 'won', 'completion'}."""
+    if engine != ENGINE_VERSION:
+        raise ReplayMismatch(f"Run {run['id']} was recorded by move generator {engine.hex()}, "
+                             f"this one is {ENGINE_VERSION.hex()}")
+    if level_hash(level).hex() != run['levelHash']:
+        raise ReplayMismatch(f"Run {run['id']}: level {level.get('id')} changed since it was recorded")
+    search = Search(Board(level))
+    anchors = tuple(search.board.initial_anchors())
+    layers = 0
+    moves = []
+    for index in run['moves']:
+        options = list(search.successors(anchors, layers, exits_first=False))
+        if index >= len(options):
+            raise ReplayMismatch(f"Run {run['id']}: move {len(moves) + 1} is not legal")
+        i, direction, steps, na, layer_event = options[index]
+        moves.append({'blockIndex': i, 'direction': direction, 'steps': steps})
+        anchors = anchors[:i] + (na,) + anchors[i + 1:]
+        layers |= layer_event << i
+    exited = anchors.count(-1)
+    return {'moves': moves, 'won': exited == len(anchors),
+            'completion': exited / len(anchors) if anchors else 1.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or replay a replay log')
+    parser.add_argument('log', help='Replay log (.cbjr)')
+    parser.add_argument('--id', type=int, help='Replay this run')
+    parser.add_argument('--levels', default=DEFAULT_LEVELS_PATH, help='Levels the runs were recorded on')
+    args = parser.parse_args()
+
+    log = ReplayLog(args.log)
+    if args.id is None:
+        size = os.path.getsize(args.log)
+        kinds: Dict[str, int] = {}
+        moves = 0
+        for run in log:
+            kinds[run['kind']] = kinds.get(run['kind'], 0) + 1
+            moves += len(run['moves'])
+        per_run = size / len(log) if len(log) else 0
+        print(f'{args.log}: {len(log)} runs, {moves} moves, {size} bytes ({per_run:.1f} bytes/run), '
+              f'engine {log.engine.hex()}')
+        for kind, count in sorted(kinds.items()):
+            print(f'  {kind}: {count}')
+        return 0
+
+    run = log.run(args.id)
+    level: Optional[Dict] = read_level(args.levels, run['levelId'])
+    if level is None:
+        print(f"Level {run['levelId']} not found in {args.levels}")
+        return 1
+    try:
+        result = replay(level, run, log.engine)
+    except ReplayMismatch as e:
+        print(f'[FAIL] {e}')
+        return 1
+    print(f"Run {run['id']}: level {run['levelId']}, {run['kind']}, seed {run['seed']}, "
+          f"emulation {run['emulation']}, attempt {run['attempt']}: "
+          f"{'won' if result['won'] else 'lost'} in {len(result['moves'])} moves "
+          f"({result['completion']:.0%} cleared)")
+    for step in result['moves']:
+        print(f"    block {step['blockIndex']} {step['direction']} x{step['steps']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo lose-rate emulation, after the Brute-Force spec
+(test/others/Match3 - NEW - Brute-Force v 0.0.2.md).
+
+Every level is played N times per bot policy (solver.playout): a bot retries
+the level against its timer (`duration`, --move-seconds per swipe) until it
+wins or runs out of --max-retries. Emulations run on a process pool in chunks;
+each one has its own seeded RNG, so an emulation id + --seed replays it.
+With --replay-log every attempt is appended to a replay log (replay_log.py)
+as it finishes, and the summary lists the run ids of each level and policy.
+
+Per level and policy the spec's statistics are reported for
+    loseRate    lives lost before the win (max retries if never won)
+    completion  share of blocks cleared in lost attempts (wins excluded)
+    moves       swipes of the winning attempt
+as min / max / avg / median / coefficient of variation, and avg / median / CV
+again with --percentile % of the lowest and highest values cut off
+(spec default 7, range 0-15).
+
+Usage:
+    python simulate_levels.py                              # levels_27.json, both policies
+    python simulate_levels.py --level 6 --emulations 1000 --policy heuristic
+    python simulate_levels.py --catalogue --jobs 16 --percentile 10 --seed 42
+    python simulate_levels.py --level 6 --replay-log ../level_data/replays.cbjr
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from multiprocessing import Pool
+
+from replay_log import ReplayWriter
+from solver import DEFAULT_LEVELS_PATH, load_catalogue, load_levels
+from solver.playout import DEFAULT_EPSILON, DEFAULT_MOVE_SECONDS, POLICIES, Playout
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, 'level_data', 'playout_stats.json')
+
+DEFAULT_PERCENTILE = 7
+CHUNK = 25  # emulations per pool task
+
+
+def spread_stats(values, percentile=DEFAULT_PERCENTILE):
+    """Spec statistics of a sample: before and after cutting `percentile` % off each end."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    cut = int(len(ordered) * percentile / 100)
+    trimmed = ordered[cut:len(ordered) - cut] or ordered
+
+    def cv(sample):
+        mean = statistics.fmean(sample)
+        return round(statistics.pstdev(sample) / mean * 100, 1) if mean else 0.0
+
+    return {
+        'min': ordered[0],
+        'max': ordered[-1],
+        'avg': round(statistics.fmean(ordered), 3),
+        'median': statistics.median(ordered),
+        'cv': cv(ordered),
+        'avgTrimmed': round(statistics.fmean(trimmed), 3),
+        'medianTrimmed': statistics.median(trimmed),
+        'cvTrimmed': cv(trimmed),
+    }
+
+
+def emulate_chunk(task):
+    """Worker entry point: emulations first..first+count-1 of one level and policy."""
+    level, policy, first, count, seed, max_retries, move_seconds, epsilon, record = task
+    playout = Playout(level, policy, move_seconds, epsilon)
+    results = [playout.emulate(seed, emulation, max_retries, record) for emulation in range(first, first + count)]
+    return level['id'], policy, results
+
+
+def log_attempts(writer, level, policy, seed, emulation):
+    """Append every attempt of an emulation to the replay log; returns (first id, last id)."""
+    attempts = emulation.pop('attempts')
+    ids = [writer.append(level, moves, policy, seed, emulation['emulation'], attempt,
+                         won=emulation['won'] and attempt == len(attempts))
+           for attempt, moves in enumerate(attempts, 1)]
+    return ids[0], ids[-1]
+
+
+def summarize(level, policy, emulations, percentile):
+    won = [e for e in emulations if e['won']]
+    completions = [statistics.fmean(e['completions']) for e in emulations if e['completions']]
+    return {
+        'id': level['id'],
+        'name': level['name'],
+        'duration': level.get('duration'),
+        'policy': policy,
+        'emulations': len(emulations),
+        'winRate': round(len(won) / len(emulations), 4),
+        'loseRate': spread_stats([e['losses'] for e in emulations], percentile),
+        'completion': spread_stats([round(c * 100, 1) for c in completions], percentile),
+        'moves': spread_stats([e['moves'] for e in won], percentile),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Emulate bot playouts and report lose-rate statistics')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--levels', help='Exported levels JSON (default: assets/levels/levels_27.json)')
+    source.add_argument('--catalogue', action='store_true', help='Use all levels from parsed_levels_complete.json')
+    parser.add_argument('--level', type=int, action='append', help='Level id (repeatable)')
+    parser.add_argument('--policy', action='append', choices=sorted(POLICIES),
+                        help='Bot policy (repeatable, default: all)')
+    parser.add_argument('--emulations', type=int, default=200, help='Emulations per level and policy')
+    parser.add_argument('--max-retries', type=int, default=50, help='Attempts per emulation')
+    parser.add_argument('--move-seconds', type=float, default=DEFAULT_MOVE_SECONDS,
+                        help='Timer cost of one swipe')
+    parser.add_argument('--epsilon', type=float, default=DEFAULT_EPSILON,
+                        help='Random swipe probability of the heuristic bot')
+    parser.add_argument('--percentile', type=int, default=DEFAULT_PERCENTILE, choices=range(0, 16),
+                        metavar='0-15', help='Percent cut off each end for the trimmed statistics')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Worker processes (default: all cores)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Statistics JSON')
+    parser.add_argument('--replay-log', help='Append every attempt to this replay log (.cbjr)')
+    args = parser.parse_args()
+
+    levels = load_catalogue() if args.catalogue else load_levels(args.levels or DEFAULT_LEVELS_PATH)
+    if args.level:
+        levels = [lvl for lvl in levels if lvl['id'] in args.level]
+    if not levels:
+        print('No levels selected.')
+        return 1
+    policies = args.policy or sorted(POLICIES)
+
+    tasks = [(level, policy, first, min(CHUNK, args.emulations - first + 1), args.seed,
+              args.max_retries, args.move_seconds, args.epsilon, bool(args.replay_log))
+             for level in levels for policy in policies
+             for first in range(1, args.emulations + 1, CHUNK)]
+
+    print(f'Emulating {len(levels)} levels x {len(policies)} policies x {args.emulations} '
+          f'on {args.jobs} processes (max {args.max_retries} retries, seed {args.seed})')
+    start = time.perf_counter()
+    collected = {}
+    replay_ids = {}
+    by_id = {level['id']: level for level in levels}
+    writer = ReplayWriter(args.replay_log) if args.replay_log else None
+    # In task order, so run ids in the replay log follow level, policy and emulation
+    with Pool(processes=args.jobs) as pool:
+        for level_id, policy, results in pool.imap(emulate_chunk, tasks):
+            collected.setdefault((level_id, policy), []).extend(results)
+            if writer:
+                for emulation in results:
+                    first, last = log_attempts(writer, by_id[level_id], policy, args.seed, emulation)
+                    ids = replay_ids.setdefault((level_id, policy), [first, last])
+                    ids[1] = last
+    if writer:
+        writer.close()
+
+    summaries = []
+    print('\n| Level | Policy | Win rate | Lose min | Lose max | Lose median | CV | '
+          f'CV ({args.percentile}th pct) | Moves median |')
+    print('|-------|--------|----------|----------|----------|-------------|----|------------|--------------|')
+    for level in levels:
+        for policy in policies:
+            emulations = sorted(collected[(level['id'], policy)], key=lambda e: e['emulation'])
+            summary = summarize(level, policy, emulations, args.percentile)
+            if writer:
+                summary['replayIds'] = replay_ids[(level['id'], policy)]
+            summaries.append(summary)
+            lose, moves = summary['loseRate'], summary['moves']
+            print(f"| {level['id']} | {policy} | {summary['winRate']:.0%} | {lose['min']} | {lose['max']} | "
+                  f"{lose['median']} | {lose['cv']}% | {lose['cvTrimmed']}% | "
+                  f"{moves['median'] if moves else '-'} |")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated': datetime.now().isoformat(timespec='seconds'),
+            'settings': {
+                'emulations': args.emulations,
+                'maxRetries': args.max_retries,
+                'moveSeconds': args.move_seconds,
+                'epsilon': args.epsilon,
+                'percentile': args.percentile,
+                'seed': args.seed,
+            },
+            'levels': summaries,
+        }, f, indent=2, ensure_ascii=False)
+    print(f'\nDone in {time.perf_counter() - start:.1f}s, saved {args.output}')
+    if writer:
+        print(f'Replays: {args.replay_log} (runs up to {writer.next_id - 1})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""
+Headless level solver for exported game levels (assets/levels/levels_27.json).
+
+Python port of the brute-force solver in brute_force_visualizer.html:
+integer bitboards for occupancy, a binary-heap A* open set, packed
+integer state keys and a memory-bounded Zobrist transposition table.
+IDA* and beam search (strategies.py) solve deep levels in memory linear
+in solution depth.
+
+Usage:
+    from solver import load_levels, solve
+    result = solve(load_levels()[5])
+    levels = load_catalogue()   # all 1557 levels, converted to the game format
+"""
+
+import os
+from typing import Dict, List, Optional
+
+from level_stream import iter_levels
+
+from .board import Board
+from .dead_state import RULES as DEAD_RULES, dead_blocks
+from .graph import DEFAULT_GRAPH_STATES, DEFAULT_WALKS, StateGraph, explore, level_metrics, sample_walks
+from .pattern_db import UNREACHABLE, PatternDatabase
+from .search import DEFAULT_MAX_STATES, Search, solve
+from .strategies import DEFAULT_BEAM_WIDTH, STRATEGIES, beam_search, ida_star, solve_one, solve_with
+from .transposition import DEFAULT_TABLE_MB, TranspositionTable, Zobrist
+
+# tools/solver -> tools -> ColorBlockJam_Analysis -> res -> project root
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
+DEFAULT_LEVELS_PATH = os.path.join(PROJECT_ROOT, 'assets', 'levels', 'levels_27.json')
+
+
+def load_levels(path: Optional[str] = None) -> List[Dict]:
+    """Load exported levels ({'levels': [...]}, a plain list or NDJSON)."""
+    return list(iter_levels(path or DEFAULT_LEVELS_PATH))
+
+
+def load_catalogue() -> List[Dict]:
+    """Convert every level of parsed_levels_complete.json (or .ndjson) to the game format, in game order."""
+    from export_game_levels import convert_levels, load_hardness_data, select_levels
+    return list(convert_levels(select_levels(BASE_DIR), load_hardness_data(BASE_DIR)))
+
+
+__all__ = [
+    'Board',
+    'DEAD_RULES',
+    'DEFAULT_BEAM_WIDTH',
+    'DEFAULT_GRAPH_STATES',
+    'DEFAULT_LEVELS_PATH',
+    'DEFAULT_MAX_STATES',
+    'DEFAULT_TABLE_MB',
+    'DEFAULT_WALKS',
+    'PatternDatabase',
+    'STRATEGIES',
+    'Search',
+    'StateGraph',
+    'TranspositionTable',
+    'UNREACHABLE',
+    'Zobrist',
+    'beam_search',
+    'dead_blocks',
+    'explore',
+    'ida_star',
+    'level_metrics',
+    'load_catalogue',
+    'load_levels',
+    'sample_walks',
+    'solve',
+    'solve_one',
+    'solve_with',
+]
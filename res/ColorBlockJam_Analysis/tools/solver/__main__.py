@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Solve exported levels headlessly and print a brute_force_results.md style table.
+
+Usage (from tools/):
+    python -m solver                       # all levels from levels_27.json
+    python -m solver --level 18            # one level
+    python -m solver --max-states 200000 --time-limit 60
+    python -m solver --weight 3            # weighted A*: fast, not guaranteed minimal
+    python -m solver --strategy ida        # IDA*: optimal, memory linear in depth, no state cap
+    python -m solver --strategy beam --level 18 --beam-width 5000   # deep levels, not minimal
+    python -m solver --analyze             # static dead-block check only, no search
+"""
+
+import argparse
+import sys
+
+from . import (DEFAULT_BEAM_WIDTH, DEFAULT_MAX_STATES, DEFAULT_TABLE_MB, STRATEGIES, Board, Search, dead_blocks,
+               load_levels, solve_with)
+
+
+def analyze(levels) -> int:
+    """Print the blocks of every level that can never exit; exit code 1 if any."""
+    print('| Level | Dead blocks |')
+    print('|-------|-------------|')
+    rejected = 0
+    for level in levels:
+        dead = dead_blocks(Search(Board(level)))
+        if dead:
+            rejected += 1
+        reasons = ', '.join(f"{d['blockIndex']} ({d['rule']}, color {d['color']})" for d in dead)
+        print(f"| {level['id']} | {reasons or '-'} |")
+    print(f'\n**Summary:** {rejected}/{len(levels)} levels rejected before search')
+    return 1 if rejected else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Solve Color Block Jam levels')
+    parser.add_argument('--levels', help='Path to exported levels JSON (default: assets/levels/levels_27.json)')
+    parser.add_argument('--level', type=int, action='append', help='Level id to solve (repeatable)')
+    parser.add_argument('--strategy', choices=STRATEGIES, default='astar',
+                        help='astar (default), ida (optimal, linear memory) or beam (deep levels)')
+    parser.add_argument('--max-states', type=int, default=None,
+                        help=f'State budget (default: {DEFAULT_MAX_STATES} for astar, none for ida/beam)')
+    parser.add_argument('--time-limit', type=float, default=None, help='Seconds per level')
+    parser.add_argument('--weight', type=float, default=1.0, help='Heuristic weight (1 = optimal)')
+    parser.add_argument('--table-mb', type=float, default=DEFAULT_TABLE_MB,
+                        help='Memory ceiling of the transposition table (and of the A* open list)')
+    parser.add_argument('--beam-width', type=int, default=DEFAULT_BEAM_WIDTH, help='States kept per beam layer')
+    parser.add_argument('--show-solution', action='store_true')
+    parser.add_argument('--analyze', action='store_true', help='Only run the static dead-block analysis')
+    args = parser.parse_args()
+
+    levels = load_levels(args.levels)
+    if args.level:
+        levels = [lvl for lvl in levels if lvl['id'] in args.level]
+    if args.analyze:
+        return analyze(levels)
+
+    print('| Level | Solvable | Min Moves | States | Time (ms) | Error |')
+    print('|-------|----------|-----------|--------|-----------|-------|')
+    solved = 0
+    for level in levels:
+        result = solve_with(args.strategy, level, max_states=args.max_states, time_limit=args.time_limit,
+                            weight=args.weight, table_mb=args.table_mb, beam_width=args.beam_width)
+        if result['isSolvable']:
+            solved += 1
+            print(f"| {level['id']} | OK | {result['minMoves']} | {result['statesExplored']} | "
+                  f"{result['searchTime']:.0f} | - |")
+        else:
+            print(f"| {level['id']} | FAIL | - | {result['statesExplored']} | "
+                  f"{result['searchTime']:.0f} | {result['error']} |")
+        sys.stdout.flush()
+        if args.show_solution and result['isSolvable']:
+            for step in result['solution']:
+                print(f"    block {step['blockIndex']} {step['direction']} x{step['steps']}")
+
+    print(f'\n**Summary:** {solved}/{len(levels)} levels solvable')
+    return 0 if solved == len(levels) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Bitboard model of an exported game level (levels_27.json format).
+
+Cell and shape masks come from level_geometry.GridGeometry, which pads the
+board so a block can be shifted one step past the grid edge (into a door)
+without wrapping to the next row.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from level_geometry import grid_geometry
+
+# Same order as getPossibleMoves in the visualizer
+DIRECTIONS = ('LEFT', 'RIGHT', 'UP', 'DOWN')
+DELTAS = {'UP': (-1, 0), 'DOWN': (1, 0), 'LEFT': (0, -1), 'RIGHT': (0, 1)}
+EDGE_DIRECTION = {'top': 'UP', 'bottom': 'DOWN', 'left': 'LEFT', 'right': 'RIGHT'}
+
+# moveDirection: 0=HORIZ, 1=VERT, 2=BOTH
+ALLOWED_DIRECTIONS = {
+    0: ('LEFT', 'RIGHT'),
+    1: ('UP', 'DOWN'),
+    2: DIRECTIONS,
+}
+
+
+class Board:
+    """Static part of a level: grid, hidden cells, doors and per-block shape tables."""
+
+    def __init__(self, level: Dict):
+        self.level = level
+        self.geometry = geometry = grid_geometry(level['gridWidth'], level['gridHeight'])
+        self.width = geometry.width
+        self.height = geometry.height
+        self.stride = geometry.stride
+        self.rows = geometry.rows
+        self.inside = geometry.inside
+        self.outside = geometry.outside
+        self.hidden = geometry.hidden_mask(level)
+
+        # Door cells and alignment bands per (color, direction)
+        self.exit_masks: Dict[Tuple[int, str], int] = {}
+        self.door_bands: Dict[Tuple[int, str], List[int]] = {}
+        for door in level['doors']:
+            key = (door['blockType'], EDGE_DIRECTION[door['edge']])
+            self.exit_masks[key] = self.exit_masks.get(key, 0) | geometry.door_cells_mask(door)
+            self.door_bands.setdefault(key, []).append(geometry.door_band(door))
+
+        blocks = level['blocks']
+        self.block_count = len(blocks)
+        self.outer_color = [b['blockType'] for b in blocks]
+        self.inner_color = [b.get('innerBlockType', -1) for b in blocks]
+        self.has_layer = [0 <= b.get('innerBlockType', -1) <= 9 for b in blocks]
+        self.ice = [b.get('iceCount', 0) or 0 for b in blocks]
+        self.directions = [ALLOWED_DIRECTIONS.get(b.get('moveDirection', 2), DIRECTIONS) for b in blocks]
+        self.deltas = {d: dr * self.stride + dc for d, (dr, dc) in DELTAS.items()}
+        self.tables = [geometry.block_table(b) for b in blocks]
+
+    def anchor(self, row: int, col: int) -> int:
+        return self.geometry.anchor(row, col)
+
+    def anchor_row_col(self, anchor: int) -> Tuple[int, int]:
+        return self.geometry.anchor_row_col(anchor)
+
+    def initial_anchors(self) -> List[int]:
+        return [self.anchor(b['gridRow'], b['gridCol']) for b in self.level['blocks']]
+
+    def mask(self, index: int, anchor: int) -> Optional[int]:
+        """Cell mask of block `index` at `anchor`, or None if it leaves the padded board."""
+        if 0 <= anchor < self.geometry.size:
+            return self.tables[index][anchor]
+        return None
+
+    def is_aligned(self, mask: int, color: int, direction: str) -> bool:
+        """All block rows/cols fall inside some matching door. Port of canBlockExitThroughDoor()."""
+        for band in self.door_bands.get((color, direction), ()):
+            if not mask & ~band:
+                return True
+        return False
@@ -0,0 +1,81 @@
+"""
+Static dead-state analysis: blocks that can never leave the board.
+
+Checked once per level, before any search, for every color a block must exit
+through (outer layer color, then inner color for layered blocks):
+
+    no-door      no door of that color
+    direction    moveDirection allows no swipe towards any door of that color
+    too-wide     the block spans more rows/columns than every such door's partCount
+    unreachable  no swipe sequence reaches such a door even on an empty board
+                 (hidden cells in the way), from the pattern database
+    ice          iceCount higher than the number of other blocks that can exit
+
+One dead block makes the level unsolvable, so solve(), ida_star() and
+beam_search() return before expanding a single state. During the search
+the same geometric rules apply per state through the pattern database:
+a block whose entry is UNREACHABLE (for example a horizontal-only block
+that lost its outer layer on a row without an inner-color door) prunes
+the branch.
+"""
+
+from typing import Dict, List, Optional
+
+from .board import EDGE_DIRECTION
+from .pattern_db import UNREACHABLE
+
+RULES = ('no-door', 'direction', 'too-wide', 'unreachable', 'ice')
+
+
+def _span(search, index: int, edge: str) -> int:
+    """Rows (left/right doors) or columns (top/bottom doors) the block occupies."""
+    board = search.board
+    anchor = board.initial_anchors()[index]
+    cells = board.geometry.mask_cells(board.mask(index, anchor))
+    axis = 1 if edge in ('top', 'bottom') else 0
+    return len({cell[axis] for cell in cells})
+
+
+def _door_rule(search, index: int, color: int) -> Optional[str]:
+    doors = search.doors.get(color, ())
+    if not doors:
+        return 'no-door'
+    doors = [d for d in doors if EDGE_DIRECTION[d['edge']] in search.board.directions[index]]
+    if not doors:
+        return 'direction'
+    if all(_span(search, index, d['edge']) > d['partCount'] for d in doors):
+        return 'too-wide'
+    return None
+
+
+def dead_blocks(search) -> List[Dict]:
+    """[{blockIndex, rule, color}] for every block that can never exit (empty if none)."""
+    board = search.board
+    dead = []
+    anchors = board.initial_anchors()
+    for i in range(board.block_count):
+        colors = [board.outer_color[i]] + ([board.inner_color[i]] if board.has_layer[i] else [])
+        for color in colors:
+            rule = _door_rule(search, i, color)
+            if rule:
+                dead.append({'blockIndex': i, 'rule': rule, 'color': color})
+                break
+        else:
+            if search.block_cost(i, anchors[i], 0) >= UNREACHABLE:
+                dead.append({'blockIndex': i, 'rule': 'unreachable', 'color': board.outer_color[i]})
+
+    # Ice thaws after iceCount exits: walk the live blocks by iceCount and
+    # count how many can have exited before each one needs to move
+    dead_indices = {d['blockIndex'] for d in dead}
+    exitable = 0
+    for i in sorted((i for i in range(board.block_count) if i not in dead_indices), key=lambda i: board.ice[i]):
+        if board.ice[i] > exitable:
+            dead.append({'blockIndex': i, 'rule': 'ice', 'color': board.outer_color[i]})
+        else:
+            exitable += 1
+    return dead
+
+
+def describe(dead: List[Dict]) -> str:
+    """One-line reason for a solver error."""
+    return 'Unsolvable: ' + ', '.join(f"block {d['blockIndex']} {d['rule']}" for d in dead)
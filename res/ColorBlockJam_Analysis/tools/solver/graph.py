@@ -0,0 +1,234 @@
+"""
+Full move graph of a level, for difficulty analysis rather than solving.
+
+explore() enumerates every state reachable from the start with every legal
+move (no exit-first pruning, unlike the A* search) up to a state budget.
+Every slide length is a separate move, so the graph grows fast: at the
+default budget only the smallest levels of levels_27 (1-5, 10, 25) fit.
+Keeping only the full-length slide of every swipe does not help: the same
+seven levels fit and the others still overflow.
+exits_first=True applies the search's dominance rule (when a block can
+exit, that exit is the only move). It keeps minMoves exact and fits
+level 7 as well, but the other metrics then describe the pruned graph,
+not the moves a player has.
+level_metrics() derives balancing metrics from that graph: branching factor,
+distinct solutions up to k moves, dead-end ratio, forced moves along an
+optimal line and blocks that can exit on the first move.
+
+A level whose graph does not fit the budget gets estimates instead
+('method': 'estimate'): minMoves from the solver (A* within its default
+budget, beam search when A* runs out, see 'strategy'), and branching factor
+and dead-end ratio from random walks (sample_walks()). A walk state counts
+as a dead end when no move is left or the pattern database proves that a
+block can never exit, so the estimated ratio is a lower bound. solutions
+and forcedMoves need the whole graph and stay None.
+"""
+
+from collections import deque
+from typing import Dict, List, Optional
+
+from .board import Board
+from .pattern_db import UNREACHABLE
+from .playout import DEFAULT_DURATION, DEFAULT_MOVE_SECONDS, emulation_rng
+from .search import Search
+from .strategies import DEFAULT_BEAM_WIDTH, solve_with
+
+DEFAULT_GRAPH_STATES = 200000
+DEFAULT_WALKS = 100
+
+
+class StateGraph:
+    """Reachable states as packed keys with child lists (index 0 is the start)."""
+
+    def __init__(self, level: Dict, max_states: int = DEFAULT_GRAPH_STATES, exits_first: bool = False):
+        self.board = board = Board(level)
+        self.search = search = Search(board)
+        start = (tuple(board.initial_anchors()), 0)
+        self.keys: List[int] = [search.key(*start)]
+        self.children: List[List[int]] = []
+        self.goals: List[int] = []
+        self.complete = True
+        self.exits_first = exits_first
+
+        ids = {self.keys[0]: 0}
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            key = self.keys[state]
+            anchors, layers = search.unpack(key)
+            children = []
+            self.children.append(children)
+            if all(a < 0 for a in anchors):
+                self.goals.append(state)
+                continue
+            for i, _, _, na, layer_event in search.successors(anchors, layers, exits_first):
+                child_key = search.child_key(key, i, anchors[i], na, layer_event)
+                child = ids.get(child_key)
+                if child is None:
+                    if len(self.keys) >= max_states:
+                        self.complete = False
+                        continue
+                    child = ids[child_key] = len(self.keys)
+                    self.keys.append(child_key)
+                    queue.append(child)
+                children.append(child)
+            if not self.complete:
+                break
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def expanded(self) -> int:
+        """States whose moves were generated (all of them when complete)."""
+        return len(self.children)
+
+    def distances_to_goal(self) -> List[Optional[int]]:
+        """Fewest moves from every state to a solved board (None = dead end)."""
+        parents: List[List[int]] = [[] for _ in self.keys]
+        for state, children in enumerate(self.children):
+            for child in children:
+                parents[child].append(state)
+        dist: List[Optional[int]] = [None] * len(self.keys)
+        queue = deque(self.goals)
+        for goal in self.goals:
+            dist[goal] = 0
+        while queue:
+            state = queue.popleft()
+            for parent in parents[state]:
+                if dist[parent] is None:
+                    dist[parent] = dist[state] + 1
+                    queue.append(parent)
+        return dist
+
+    def count_solutions(self, k: int, dist: List[Optional[int]]) -> int:
+        """Distinct move sequences of at most k moves that solve the level."""
+        goals = set(self.goals)
+        ways = {0: 1}
+        total = 0
+        for depth in range(1, k + 1):
+            left = k - depth
+            nxt: Dict[int, int] = {}
+            for state, count in ways.items():
+                for child in self.children[state]:
+                    d = dist[child]
+                    if d is not None and d <= left:
+                        nxt[child] = nxt.get(child, 0) + count
+            total += sum(count for state, count in nxt.items() if state in goals)
+            ways = {state: count for state, count in nxt.items() if state not in goals}
+        return total
+
+    def forced_moves(self, dist: List[Optional[int]]) -> int:
+        """Moves along an optimal line where only one move keeps the solution optimal."""
+        state = 0
+        forced = 0
+        while dist[state]:
+            best = [c for c in self.children[state] if dist[c] == dist[state] - 1]
+            forced += len(best) == 1
+            state = best[0]
+        return forced
+
+
+def explore(level: Dict, max_states: int = DEFAULT_GRAPH_STATES, exits_first: bool = False) -> StateGraph:
+    return StateGraph(level, max_states, exits_first)
+
+
+def exit_ready_blocks(graph: StateGraph) -> int:
+    """Blocks that can leave the board with their first move."""
+    anchors, layers = graph.search.unpack(graph.keys[0])
+    return len({i for i, _, _, na, _ in graph.search.successors(anchors, layers, exits_first=False)
+                if na < 0})
+
+
+def sample_walks(level: Dict, search: Search, walks: int = DEFAULT_WALKS, seed: int = 0) -> Dict:
+    """
+    Random walks from the start, each as long as a playout against the level's
+    timer. Returns the average number of legal moves per visited state and the
+    share of visited states that are provably dead; a walk ends at its first
+    dead state.
+    """
+    duration = level.get('duration') or DEFAULT_DURATION
+    max_moves = max(1, int(duration / DEFAULT_MOVE_SECONDS))
+    visited = moves = dead = 0
+    for walk in range(walks):
+        rng = emulation_rng(seed, level.get('id'), 'walk', walk)
+        anchors = tuple(search.board.initial_anchors())
+        layers = 0
+        for _ in range(max_moves):
+            if all(a < 0 for a in anchors):
+                break
+            options = list(search.successors(anchors, layers, exits_first=False))
+            visited += 1
+            moves += len(options)
+            if not options or search.heuristic(anchors, layers) >= UNREACHABLE:
+                dead += 1
+                break
+            i, _, _, na, layer_event = rng.choice(options)
+            anchors = anchors[:i] + (na,) + anchors[i + 1:]
+            layers |= layer_event << i
+    return {
+        'branchingFactor': round(moves / visited, 3) if visited else 0.0,
+        'deadEndRatio': round(dead / visited, 4) if visited else 0.0,
+    }
+
+
+def solver_moves(level: Dict, beam_width: int = DEFAULT_BEAM_WIDTH) -> Dict:
+    """Solution length from A* within its default budget, or from beam search when A* runs out."""
+    result = solve_with('astar', level)
+    if result.get('error') == 'Max states reached':
+        result = solve_with('beam', level, beam_width=beam_width)
+    return result
+
+
+def level_metrics(level: Dict, k: Optional[int] = None,
+                  max_states: int = DEFAULT_GRAPH_STATES, exits_first: bool = False,
+                  walks: int = DEFAULT_WALKS, seed: int = 0) -> Dict:
+    """
+    Difficulty metrics of one level. k defaults to the optimal move count,
+    so 'solutions' is then the number of optimal solutions. walks=0 leaves
+    the metrics of an incomplete graph at None instead of estimating them.
+    """
+    graph = explore(level, max_states, exits_first)
+    goals = set(graph.goals)
+    moves = sum(len(c) for state, c in enumerate(graph.children) if state not in goals)
+    inner = graph.expanded - len(graph.goals)
+    metrics = {
+        'id': level.get('id'),
+        'blocks': graph.board.block_count,
+        'complete': graph.complete,
+        'method': 'graph',
+        'strategy': 'graph',
+        'exitsFirst': exits_first,
+        'states': len(graph),
+        'branchingFactor': round(moves / inner, 3) if inner else 0.0,
+        'exitReady': exit_ready_blocks(graph),
+        'minMoves': None,
+        'k': None,
+        'solutions': None,
+        'deadEndRatio': None,
+        'forcedMoves': None,
+    }
+    if not graph.complete:
+        metrics['strategy'] = None
+        if not walks:
+            return metrics
+        metrics['method'] = 'estimate'
+        metrics.update(sample_walks(level, graph.search, walks, seed))
+        result = solver_moves(level)
+        metrics['strategy'] = result['strategy']
+        if result['isSolvable']:
+            metrics['minMoves'] = result['minMoves']
+        else:
+            metrics['error'] = result.get('error')
+        return metrics
+
+    dist = graph.distances_to_goal()
+    dead = sum(1 for d in dist if d is None)
+    metrics['deadEndRatio'] = round(dead / len(graph), 4)
+    if dist[0] is None:
+        return metrics
+    metrics['minMoves'] = dist[0]
+    metrics['k'] = dist[0] if k is None else k
+    metrics['solutions'] = graph.count_solutions(metrics['k'], dist)
+    metrics['forcedMoves'] = graph.forced_moves(dist)
+    return metrics
@@ -0,0 +1,87 @@
+"""
+Pattern database: exact per-block exit distances on an otherwise empty board.
+
+For every block, anchor and layer state the table holds the fewest swipes
+that block needs to leave the board if it were alone on it (hidden cells
+stay, other blocks and ice are ignored). It is built once per level by a
+reverse BFS over (anchor, destroyed) nodes, where a swipe into an aligned
+door of the current color either removes the outer layer or exits.
+
+Other blocks only shorten swipes and ice only delays them, so a block never
+needs fewer moves than its table entry; one move swipes one block, so the
+sum over blocks is an admissible heuristic. A node from which the block can
+never exit (no reachable door of its color) is UNREACHABLE.
+
+Hidden cells stop swipes but do not remove anchors from the table: some
+exported levels start a block on a hidden cell (level 27), and dropping
+those anchors would prune such a level at the root.
+
+Blocks with the same shape table, colors and allowed directions share one
+table, so lookups are a list index.
+"""
+
+from collections import deque
+from typing import Dict, List, Tuple
+
+UNREACHABLE = 1 << 20
+
+
+class PatternDatabase:
+    """Exit distances of every block of one level, indexed by anchor * 2 + destroyed."""
+
+    def __init__(self, search):
+        board = search.board
+        self.tables: List[List[int]] = []
+        shared: Dict[Tuple, List[int]] = {}
+        for i in range(board.block_count):
+            has_layer = board.has_layer[i]
+            signature = (id(board.tables[i]), board.outer_color[i],
+                         board.inner_color[i] if has_layer else -1, board.directions[i])
+            if signature not in shared:
+                shared[signature] = self._build(search, i)
+            self.tables.append(shared[signature])
+
+    def distance(self, index: int, anchor: int, destroyed: int) -> int:
+        if anchor < 0:
+            return 0
+        return self.tables[index][anchor * 2 + destroyed]
+
+    @staticmethod
+    def _build(search, index: int) -> List[int]:
+        board = search.board
+        layer_states = (0, 1) if board.has_layer[index] else (0,)
+        size = board.geometry.size
+        table = [UNREACHABLE] * (size * 2)
+
+        # Forward edges of the single-block graph, stored reversed for the BFS
+        parents: Dict[int, List[int]] = {}
+        exits = []
+        for anchor in range(size):
+            m = board.mask(index, anchor)
+            if m is None or m & board.outside:
+                continue
+            for destroyed in layer_states:
+                node = anchor * 2 + destroyed
+                exit_now = False
+                for direction in board.directions[index]:
+                    for _, na, event in search._slide(index, anchor, destroyed, direction, board.hidden):
+                        if not event:
+                            parents.setdefault(na * 2 + destroyed, []).append(node)
+                        elif destroyed or not board.has_layer[index]:
+                            exit_now = True
+                        else:
+                            parents.setdefault(na * 2 + 1, []).append(node)
+                if exit_now:
+                    exits.append(node)
+
+        for node in exits:
+            table[node] = 1
+        queue = deque(exits)
+        while queue:
+            node = queue.popleft()
+            distance = table[node] + 1
+            for parent in parents.get(node, ()):
+                if table[parent] == UNREACHABLE:
+                    table[parent] = distance
+                    queue.append(parent)
+        return table
@@ -0,0 +1,132 @@
+"""
+Playout engine: bots play a level against its timer, for lose-rate emulation.
+
+One attempt is a sequence of swipes chosen by a policy until every block has
+left the board (win) or the level's duration runs out (loss); every swipe
+costs `move_seconds` of the timer. An emulation is one bot retrying the
+level until it wins or hits `max_retries`, like a player spending lives.
+
+Policies (POLICIES):
+    random     - any legal swipe, uniformly
+    heuristic  - take an exit if one exists, otherwise the swipe that lowers
+                 the solver's per-block cost the most (random among ties);
+                 with probability `epsilon` a random swipe instead
+
+All randomness comes from one random.Random per emulation, seeded from
+(seed, level id, policy, emulation id), so any emulation can be replayed
+exactly from those four values. With record=True the chosen moves are
+kept as indices into the legal move list, the encoding of replay_log.py.
+"""
+
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .board import Board
+from .search import Search
+
+DEFAULT_MOVE_SECONDS = 2.0
+DEFAULT_DURATION = 300
+DEFAULT_EPSILON = 0.1
+
+Move = Tuple[int, str, int, int, bool]  # (blockIndex, direction, steps, new_anchor, layer_event)
+
+
+def random_policy(search: Search, anchors: Tuple[int, ...], layers: int,
+                  moves: List[Move], rng: random.Random, epsilon: float) -> Move:
+    return rng.choice(moves)
+
+
+def heuristic_policy(search: Search, anchors: Tuple[int, ...], layers: int,
+                     moves: List[Move], rng: random.Random, epsilon: float) -> Move:
+    if rng.random() < epsilon:
+        return rng.choice(moves)
+    exits = [m for m in moves if m[3] < 0]
+    if exits:
+        return rng.choice(exits)
+    best, best_gain = [], None
+    for move in moves:
+        i, _, _, na, layer_event = move
+        destroyed = (layers >> i) & 1
+        gain = (search.block_cost(i, na, destroyed | layer_event)
+                - search.block_cost(i, anchors[i], destroyed))
+        if best_gain is None or gain < best_gain:
+            best, best_gain = [move], gain
+        elif gain == best_gain:
+            best.append(move)
+    return rng.choice(best)
+
+
+POLICIES: Dict[str, Callable] = {
+    'random': random_policy,
+    'heuristic': heuristic_policy,
+}
+
+
+def emulation_rng(seed: int, level_id, policy: str, emulation: int) -> random.Random:
+    """RNG of one emulation; the same arguments always give the same playouts."""
+    return random.Random(f'{seed}:{level_id}:{policy}:{emulation}')
+
+
+class Playout:
+    """Plays one level repeatedly; Board and Search caches are shared by all attempts."""
+
+    def __init__(self, level: Dict, policy: str = 'heuristic',
+                 move_seconds: float = DEFAULT_MOVE_SECONDS, epsilon: float = DEFAULT_EPSILON):
+        self.level = level
+        self.board = Board(level)
+        self.search = Search(self.board)
+        self.policy_name = policy
+        self.policy = POLICIES[policy]
+        self.epsilon = epsilon
+        duration = level.get('duration') or DEFAULT_DURATION
+        self.max_moves = max(1, int(duration / move_seconds))
+
+    def attempt(self, rng: random.Random, record: Optional[List[int]] = None) -> Dict:
+        """
+        One attempt: {'won', 'moves', 'completion'} where completion is the share
+        of blocks that left the board. The index of every chosen move in the
+        legal move list is appended to `record`.
+        """
+        search = self.search
+        anchors = tuple(self.board.initial_anchors())
+        layers = 0
+        total = len(anchors)
+        moves = 0
+        while moves < self.max_moves:
+            if all(a < 0 for a in anchors):
+                break
+            options = list(search.successors(anchors, layers, exits_first=False))
+            if not options:
+                break
+            move = self.policy(search, anchors, layers, options, rng, self.epsilon)
+            i, _, _, na, layer_event = move
+            anchors = anchors[:i] + (na,) + anchors[i + 1:]
+            if layer_event:
+                layers |= 1 << i
+            moves += 1
+            if record is not None:
+                record.append(options.index(move))
+        exited = anchors.count(-1)
+        return {'won': exited == total, 'moves': moves, 'completion': exited / total if total else 1.0}
+
+    def emulate(self, seed: int, emulation: int, max_retries: int, record: bool = False) -> Dict:
+        """
+        Retry until a win or max_retries attempts. Returns losses (lives spent),
+        whether it was won, moves of the winning attempt and the completion of
+        every lost attempt; with record=True also the move indices of every
+        attempt ('attempts').
+        """
+        rng = emulation_rng(seed, self.level.get('id'), self.policy_name, emulation)
+        completions = []
+        attempts = [] if record else None
+        for _ in range(max_retries):
+            moves = [] if record else None
+            result = self.attempt(rng, moves)
+            if record:
+                attempts.append(moves)
+            if result['won']:
+                return {'emulation': emulation, 'won': True, 'losses': len(completions),
+                        'moves': result['moves'], 'completions': completions, 'attempts': attempts}
+            completions.append(result['completion'])
+        return {'emulation': emulation, 'won': False, 'losses': len(completions),
+                'moves': None, 'completions': completions, 'attempts': attempts}
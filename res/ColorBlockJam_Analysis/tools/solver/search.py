@@ -0,0 +1,344 @@
+"""
+A* search over bitboard states.
+
+A state is (anchors, layers):
+  anchors - tuple with one encoded anchor per block, -1 once the block exited
+  layers  - bitmask of blocks whose outer layer is destroyed
+Ice is not stored: a block stays frozen while fewer than iceCount blocks have exited.
+
+One move is one swipe of one block, of any length, exactly as counted by
+the visualizer. A swipe stops on any free cell, or ends when the block
+touches an aligned door of its color (exit, or outer layer removal).
+"""
+
+import heapq
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .board import Board
+from .dead_state import dead_blocks, describe
+from .pattern_db import UNREACHABLE, PatternDatabase
+from .transposition import DEFAULT_TABLE_MB, TranspositionTable, Zobrist
+
+DEFAULT_MAX_STATES = 50000
+# Measured size of one open-list entry with its path node (tracemalloc, CPython 3)
+OPEN_ENTRY_BYTES = 400
+
+State = Tuple[Tuple[int, ...], int]
+Move = Tuple[int, str, int]  # (blockIndex, direction, steps)
+
+
+class Search:
+    """Move generation, state keys and heuristic for one level."""
+
+    def __init__(self, board: Board):
+        self.board = board
+        n = board.block_count
+        self.anchor_bits = (board.stride * board.rows + 1).bit_length()
+        self.layer_shift = n * self.anchor_bits
+        self.shifts = [i * self.anchor_bits for i in range(n)]
+        self._aligned: List[Dict[Tuple[int, int, str], bool]] = [{} for _ in range(n)]
+        self._pattern_db: Optional[PatternDatabase] = None
+        self._distance: List[Dict[Tuple[int, int], int]] = [{} for _ in range(n)]
+        self.doors: Dict[int, List[Dict]] = {}
+        for door in board.level['doors']:
+            self.doors.setdefault(door['blockType'], []).append(door)
+
+    def key(self, anchors: Tuple[int, ...], layers: int) -> int:
+        """Pack a state into one int (anchor+1 per block, 0 = exited, then layer bits)."""
+        k = layers << self.layer_shift
+        for a, shift in zip(anchors, self.shifts):
+            k |= (a + 1) << shift
+        return k
+
+    def unpack(self, key: int) -> State:
+        mask = (1 << self.anchor_bits) - 1
+        anchors = []
+        for _ in range(self.board.block_count):
+            anchors.append((key & mask) - 1)
+            key >>= self.anchor_bits
+        return tuple(anchors), key
+
+    def child_key(self, key: int, index: int, old_anchor: int, new_anchor: int, layer_event: bool) -> int:
+        """Key of a successor that differs from `key` only in block `index`."""
+        shift = self.shifts[index]
+        key ^= ((old_anchor + 1) ^ (new_anchor + 1)) << shift
+        if layer_event:
+            key |= 1 << (self.layer_shift + index)
+        return key
+
+    def aligned(self, index: int, anchor: int, destroyed: int, direction: str) -> bool:
+        cache = self._aligned[index]
+        k = (anchor, destroyed, direction)
+        if k not in cache:
+            board = self.board
+            color = board.inner_color[index] if destroyed else board.outer_color[index]
+            cache[k] = board.is_aligned(board.mask(index, anchor), color, direction)
+        return cache[k]
+
+    @property
+    def pattern_db(self) -> PatternDatabase:
+        """Per-block exit distances, built on first use."""
+        if self._pattern_db is None:
+            self._pattern_db = PatternDatabase(self)
+        return self._pattern_db
+
+    def block_cost(self, index: int, anchor: int, destroyed: int) -> int:
+        """
+        Lower bound on moves block `index` still needs: its swipes to exit on an
+        empty board (pattern_db), UNREACHABLE if it can never exit.
+        """
+        if anchor < 0:
+            return 0
+        return self.pattern_db.tables[index][anchor * 2 + destroyed]
+
+    def heuristic(self, anchors: Tuple[int, ...], layers: int) -> int:
+        """Admissible lower bound: sum of block_cost() over blocks still on the board."""
+        return sum(self.block_cost(i, a, (layers >> i) & 1) for i, a in enumerate(anchors))
+
+    def door_distance(self, index: int, anchor: int, destroyed: int) -> int:
+        """
+        Cells between block `index` and the nearest door of its color, plus 1 for an
+        intact layer. Port of heuristic() in the visualizer (10 when there is no door).
+        """
+        if anchor < 0:
+            return 0
+        cache = self._distance[index]
+        k = (anchor, destroyed)
+        if k not in cache:
+            board = self.board
+            color = board.inner_color[index] if destroyed else board.outer_color[index]
+            cells = board.geometry.mask_cells(board.mask(index, anchor))
+            best = None
+            for door in self.doors.get(color, ()):
+                first = door['startCol'] if door['edge'] in ('top', 'bottom') else door['startRow']
+                last = first + door['partCount'] - 1
+                for row, col in cells:
+                    along, across = (row, col) if door['edge'] in ('top', 'bottom') else (col, row)
+                    if door['edge'] == 'top' or door['edge'] == 'left':
+                        dist = along + 1
+                    else:
+                        dist = (board.height if door['edge'] == 'bottom' else board.width) - along
+                    if not first <= across <= last:
+                        dist += min(abs(across - first), abs(across - last))
+                    best = dist if best is None else min(best, dist)
+            cost = 10 if best is None else best
+            if board.has_layer[index] and not destroyed:
+                cost += 1
+            cache[k] = cost
+        return cache[k]
+
+    def distance_heuristic(self, anchors: Tuple[int, ...], layers: int) -> int:
+        """Visualizer heuristic: sum of door_distance(). Not admissible, but a good ordering."""
+        return sum(self.door_distance(i, a, (layers >> i) & 1) for i, a in enumerate(anchors))
+
+    def successors(self, anchors: Tuple[int, ...], layers: int,
+                   exits_first: bool = True) -> Iterator[Tuple[int, str, int, int, bool]]:
+        """
+        Yield (blockIndex, direction, steps, new_anchor, layer_event) for every move.
+
+        new_anchor is -1 when the block exits. If some block can leave the board
+        right now only that exit is yielded: exiting early frees cells and thaws
+        ice sooner, so it never costs moves. exits_first=False yields every legal
+        move instead (for analysing the full move graph).
+        """
+        board = self.board
+        exited = anchors.count(-1)
+        occupancy = 0
+        masks = []
+        for i, a in enumerate(anchors):
+            m = board.mask(i, a) if a >= 0 else 0
+            masks.append(m)
+            occupancy |= m
+
+        movable = [i for i, a in enumerate(anchors) if a >= 0 and board.ice[i] <= exited]
+
+        for i in (movable if exits_first else ()):
+            destroyed = (layers >> i) & 1
+            if board.has_layer[i] and not destroyed:
+                continue
+            obstacles = (occupancy ^ masks[i]) | board.hidden
+            for direction in board.directions[i]:
+                if not self.aligned(i, anchors[i], destroyed, direction):
+                    continue
+                for steps, _, event in self._slide(i, anchors[i], destroyed, direction, obstacles):
+                    if event:
+                        yield i, direction, steps, -1, False
+                        return
+
+        for i in movable:
+            a = anchors[i]
+            obstacles = (occupancy ^ masks[i]) | board.hidden
+            destroyed = (layers >> i) & 1
+            exits = not board.has_layer[i] or destroyed
+            for direction in board.directions[i]:
+                for steps, na, event in self._slide(i, a, destroyed, direction, obstacles):
+                    if event and exits:
+                        # Only reached with exits_first=False, otherwise exits were handled above
+                        yield i, direction, steps, -1, False
+                    else:
+                        yield i, direction, steps, na, event
+
+    def _slide(self, index, anchor, destroyed, direction, obstacles):
+        """
+        Yield (steps, anchor, event) for every stop of a swipe. Port of applyMove().
+
+        event=True means the block touched an aligned door of its color on this
+        step; the block stays at the previous anchor and the swipe ends.
+        """
+        board = self.board
+        color = board.inner_color[index] if destroyed else board.outer_color[index]
+        delta = board.deltas[direction]
+        door_cells = board.exit_masks.get((color, direction), 0) | board.outside
+        steps = 0
+        while True:
+            aligned = self.aligned(index, anchor, destroyed, direction)
+            anchor += delta
+            steps += 1
+            m = board.mask(index, anchor)
+            if m is None:
+                return
+            if aligned:
+                exiting = m & door_cells
+                if m & ~exiting & obstacles:
+                    return
+                if exiting:
+                    yield steps, anchor - delta, True
+                    return
+            elif m & (door_cells | obstacles):
+                return
+            yield steps, anchor, False
+
+
+def format_moves(path: List[Move]) -> List[Dict]:
+    """Convert internal moves to the visualizer's {blockIndex, direction, steps} records."""
+    return [{'blockIndex': i, 'direction': d, 'steps': s} for i, d, s in path]
+
+
+def _trim_open(open_heap: List, table: TranspositionTable, keep: int) -> Tuple[List, Optional[float]]:
+    """
+    Shrink the open list to at most `keep` entries: first drop entries already
+    reached with fewer moves, then the ones with the highest f.
+    Returns the new heap and the lowest f that was dropped (None if none was).
+    """
+    live = []
+    for entry in open_heap:
+        stored = table.depth(entry[4])
+        if stored is None or stored >= -entry[1]:
+            live.append(entry)
+    if len(live) <= keep:
+        heapq.heapify(live)
+        return live, None
+    live.sort()  # a sorted list is a valid heap
+    return live[:keep], live[keep][0]
+
+
+def solve(level: Dict, max_states: int = DEFAULT_MAX_STATES,
+          time_limit: Optional[float] = None, weight: float = 1.0,
+          table_mb: float = DEFAULT_TABLE_MB) -> Dict:
+    """
+    Find a minimal-move solution with A*.
+
+    weight > 1 runs weighted A* (f = g + weight * h): much faster on big
+    levels, and the solution is at most `weight` times longer than optimal.
+
+    Visited states go to a TranspositionTable capped at `table_mb`
+    (and at 8 slots per allowed state - about 5 get used - so small
+    budgets stay small).
+    An evicted state may be expanded again; the search stays correct.
+
+    The open list gets the same memory budget. When it outgrows it,
+    superseded entries are dropped, then the worst half by f. A solution
+    no longer than the lowest dropped f is still optimal; a longer one is
+    returned with optimal=False, and an open list that runs empty after
+    a trim ends with 'Open list limit reached' instead of proving that
+    there is no solution.
+
+    Returns the same fields as solve() in brute_force_visualizer.html:
+    isSolvable, minMoves, solution, statesExplored, searchTime (ms), error,
+    plus 'table' with transposition table counters and 'openDropped'.
+    """
+    start_time = time.perf_counter()
+    board = Board(level)
+    search = Search(board)
+    zobrist = Zobrist(board.block_count, board.geometry.size)
+    table = TranspositionTable(table_mb, max_entries=max_states * 8)
+    open_limit = max(1024, int(table_mb * 1024 * 1024) // OPEN_ENTRY_BYTES)
+
+    start = (tuple(board.initial_anchors()), 0)
+    start_key = search.key(*start)
+    start_hash = zobrist.hash(*start)
+    table.visit(start_hash, 0)
+    counter = 0
+    # Heap entries: (f, -g, tiebreak, packed state, zobrist hash, path node)
+    # A path node is (parent node, move), so no state keeps a copied path
+    open_heap = [(weight * search.heuristic(*start), 0, counter, start_key, start_hash, None)]
+    states_explored = 0
+    open_dropped = 0
+    dropped_f = None
+    error = 'No solution found'
+
+    def result(**fields):
+        fields['statesExplored'] = states_explored
+        fields['searchTime'] = (time.perf_counter() - start_time) * 1000
+        fields['table'] = table.stats()
+        fields['openDropped'] = open_dropped
+        return fields
+
+    dead = dead_blocks(search)
+    if dead:
+        return result(isSolvable=False, error=describe(dead), deadBlocks=dead)
+
+    while open_heap:
+        _, neg_g, _, key, zhash, node = heapq.heappop(open_heap)
+        g = -neg_g
+        stored = table.depth(zhash)
+        if stored is not None and stored < g:
+            continue  # reached again with fewer moves after this entry was pushed
+        anchors, layers = search.unpack(key)
+
+        if all(a < 0 for a in anchors):
+            path = []
+            while node is not None:
+                node, move = node
+                path.append(move)
+            path.reverse()
+            if dropped_f is not None and dropped_f < g:
+                # A dropped entry might have led to a shorter solution
+                return result(isSolvable=True, minMoves=len(path), solution=format_moves(path), optimal=False)
+            return result(isSolvable=True, minMoves=len(path), solution=format_moves(path))
+
+        if states_explored >= max_states:
+            error = 'Max states reached'
+            break
+        if time_limit is not None and time.perf_counter() - start_time > time_limit:
+            error = 'Time limit reached'
+            break
+        states_explored += 1
+
+        h = search.heuristic(anchors, layers)
+        for i, direction, steps, na, layer_event in search.successors(anchors, layers):
+            a = anchors[i]
+            destroyed = (layers >> i) & 1
+            next_h = h - search.block_cost(i, a, destroyed) + search.block_cost(i, na, destroyed | layer_event)
+            if next_h >= UNREACHABLE:
+                continue  # some block can no longer reach a door of its color
+            next_hash = zobrist.update(zhash, i, a, na, layer_event)
+            if not table.visit(next_hash, g + 1):
+                continue
+            counter += 1
+            # Ties go to the deeper node so solutions surface early
+            heapq.heappush(open_heap, (g + 1 + weight * next_h, -(g + 1), counter,
+                                       search.child_key(key, i, a, na, layer_event), next_hash,
+                                       (node, (i, direction, steps))))
+
+        if len(open_heap) > open_limit:
+            before = len(open_heap)
+            open_heap, lowest = _trim_open(open_heap, table, open_limit // 2)
+            open_dropped += before - len(open_heap)
+            if lowest is not None:
+                dropped_f = lowest if dropped_f is None else min(dropped_f, lowest)
+
+    if error == 'No solution found' and dropped_f is not None:
+        error = 'Open list limit reached'
+    return result(isSolvable=False, error=error)
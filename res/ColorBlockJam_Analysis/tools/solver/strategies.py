@@ -0,0 +1,247 @@
+"""
+Search strategies with memory linear in solution depth, for deep levels.
+
+    astar  solve() from search.py: optimal, memory grows with explored states
+    ida    IDA*: depth-first iterations on f = g + heuristic() with a growing
+           bound. Optimal; keeps only the current path plus a fixed-size
+           transposition table (salted per iteration) that stops re-expanding
+           states within an iteration.
+    beam   Layered beam search: all moves of the kept states, then only the
+           `beam_width` children with the lowest visualizer distance heuristic
+           survive to the next layer. Not optimal, but finds solutions of deep
+           levels quickly; memory is beam_width states per layer.
+
+IDA* and beam run without a state cap by default (max_states=None) and stop
+on time_limit; solve_with() picks a strategy by name with the same result
+fields as solve(), plus 'strategy' and 'optimal'. solve_one() wraps it as a
+process-pool worker for the batch tools.
+"""
+
+import random
+import time
+from typing import Dict, List, Optional
+
+from .board import Board
+from .dead_state import dead_blocks, describe
+from .pattern_db import UNREACHABLE
+from .search import DEFAULT_MAX_STATES, Search, format_moves, solve
+from .transposition import DEFAULT_TABLE_MB, TranspositionTable, Zobrist
+
+DEFAULT_BEAM_WIDTH = 2000
+DEFAULT_IDA_TABLE_MB = 64
+STRATEGIES = ('astar', 'ida', 'beam')
+
+FOUND = -1
+
+
+class _Stop(Exception):
+    """Budget exhausted inside the IDA* recursion."""
+
+
+def _is_goal(anchors) -> bool:
+    return all(a < 0 for a in anchors)
+
+
+def ida_star(level: Dict, max_states: Optional[int] = None, time_limit: Optional[float] = None,
+             table_mb: float = DEFAULT_IDA_TABLE_MB) -> Dict:
+    """Optimal solution by iterative deepening A* on the admissible heuristic()."""
+    start_time = time.perf_counter()
+    board = Board(level)
+    search = Search(board)
+    zobrist = Zobrist(board.block_count, board.geometry.size)
+    table = TranspositionTable(table_mb)
+    salt_rng = random.Random(0)
+    path: List = []
+    states_explored = 0
+    iterations = 0
+
+    def dfs(anchors, layers, zhash, g, h, bound, salt):
+        nonlocal states_explored
+        f = g + h
+        if f > bound:
+            return f
+        if _is_goal(anchors):
+            return FOUND
+        if max_states is not None and states_explored >= max_states:
+            raise _Stop('Max states reached')
+        if time_limit is not None and time.perf_counter() - start_time > time_limit:
+            raise _Stop('Time limit reached')
+        states_explored += 1
+
+        children = []
+        for i, direction, steps, na, layer_event in search.successors(anchors, layers):
+            destroyed = (layers >> i) & 1
+            child_h = h - search.block_cost(i, anchors[i], destroyed) + \
+                search.block_cost(i, na, destroyed | layer_event)
+            if child_h >= UNREACHABLE:
+                continue
+            child_hash = zobrist.update(zhash, i, anchors[i], na, layer_event)
+            if not table.visit(child_hash ^ salt, g + 1):
+                continue  # already reached in this iteration with as few moves
+            children.append((child_h, i, direction, steps, na, layer_event, child_hash))
+        children.sort(key=lambda c: c[0])
+
+        minimum = None
+        for child_h, i, direction, steps, na, layer_event, child_hash in children:
+            path.append((i, direction, steps))
+            t = dfs(anchors[:i] + (na,) + anchors[i + 1:], layers | (layer_event << i),
+                    child_hash, g + 1, child_h, bound, salt)
+            if t == FOUND:
+                return FOUND
+            path.pop()
+            if t is not None and (minimum is None or t < minimum):
+                minimum = t
+        return minimum
+
+    anchors = tuple(board.initial_anchors())
+    zhash = zobrist.hash(anchors, 0)
+    h = search.heuristic(anchors, 0)
+    bound = h
+    error = 'No solution found'
+    solved = False
+    dead = dead_blocks(search)
+    if dead:
+        error = describe(dead)
+        bound = None
+    try:
+        # A bound of UNREACHABLE or more means some block can never exit
+        while bound is not None and bound < UNREACHABLE:
+            iterations += 1
+            salt = salt_rng.getrandbits(64)
+            table.visit(zhash ^ salt, 0)
+            t = dfs(anchors, 0, zhash, 0, h, bound, salt)
+            if t == FOUND:
+                solved = True
+                break
+            bound = t
+    except _Stop as e:
+        error = str(e)
+
+    result = {
+        'statesExplored': states_explored,
+        'searchTime': (time.perf_counter() - start_time) * 1000,
+        'table': table.stats(),
+        'iterations': iterations,
+    }
+    if solved:
+        result.update(isSolvable=True, minMoves=len(path), solution=format_moves(path))
+    else:
+        result.update(isSolvable=False, error=error)
+        if dead:
+            result['deadBlocks'] = dead
+    return result
+
+
+def beam_search(level: Dict, beam_width: int = DEFAULT_BEAM_WIDTH, max_states: Optional[int] = None,
+                time_limit: Optional[float] = None) -> Dict:
+    """Layer-by-layer search keeping the `beam_width` most promising states per layer."""
+    start_time = time.perf_counter()
+    board = Board(level)
+    search = Search(board)
+    start = (tuple(board.initial_anchors()), 0)
+    start_key = search.key(*start)
+    seen = {start_key}  # every state kept so far: beam_width per layer
+    # Per layer: (parent index in the previous layer, move) of every kept state
+    history: List[List] = []
+    # Kept states: (key, anchors, layers, (distance heuristic, heuristic))
+    frontier = [(start_key, start[0], start[1],
+                 (search.distance_heuristic(*start), search.heuristic(*start)))]
+    states_explored = 0
+    error = 'Beam exhausted'
+
+    def result(**fields):
+        fields['statesExplored'] = states_explored
+        fields['searchTime'] = (time.perf_counter() - start_time) * 1000
+        fields['beamWidth'] = beam_width
+        return fields
+
+    dead = dead_blocks(search)
+    if dead:
+        return result(isSolvable=False, error=describe(dead), deadBlocks=dead)
+
+    while frontier:
+        candidates = []
+        layer_seen = set()
+        for parent, (key, anchors, layers, (dist, h)) in enumerate(frontier):
+            if max_states is not None and states_explored >= max_states:
+                return result(isSolvable=False, error='Max states reached')
+            if time_limit is not None and time.perf_counter() - start_time > time_limit:
+                return result(isSolvable=False, error='Time limit reached')
+            states_explored += 1
+            for i, direction, steps, na, layer_event in search.successors(anchors, layers):
+                child_key = search.child_key(key, i, anchors[i], na, layer_event)
+                if child_key in seen or child_key in layer_seen:
+                    continue
+                layer_seen.add(child_key)
+                child = (anchors[:i] + (na,) + anchors[i + 1:], layers | (layer_event << i))
+                move = (parent, (i, direction, steps))
+                if _is_goal(child[0]):
+                    history.append([move])
+                    return result(isSolvable=True, minMoves=len(history),
+                                  solution=format_moves(_beam_path(history)))
+                destroyed = (layers >> i) & 1
+                a, after = anchors[i], destroyed | layer_event
+                score = (dist - search.door_distance(i, a, destroyed) + search.door_distance(i, na, after),
+                         h - search.block_cost(i, a, destroyed) + search.block_cost(i, na, after))
+                if score[1] >= UNREACHABLE:
+                    continue
+                candidates.append((score, len(candidates), child_key, child, move))
+        candidates.sort()
+        kept = candidates[:beam_width]
+        history.append([c[4] for c in kept])
+        frontier = [(c[2], c[3][0], c[3][1], c[0]) for c in kept]
+        seen.update(c[2] for c in kept)
+
+    return result(isSolvable=False, error=error)
+
+
+def _beam_path(history: List[List]) -> List:
+    """Walk parent indices back from the goal (last entry of the last layer)."""
+    path = []
+    index = len(history[-1]) - 1
+    for layer in reversed(history):
+        parent, move = layer[index]
+        path.append(move)
+        index = parent
+    path.reverse()
+    return path
+
+
+def solve_with(strategy: str, level: Dict, max_states: Optional[int] = None,
+               time_limit: Optional[float] = None, weight: float = 1.0,
+               table_mb: float = DEFAULT_TABLE_MB, beam_width: int = DEFAULT_BEAM_WIDTH) -> Dict:
+    """
+    Run one strategy. max_states=None means DEFAULT_MAX_STATES for A* and no cap
+    for IDA* and beam search.
+    """
+    if strategy == 'astar':
+        result = solve(level, max_states=max_states or DEFAULT_MAX_STATES, time_limit=time_limit,
+                       weight=weight, table_mb=table_mb)
+        optimal = weight <= 1
+    elif strategy == 'ida':
+        result = ida_star(level, max_states, time_limit, min(table_mb, DEFAULT_IDA_TABLE_MB))
+        optimal = True
+    elif strategy == 'beam':
+        result = beam_search(level, beam_width, max_states, time_limit)
+        optimal = False
+    else:
+        raise ValueError(f'Unknown strategy {strategy!r} (expected one of {", ".join(STRATEGIES)})')
+    result['strategy'] = strategy
+    result['optimal'] = optimal and result['isSolvable']
+    return result
+
+
+def solve_one(task) -> Dict:
+    """
+    Worker entry point: solve one level with its own budget. task is
+    (level, strategy, max_states, time_limit, weight, table_mb, beam_width).
+    """
+    level, strategy, max_states, time_limit, weight, table_mb, beam_width = task
+    try:
+        result = solve_with(strategy, level, max_states=max_states, time_limit=time_limit, weight=weight,
+                            table_mb=table_mb, beam_width=beam_width)
+    except Exception as e:
+        result = {'isSolvable': False, 'statesExplored': 0, 'searchTime': 0, 'error': f'Crash: {e}'}
+    result['id'] = level['id']
+    result['name'] = level['name']
+    return result
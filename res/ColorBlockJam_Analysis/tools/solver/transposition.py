@@ -0,0 +1,136 @@
+"""
+Zobrist hashing and a fixed-size transposition table for the search.
+
+The table replaces the visualizer's unbounded `visited` Set. Memory is
+allocated once from a ceiling in MB; each slot holds a 64-bit Zobrist key,
+the best depth (moves) the state was reached with, and an LRU stamp.
+Slots are grouped in 4-way buckets and a full bucket evicts its least
+recently used entry.
+"""
+
+import random
+from array import array
+from typing import Optional
+
+# Bytes per slot: 8 (key) + 2 (depth) + 4 (LRU stamp)
+SLOT_BYTES = 14
+WAYS = 4
+DEFAULT_TABLE_MB = 256
+MAX_DEPTH = 0xFFFF
+
+
+class Zobrist:
+    """
+    Random 64-bit keys per (block, anchor), per exited block and per removed layer.
+
+    Ice is not hashed separately: iceCount only depends on how many blocks
+    have exited, which the exited keys already cover.
+    """
+
+    def __init__(self, block_count: int, anchor_count: int, seed: int = 0x5EED):
+        rng = random.Random(seed)
+        self.position = [[rng.getrandbits(64) for _ in range(anchor_count)] for _ in range(block_count)]
+        self.exited = [rng.getrandbits(64) for _ in range(block_count)]
+        self.layer = [rng.getrandbits(64) for _ in range(block_count)]
+
+    def hash(self, anchors, layers: int) -> int:
+        h = 0
+        for i, a in enumerate(anchors):
+            h ^= self.position[i][a] if a >= 0 else self.exited[i]
+            if (layers >> i) & 1:
+                h ^= self.layer[i]
+        return h
+
+    def update(self, h: int, index: int, old_anchor: int, new_anchor: int, layer_event: bool) -> int:
+        """Hash of a child state that differs from the parent only in block `index`."""
+        h ^= self.position[index][old_anchor]
+        h ^= self.position[index][new_anchor] if new_anchor >= 0 else self.exited[index]
+        if layer_event:
+            h ^= self.layer[index]
+        return h
+
+
+class TranspositionTable:
+    """Bounded set of visited states with their best depth."""
+
+    def __init__(self, memory_mb: float = DEFAULT_TABLE_MB, max_entries: Optional[int] = None):
+        slots = max(WAYS, int(memory_mb * 1024 * 1024) // SLOT_BYTES)
+        if max_entries is not None:
+            slots = min(slots, max(WAYS, max_entries))
+        buckets = 1
+        while buckets * 2 * WAYS <= slots:
+            buckets *= 2
+        self.capacity = buckets * WAYS
+        self.bucket_mask = buckets - 1
+
+        self.keys = array('Q', bytes(8 * self.capacity))
+        self.depths = array('H', bytes(2 * self.capacity))
+        self.stamps = array('I', bytes(4 * self.capacity))
+        self.clock = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def visit(self, key: int, depth: int) -> bool:
+        """
+        Record that the state `key` was reached in `depth` moves.
+        Returns False if it was already stored with depth <= `depth` (prune it).
+        """
+        key = key or 1  # 0 marks an empty slot
+        depth = min(depth, MAX_DEPTH)
+        keys = self.keys
+        self.clock = clock = (self.clock + 1) & 0xFFFFFFFF
+        base = (key & self.bucket_mask) * WAYS
+        victim = base
+        oldest = None
+        for slot in range(base, base + WAYS):
+            k = keys[slot]
+            if k == key:
+                self.hits += 1
+                self.stamps[slot] = clock
+                if self.depths[slot] <= depth:
+                    return False
+                self.depths[slot] = depth
+                return True
+            if k == 0:
+                # Buckets fill front to back, so the key is not further on
+                victim = slot
+                oldest = None
+                break
+            stamp = self.stamps[slot]
+            if oldest is None or stamp < oldest:
+                oldest = stamp
+                victim = slot
+
+        self.misses += 1
+        if keys[victim]:
+            self.evictions += 1
+        keys[victim] = key
+        self.depths[victim] = depth
+        self.stamps[victim] = clock
+        self.stores += 1
+        return True
+
+    def depth(self, key: int) -> Optional[int]:
+        """Stored depth of `key`, or None if it is not (or no longer) in the table."""
+        key = key or 1
+        base = (key & self.bucket_mask) * WAYS
+        for slot in range(base, base + WAYS):
+            if self.keys[slot] == key:
+                return self.depths[slot]
+            if self.keys[slot] == 0:
+                break
+        return None
+
+    def stats(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'memoryMB': round(self.capacity * SLOT_BYTES / (1024 * 1024), 1),
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+        }
+
@@ -0,0 +1,61 @@
+"""
+Regression checks for the headless solver.
+
+Usage:
+    cd res/ColorBlockJam_Analysis/tools
+    python -m pytest -q test_solver.py
+"""
+
+import pytest
+
+from level_geometry import GridGeometry
+from solver import Board, Search, dead_blocks, level_metrics, load_levels, solve
+
+# Optimal move counts of levels_27.json (A*, default budget)
+KNOWN_MOVES = {6: 17, 9: 24, 12: 21, 19: 29, 22: 30}
+
+
+@pytest.fixture(scope='module')
+def levels():
+    return {level['id']: level for level in load_levels()}
+
+
+def test_left_door_on_board_edge():
+    geometry = GridGeometry(6, 9)
+    door = {'edge': 'left', 'startRow': 3, 'startCol': 0, 'partCount': 2}
+    assert geometry.door_cells_mask(door) == geometry.bit(3, -1) | geometry.bit(4, -1)
+
+
+def test_inner_left_door():
+    # Level 19: column 0 is hidden next to the door, blocks exit into it
+    geometry = GridGeometry(6, 9)
+    door = {'edge': 'left', 'startRow': 3, 'startCol': 1, 'partCount': 2}
+    assert geometry.door_cells_mask(door) == geometry.bit(3, 0) | geometry.bit(4, 0)
+
+
+def test_inner_right_door():
+    geometry = GridGeometry(6, 9)
+    door = {'edge': 'right', 'startRow': 3, 'startCol': 4, 'partCount': 2}
+    assert geometry.door_cells_mask(door) == geometry.bit(3, 5) | geometry.bit(4, 5)
+
+
+@pytest.mark.parametrize('level_id', [19, 22])
+def test_inner_door_levels_have_no_dead_blocks(levels, level_id):
+    assert dead_blocks(Search(Board(levels[level_id]))) == []
+
+
+@pytest.mark.parametrize('level_id,moves', sorted(KNOWN_MOVES.items()))
+def test_known_optimum(levels, level_id, moves):
+    result = solve(levels[level_id])
+    assert result['isSolvable'], result.get('error')
+    assert result['minMoves'] == moves
+    assert len(result['solution']) == moves
+
+
+def test_metrics_estimated_when_graph_does_not_fit(levels):
+    metrics = level_metrics(levels[6], max_states=1000, walks=5)
+    assert not metrics['complete']
+    assert metrics['method'] == 'estimate'
+    assert metrics['strategy'] == 'astar'
+    assert metrics['minMoves'] == KNOWN_MOVES[6]
+    assert metrics['deadEndRatio'] is not None
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Offset index of level MonoBehaviours in a Unity .assets file.
+
+The asset file is memory-mapped and only its SerializedFile header, type
+table and object table are read. For every MonoBehaviour the m_Name at
+0x1C is peeked straight from the mapping, and matching level objects are
+recorded as (pathId, offset, size, name). The index is cached next to
+level_index.json, so later runs slice the level objects out of the mapping
+without loading the whole bundle through UnityPy.
+
+Usage:
+    python unity_asset_index.py <path/to/_combined_sharedassets2.assets>
+    python unity_asset_index.py <assets> --rebuild
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+from typing import Dict, List, Optional, Tuple
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+INDEX_PATH = os.path.join(BASE_DIR, 'level_data', 'level_object_index.json')
+
+INDEX_VERSION = 1
+MONO_BEHAVIOUR_CLASS_ID = 114
+# MonoBehaviour layout: m_GameObject PPtr (12) + m_Enabled (aligned, 4) + m_Script PPtr (12)
+NAME_OFFSET = 0x1C
+
+# Match "Level X", "Level XX", "Level XXX" etc., or variants like "Derin Level X"
+LEVEL_NAME_PATTERN = re.compile(r'Level \d+$')
+
+
+class UnsupportedAssetFormat(Exception):
+    """SerializedFile version this reader does not handle (UnityPy is used instead)."""
+
+
+class _Reader:
+    """Minimal cursor over a buffer with switchable endianness."""
+
+    def __init__(self, buf, offset: int = 0, endian: str = '>'):
+        self.buf = buf
+        self.offset = offset
+        self.endian = endian
+
+    def unpack(self, fmt: str):
+        value = struct.unpack_from(self.endian + fmt, self.buf, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return value[0] if len(value) == 1 else value
+
+    def skip(self, count: int):
+        self.offset += count
+
+    def align(self, size: int = 4):
+        self.offset = (self.offset + size - 1) // size * size
+
+    def cstring(self) -> str:
+        end = self.buf.find(b'\0', self.offset)
+        s = bytes(self.buf[self.offset:end]).decode('utf-8', errors='replace')
+        self.offset = end + 1
+        return s
+
+
+def read_object_table(buf) -> Tuple[List[Tuple[int, int, int, int]], Dict]:
+    """
+    Parse the SerializedFile header, type table and object table.
+    Returns ([(pathId, classId, offset, size), ...], header) with absolute offsets.
+    Supports format versions 17+ (Unity 2017.x and newer).
+    """
+    r = _Reader(buf)
+    metadata_size, file_size, version, data_offset = r.unpack('IIII')
+    if version < 17:
+        raise UnsupportedAssetFormat(f'SerializedFile version {version}')
+    endianness = r.unpack('B')
+    r.skip(3)
+    if version >= 22:
+        metadata_size, file_size, data_offset = r.unpack('IQQ')
+        r.skip(8)
+    r.endian = '>' if endianness else '<'
+
+    unity_version = r.cstring()
+    r.unpack('i')  # targetPlatform
+    type_tree_enabled = r.unpack('?')
+
+    class_ids = []
+    for _ in range(r.unpack('i')):
+        class_id = r.unpack('i')
+        r.skip(1 + 2)  # isStrippedType, scriptTypeIndex
+        if class_id == MONO_BEHAVIOUR_CLASS_ID:
+            r.skip(16)  # scriptID
+        r.skip(16)  # oldTypeHash
+        if type_tree_enabled:
+            node_count, string_size = r.unpack('ii')
+            r.skip(node_count * (32 if version >= 19 else 24) + string_size)
+            if version >= 21:
+                r.skip(4 * r.unpack('i'))  # typeDependencies
+        class_ids.append(class_id)
+
+    objects = []
+    for _ in range(r.unpack('i')):
+        r.align(4)
+        path_id = r.unpack('q')
+        byte_start = r.unpack('q' if version >= 22 else 'I')
+        byte_size, type_index = r.unpack('Ii')
+        objects.append((path_id, class_ids[type_index], data_offset + byte_start, byte_size))
+
+    header = {
+        'serializedVersion': version,
+        'unityVersion': unity_version,
+        'dataOffset': data_offset,
+    }
+    return objects, header
+
+
+def peek_name(buf, offset: int, size: int) -> str:
+    """m_Name of a MonoBehaviour without decoding the rest of the object."""
+    if size < NAME_OFFSET + 4:
+        return ''
+    name_len = struct.unpack_from('<i', buf, offset + NAME_OFFSET)[0]
+    if not 5 <= name_len <= 30 or NAME_OFFSET + 4 + name_len > size:
+        return ''
+    start = offset + NAME_OFFSET + 4
+    return bytes(buf[start:start + name_len]).decode('utf-8', errors='ignore')
+
+
+def scan_levels(buf) -> Tuple[List[Dict], Dict]:
+    """Index level MonoBehaviours of a mapped asset file."""
+    objects, header = read_object_table(buf)
+    entries = []
+    for path_id, class_id, offset, size in objects:
+        if class_id != MONO_BEHAVIOUR_CLASS_ID:
+            continue
+        name = peek_name(buf, offset, size)
+        if LEVEL_NAME_PATTERN.search(name):
+            entries.append({'pathId': path_id, 'offset': offset, 'size': size, 'name': name})
+    return entries, header
+
+
+def scan_levels_unitypy(assets_path: str) -> Tuple[List[Dict], Dict]:
+    """Fallback index built through UnityPy for formats read_object_table() does not support."""
+    import UnityPy
+
+    env = UnityPy.load(assets_path)
+    entries = []
+    for obj in env.objects:
+        if obj.type.name != 'MonoBehaviour':
+            continue
+        raw = obj.get_raw_data()
+        name = peek_name(raw, 0, len(raw))
+        if LEVEL_NAME_PATTERN.search(name):
+            entries.append({'pathId': obj.path_id, 'offset': obj.byte_start, 'size': obj.byte_size, 'name': name})
+    return entries, {'serializedVersion': None, 'unityVersion': None, 'dataOffset': None}
+
+
+def _source_stamp(assets_path: str) -> Dict:
+    stat = os.stat(assets_path)
+    return {'path': os.path.abspath(assets_path), 'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+def load_index(assets_path: str, index_path: str = INDEX_PATH) -> Optional[List[Dict]]:
+    """Cached entries, or None if the cache is missing or was built from a different file."""
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('indexVersion') != INDEX_VERSION or index.get('source') != _source_stamp(assets_path):
+        return None
+    return index['levels']
+
+
+def build_index(assets_path: str, index_path: str = INDEX_PATH) -> List[Dict]:
+    """Scan the asset file and write the index cache."""
+    with open(assets_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        try:
+            entries, header = scan_levels(buf)
+        except UnsupportedAssetFormat:
+            entries = None
+    if entries is None:
+        entries, header = scan_levels_unitypy(assets_path)
+
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'indexVersion': INDEX_VERSION,
+            'source': _source_stamp(assets_path),
+            **header,
+            'levels': entries,
+        }, f, indent=2, ensure_ascii=False)
+    return entries
+
+
+def get_index(assets_path: str, index_path: str = INDEX_PATH, rebuild: bool = False) -> List[Dict]:
+    """Cached index if it is still valid for `assets_path`, otherwise a fresh scan."""
+    entries = None if rebuild else load_index(assets_path, index_path)
+    if entries is None:
+        entries = build_index(assets_path, index_path)
+    return entries
+
+
+def iter_level_objects(assets_path: str, entries: List[Dict]):
+    """Yield (entry, raw bytes) for each indexed level, read from a memory mapping."""
+    with open(assets_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for entry in entries:
+            yield entry, buf[entry['offset']:entry['offset'] + entry['size']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index level MonoBehaviours of a Unity .assets file')
+    parser.add_argument('assets', help='Path to _combined_sharedassets2.assets')
+    parser.add_argument('--index', default=INDEX_PATH, help='Index cache path')
+    parser.add_argument('--rebuild', action='store_true', help='Ignore the cached index')
+    args = parser.parse_args()
+
+    cached = None if args.rebuild else load_index(args.assets, args.index)
+    entries = cached if cached is not None else build_index(args.assets, args.index)
+    print(f"{'Loaded' if cached is not None else 'Built'} index: {len(entries)} level objects")
+    print(f'Index: {args.index}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,127 +2,303 @@
 """
 Verifies that parser changes don't break verified levels.
 Compares current parsed output with reference snapshot.
+
+Levels are compared through level_diff: canonical hashes first, then a
+per-block / per-door diff of the levels that changed. Any level file the
+tools write can be compared (JSON, NDJSON, pack, or a sharded export's
+levels_manifest.json), so the whole catalogue can be checked after a parser
+edit, not only the 27 verified levels.
+
+--solve is the semantic gate: every verified level is solved headlessly with
+a fixed budget and its min moves / explored states are checked against
+level_data/verified_solver_baseline.json. Levels A* cannot finish within the
+state budget are solved with beam search instead (deterministic, no time
+limit), so every level has a solvability and move count to gate on. Changing
+solvability, error class, strategy or move count fails, even when every count
+and coordinate still matches. Results are cached per level hash
+(level_data/solver_cache.json) and solver source, so only levels the parser
+changed are solved again.
+
+Usage:
+    python verify_levels.py                      # levels 1-27 vs verified_levels_snapshot.json
+    python verify_levels.py --save               # accept levels 1-27 as the new snapshot
+    python verify_levels.py --reference old/levels_manifest.json \\
+        --levels ../../../assets/levels/levels_manifest.json --all
+    python verify_levels.py --all --json         # structured diffs
+    python verify_levels.py --solve --save       # record solver baseline for levels 1-27
+    python verify_levels.py --solve              # fail if solvability, error class, strategy or moves changed
 """
 
+import argparse
 import json
 import os
 import sys
+import time
+from multiprocessing import Pool
+
+from level_cache import LevelCache, source_version
+from level_catalogue import LevelCatalogue
+from level_diff import ELEMENTS, diff_catalogues, format_diff, level_digest, recorded_fields
+import level_geometry
+from level_stream import iter_levels
+import solver
+from solver import DEFAULT_BEAM_WIDTH, DEFAULT_MAX_STATES, DEFAULT_TABLE_MB, solve_one
+from solver import board, dead_state, pattern_db, search, strategies, transposition
 
 VERIFIED_LEVELS = 27  # Levels 1-27 are verified
 
-def load_reference():
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SCRIPT_DIR)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(BASE_DIR))
+REFERENCE_PATH = os.path.join(BASE_DIR, 'level_data', 'verified_levels_snapshot.json')
+CURRENT_PATH = os.path.join(PROJECT_ROOT, 'assets', 'levels', 'levels_27.json')
+SOLVER_BASELINE_PATH = os.path.join(BASE_DIR, 'level_data', 'verified_solver_baseline.json')
+SOLVER_CACHE_PATH = os.path.join(BASE_DIR, 'level_data', 'solver_cache.json')
+
+# Fixed solver budget of the gate: states only (no time limit), so results are reproducible
+SOLVER_BUDGET = {'maxStates': DEFAULT_MAX_STATES, 'weight': 1.0, 'tableMB': DEFAULT_TABLE_MB,
+                 'beamWidth': DEFAULT_BEAM_WIDTH}
+SOLVER_FIELDS = ('isSolvable', 'minMoves', 'statesExplored', 'error', 'strategy')
+
+def load_levels(path):
+    """{id: level} from a snapshot ({"1": level, ...}), a level file or a levels_manifest.json."""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and 'shards' in data:
+            with LevelCatalogue(path, cached_shards=1) as catalogue:
+                return {level_id: catalogue.level(level_id) for level_id in catalogue.ids()}
+        if isinstance(data, dict) and 'levels' not in data:
+            return {int(k): v for k, v in data.items()}
+        levels = data['levels'] if isinstance(data, dict) else data
+    else:
+        levels = iter_levels(path)
+    return {lvl['id']: lvl for lvl in levels}
+
+def load_reference(path=REFERENCE_PATH):
     """Load reference snapshot of verified levels."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    base_dir = os.path.dirname(script_dir)
-    ref_path = os.path.join(base_dir, 'level_data/verified_levels_snapshot.json')
-    
-    if not os.path.exists(ref_path):
+    if not os.path.exists(path):
         return None
-    
-    with open(ref_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_levels(path)
 
-def save_reference(levels):
+def save_reference(levels, path=REFERENCE_PATH):
     """Save current state as reference snapshot."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    base_dir = os.path.dirname(script_dir)
-    ref_path = os.path.join(base_dir, 'level_data/verified_levels_snapshot.json')
-    
-    with open(ref_path, 'w', encoding='utf-8') as f:
+    with open(path, 'w', encoding='utf-8') as f:
         json.dump(levels, f, indent=2)
     print(f"Saved reference snapshot: {len(levels)} levels")
 
-def load_current():
+def load_current(path=CURRENT_PATH):
     """Load current game levels."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(script_dir)))
-    levels_path = os.path.join(project_root, 'assets/levels/levels_27.json')
-    
-    with open(levels_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    return {lvl['id']: lvl for lvl in data['levels'] if lvl['id'] <= VERIFIED_LEVELS}
+    return {k: v for k, v in load_levels(path).items() if k <= VERIFIED_LEVELS}
+
+def compare_levels(ref, current, ids=None):
+    """
+    Compare reference and current levels (ids default to 1..VERIFIED_LEVELS),
+    return structured differences (see level_diff). Element fields the
+    reference does not record are not compared.
+    """
+    if ids is None:
+        ids = range(1, VERIFIED_LEVELS + 1)
+    fields = {kind: recorded_fields(ref.values(), kind) for kind in ELEMENTS}
+    return diff_catalogues(ref, current, ids, fields)
+
+def solver_version(budget):
+    """Solver logic + budget: cached results are reused only while both are unchanged."""
+    return source_version(solver, board, search, strategies, pattern_db, dead_state, transposition, level_geometry,
+                          sorted(budget.items()))
+
+
+def solve_gated(task):
+    """Worker: A* within the state budget, beam search for a level A* cannot finish in it."""
+    level, budget = task
+    result = solve_one((level, 'astar', budget['maxStates'], None, budget['weight'], budget['tableMB'],
+                        DEFAULT_BEAM_WIDTH))
+    # Baselines recorded before the beam fallback have no beamWidth and keep the A* result
+    if result.get('error') == 'Max states reached' and budget.get('beamWidth'):
+        result = solve_one((level, 'beam', None, None, 1.0, budget['tableMB'], budget['beamWidth']))
+    return result
+
+
+def solve_levels(levels, budget, jobs=None, cache_path=SOLVER_CACHE_PATH):
+    """
+    {id: {'hash', 'isSolvable', 'minMoves', 'statesExplored', 'error', 'strategy'}} for the given levels.
+    Levels whose hash is in the cache are not solved again; the rest run on a process pool.
+    """
+    cache = LevelCache(cache_path, solver_version(budget)) if cache_path else None
+    results, tasks = {}, []
+    for level in levels:
+        digest = level_digest(level)
+        cached = cache.get(str(level['id']), digest) if cache else LevelCache.MISSING
+        if cached is LevelCache.MISSING:
+            tasks.append((level, budget))
+        else:
+            results[level['id']] = cached
+        results.setdefault(level['id'], {'hash': digest})
+
+    # Biggest levels first so a slow one does not start last
+    tasks.sort(key=lambda t: -len(t[0]['blocks']))
+    if tasks:
+        print(f"Solving {len(tasks)} levels (max {budget['maxStates']} states, "
+              f"{len(results) - len(tasks)} cached)...")
+        with Pool(processes=min(jobs or os.cpu_count(), len(tasks))) as pool:
+            for result in pool.imap_unordered(solve_gated, tasks):
+                entry = results[result['id']]
+                entry.update({field: result.get(field) for field in SOLVER_FIELDS})
+                if cache:
+                    cache.put(str(result['id']), entry['hash'], entry)
+    if cache:
+        cache.save()
+    return results
+
+def load_solver_baseline(path=SOLVER_BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_solver_baseline(results, budget, path=SOLVER_BASELINE_PATH):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'budget': budget, 'levels': {str(k): v for k, v in sorted(results.items())}}, f, indent=2)
+    solved = sum(1 for r in results.values() if r['isSolvable'])
+    print(f"Saved solver baseline: {len(results)} levels, {solved} solvable within budget")
+
+def _error_class(error):
+    """'Unsolvable: block 2 no-door' -> 'Unsolvable'; budget errors have no detail part."""
+    return error.split(':', 1)[0] if error else None
 
-def compare_levels(ref, current):
-    """Compare reference and current levels, return differences."""
+def compare_solver(baseline, results):
+    """
+    Solver regressions against the baseline, as level_diff records: a level whose
+    isSolvable, error class or strategy changed (either way), or whose move count changed.
+    """
     differences = []
-    
-    for level_id in range(1, VERIFIED_LEVELS + 1):
-        ref_level = ref.get(str(level_id)) or ref.get(level_id)
-        cur_level = current.get(level_id)
-        
-        if not ref_level or not cur_level:
-            differences.append(f"Level {level_id}: missing in {'reference' if not ref_level else 'current'}")
+    for level_id, result in sorted(results.items()):
+        base = baseline.get(str(level_id))
+        if base is None:
+            differences.append({'level': level_id, 'kind': 'level', 'change': 'missing', 'side': 'solver baseline'})
             continue
-        
-        # Compare key fields
-        fields_to_check = ['gridWidth', 'gridHeight', 'name']
-        for field in fields_to_check:
-            if ref_level.get(field) != cur_level.get(field):
-                differences.append(f"Level {level_id}: {field} changed: {ref_level.get(field)} -> {cur_level.get(field)}")
-        
-        # Compare blocks count
-        ref_blocks = len(ref_level.get('blocks', []))
-        cur_blocks = len(cur_level.get('blocks', []))
-        if ref_blocks != cur_blocks:
-            differences.append(f"Level {level_id}: blocks count changed: {ref_blocks} -> {cur_blocks}")
-        
-        # Compare doors count
-        ref_doors = len(ref_level.get('doors', []))
-        cur_doors = len(cur_level.get('doors', []))
-        if ref_doors != cur_doors:
-            differences.append(f"Level {level_id}: doors count changed: {ref_doors} -> {cur_doors}")
-        
-        # Compare each door
-        if ref_doors == cur_doors:
-            for idx, (ref_door, cur_door) in enumerate(zip(ref_level.get('doors', []), cur_level.get('doors', []))):
-                door_diffs = []
-                for key in ['blockType', 'partCount', 'edge', 'startRow', 'startCol']:
-                    if ref_door.get(key) != cur_door.get(key):
-                        door_diffs.append(f"{key}: {ref_door.get(key)} -> {cur_door.get(key)}")
-                if door_diffs:
-                    differences.append(f"Level {level_id}, Door {idx+1}: {', '.join(door_diffs)}")
-        
-        # Compare each block position
-        if ref_blocks == cur_blocks:
-            for idx, (ref_block, cur_block) in enumerate(zip(ref_level.get('blocks', []), cur_level.get('blocks', []))):
-                block_diffs = []
-                for key in ['blockType', 'gridRow', 'gridCol', 'rotationZ']:
-                    if ref_block.get(key) != cur_block.get(key):
-                        block_diffs.append(f"{key}: {ref_block.get(key)} -> {cur_block.get(key)}")
-                if block_diffs:
-                    differences.append(f"Level {level_id}, Block {idx+1}: {', '.join(block_diffs)}")
-    
+        fields = {}
+        if base['isSolvable'] != result['isSolvable']:
+            fields['isSolvable'] = [base['isSolvable'], result['isSolvable']]
+        if _error_class(base['error']) != _error_class(result['error']):
+            fields['error'] = [base['error'], result['error']]
+        if base.get('strategy', 'astar') != result.get('strategy'):
+            fields['strategy'] = [base.get('strategy', 'astar'), result.get('strategy')]
+        if base['isSolvable'] and result['isSolvable'] and base['minMoves'] != result['minMoves']:
+            fields['minMoves'] = [base['minMoves'], result['minMoves']]
+        if fields:
+            differences.append({'level': level_id, 'kind': 'level', 'change': 'changed', 'fields': fields})
     return differences
 
+def _moves(result):
+    if not result.get('isSolvable'):
+        return '-'
+    return f"{result['minMoves']} (beam)" if result.get('strategy') == 'beam' else result['minMoves']
+
+def print_solver_table(baseline, results):
+    print('| Level | Baseline | Current | States (baseline -> current) |')
+    print('|-------|----------|---------|------------------------------|')
+    for level_id, result in sorted(results.items()):
+        base = baseline.get(str(level_id), {})
+        print(f"| {level_id} | {_moves(base)} | {_moves(result)} | "
+              f"{base.get('statesExplored', '-')} -> {result['statesExplored']} |")
+
+def verify_solver(args, ids):
+    """--solve mode: solve the current verified levels and compare with the solver baseline."""
+    current = load_levels(args.levels)
+    levels = [current[i] for i in ids if i in current]
+    baseline = load_solver_baseline(args.solver_baseline)
+
+    if args.save:
+        save_solver_baseline(solve_levels(levels, SOLVER_BUDGET, args.jobs, args.solver_cache),
+                             SOLVER_BUDGET, args.solver_baseline)
+        return 0
+    if not baseline:
+        print("No solver baseline found. Run with --solve --save to create one.")
+        return 1
+
+    start = time.perf_counter()
+    budget = baseline['budget']
+    results = solve_levels(levels, budget, args.jobs, args.solver_cache)
+    differences = compare_solver(baseline['levels'], results)
+    differences += [{'level': i, 'kind': 'level', 'change': 'missing', 'side': 'current'}
+                    for i in ids if i not in current]
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(differences, indent=2, ensure_ascii=False))
+        return 1 if differences else 0
+
+    print_solver_table(baseline['levels'], results)
+    if differences:
+        print(f"\n[FAIL] SOLVER REGRESSION! {len(differences)} levels ({elapsed:.1f}s):")
+        for diff in differences:
+            print(f"  - {format_diff(diff)}")
+        print("\n[!] Parser changes broke verified levels! Please revert.")
+        return 1
+    print(f"\n[OK] All {len(ids)} verified levels keep their solver results ({elapsed:.1f}s).")
+    return 0
+
 def main():
-    if len(sys.argv) > 1 and sys.argv[1] == '--save':
+    parser = argparse.ArgumentParser(description='Check that parser changes do not alter verified levels')
+    parser.add_argument('--save', action='store_true', help='Save levels 1-27 as the reference snapshot')
+    parser.add_argument('--reference', default=REFERENCE_PATH, help='Reference levels (snapshot or level file)')
+    parser.add_argument('--levels', default=CURRENT_PATH,
+                        help='Current levels: JSON, NDJSON, pack or levels_manifest.json')
+    parser.add_argument('--all', action='store_true',
+                        help=f'Compare every reference level, not only 1-{VERIFIED_LEVELS}')
+    parser.add_argument('--json', action='store_true', help='Print the differences as JSON')
+    parser.add_argument('--solve', action='store_true',
+                        help='Solver gate: compare solvability and min moves with the solver baseline')
+    parser.add_argument('--solver-baseline', default=SOLVER_BASELINE_PATH)
+    parser.add_argument('--solver-cache', default=SOLVER_CACHE_PATH)
+    parser.add_argument('--no-cache', dest='solver_cache', action='store_const', const=None,
+                        help='Solve every level again')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Solver processes')
+    args = parser.parse_args()
+
+    if args.solve:
+        ref = load_reference(args.reference)
+        ids = sorted(ref) if args.all and ref else list(range(1, VERIFIED_LEVELS + 1))
+        return verify_solver(args, ids)
+
+    if args.save:
         # Save current state as reference
-        current = load_current()
-        save_reference({str(k): v for k, v in current.items()})
+        current = load_current(args.levels)
+        save_reference({str(k): v for k, v in current.items()}, args.reference)
         return 0
     
     # Compare with reference
-    ref = load_reference()
+    ref = load_reference(args.reference)
     if not ref:
         print("No reference snapshot found. Run with --save to create one.")
         return 1
     
-    current = load_current()
-    differences = compare_levels(ref, current)
-    
+    start = time.perf_counter()
+    current = load_levels(args.levels)
+    loaded = time.perf_counter()
+    ids = sorted(ref) if args.all else None
+    differences = compare_levels(ref, current, ids)
+    compared = time.perf_counter()
+    count = len(ref) if args.all else VERIFIED_LEVELS
+
+    if args.json:
+        print(json.dumps(differences, indent=2, ensure_ascii=False))
+        return 1 if differences else 0
+
+    timing = f"(load {loaded - start:.3f}s, compare {compared - loaded:.3f}s)"
     if differences:
-        print(f"[FAIL] VERIFICATION FAILED! {len(differences)} differences found:")
+        changed = len({d['level'] for d in differences})
+        print(f"[FAIL] VERIFICATION FAILED! {len(differences)} differences in {changed} levels {timing}:")
         for diff in differences[:20]:  # Show first 20
-            print(f"  - {diff}")
+            print(f"  - {format_diff(diff)}")
         if len(differences) > 20:
             print(f"  ... and {len(differences) - 20} more")
         print("\n[!] Parser changes broke verified levels! Please revert.")
         return 1
     else:
-        print(f"[OK] All {VERIFIED_LEVELS} verified levels unchanged.")
+        print(f"[OK] All {count} verified levels unchanged. {timing}")
         return 0
 
 if __name__ == '__main__':
     sys.exit(main())
-
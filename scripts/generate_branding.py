@@ -2,13 +2,31 @@
 """
 Generate branding assets for Color Block Jam app.
 
+Images are composited whole: gradients are one row-broadcast buffer and every
+block is drawn once per (size, color) into a cached tile that is then pasted,
+so even the 1024x1024 icon renders in milliseconds.
+
+--batch renders every master composition once at its highest resolution and
+derives all platform densities and light/dark variants from it (web icons and
+splash, Android mipmaps and drawables, iOS asset catalogs, Windows .ico) by
+resampling on a thread pool. A content hash manifest of palette, composition
+source and size per output skips everything that is already up to date.
+
 Usage:
     pip install Pillow
-    python scripts/generate_branding.py
+    python scripts/generate_branding.py            # the four master assets
+    python scripts/generate_branding.py --batch    # all platform outputs
+    python scripts/generate_branding.py --batch --force --root /tmp/out
 """
 
+import argparse
+import hashlib
+import inspect
+import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 # Fix encoding for Windows console
@@ -32,38 +50,53 @@ BLOCK_YELLOW = (255, 255, 68)       # #FFFF44
 WHITE = (255, 255, 255)
 DARK_BG = (26, 26, 46)              # #1a1a2e
 
+PALETTE = {
+    'gradientTop': GRADIENT_TOP, 'gradientBottom': GRADIENT_BOTTOM,
+    'red': BLOCK_RED, 'green': BLOCK_GREEN, 'blue': BLOCK_BLUE, 'yellow': BLOCK_YELLOW,
+    'white': WHITE, 'darkBg': DARK_BG,
+}
+
 # Project paths
 PROJECT_ROOT = Path(__file__).parent.parent
 BRANDING_DIR = PROJECT_ROOT / "assets" / "branding"
+MANIFEST_NAME = "scripts/branding_manifest.json"
 
 
 def create_gradient(size, color_top, color_bottom):
     """Create a vertical gradient image."""
-    img = Image.new('RGB', size)
-    for y in range(size[1]):
-        ratio = y / size[1]
-        r = int(color_top[0] * (1 - ratio) + color_bottom[0] * ratio)
-        g = int(color_top[1] * (1 - ratio) + color_bottom[1] * ratio)
-        b = int(color_top[2] * (1 - ratio) + color_bottom[2] * ratio)
-        for x in range(size[0]):
-            img.putpixel((x, y), (r, g, b))
-    return img
+    width, height = size
+    column = bytearray()
+    for y in range(height):
+        ratio = y / height
+        column += bytes(int(top * (1 - ratio) + bottom * ratio) for top, bottom in zip(color_top, color_bottom))
+    # One pixel wide column, stretched across all columns
+    return Image.frombytes('RGB', (1, height), bytes(column)).resize((width, height), Image.NEAREST)
 
 
-def draw_block(draw, x, y, size, color, outline_color=(0, 0, 0)):
-    """Draw a single LEGO-style block."""
+@lru_cache(maxsize=None)
+def block_tile(size, color, outline_color=(0, 0, 0)):
+    """A single LEGO-style block on a transparent tile, drawn once per size and color."""
+    tile = Image.new('RGBA', (size + 1, size + 1), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(tile)
     # Main block
-    draw.rectangle([x, y, x + size, y + size], fill=color, outline=outline_color, width=2)
-    
+    draw.rectangle([0, 0, size, size], fill=color, outline=outline_color, width=2)
+
     # LEGO stud (circle in center)
     stud_radius = size // 5
-    cx, cy = x + size // 2, y + size // 2
+    cx, cy = size // 2, size // 2
     stud_color = tuple(min(255, c + 30) for c in color)
-    draw.ellipse([cx - stud_radius, cy - stud_radius, cx + stud_radius, cy + stud_radius], 
+    draw.ellipse([cx - stud_radius, cy - stud_radius, cx + stud_radius, cy + stud_radius],
                  fill=stud_color, outline=outline_color, width=1)
+    return tile
+
+
+def draw_block(img, x, y, size, color, outline_color=(0, 0, 0)):
+    """Paste a single LEGO-style block at (x, y)."""
+    tile = block_tile(size, color, outline_color)
+    img.paste(tile, (x, y), tile)
 
 
-def draw_l_shape(draw, cx, cy, block_size, color, gap=2):
+def draw_l_shape(img, cx, cy, block_size, color, gap=2):
     """Draw an L-shaped block figure."""
     # L shape: 
     # XX
@@ -78,14 +111,13 @@ def draw_l_shape(draw, cx, cy, block_size, color, gap=2):
     for dx, dy in positions:
         x = cx + dx * (block_size + gap)
         y = cy + dy * (block_size + gap)
-        draw_block(draw, x, y, block_size, color)
+        draw_block(img, x, y, block_size, color)
 
 
 def create_app_icon(size=1024):
     """Create the main app icon."""
     # Create gradient background
     img = create_gradient((size, size), GRADIENT_TOP, GRADIENT_BOTTOM)
-    draw = ImageDraw.Draw(img)
     
     # Add rounded corners effect (simulate by drawing on alpha)
     # For simplicity, we'll use a circle mask
@@ -99,20 +131,20 @@ def create_app_icon(size=1024):
     # Create a mini puzzle scene
     
     # Red L-shape (top-left area)
-    draw_l_shape(draw, margin, margin, block_size, BLOCK_RED, gap)
+    draw_l_shape(img, margin, margin, block_size, BLOCK_RED, gap)
     
     # Blue horizontal blocks (middle-right)
     bx = size // 2 + margin // 2
     by = size // 2 - block_size // 2
     for i in range(3):
-        draw_block(draw, bx + i * (block_size + gap), by, block_size, BLOCK_BLUE)
+        draw_block(img, bx + i * (block_size + gap), by, block_size, BLOCK_BLUE)
     
     # Yellow square (bottom-right)
     yx = size - margin - 2 * block_size - gap
     yy = size - margin - 2 * block_size - gap
     for dy in range(2):
         for dx in range(2):
-            draw_block(draw, yx + dx * (block_size + gap), yy + dy * (block_size + gap), 
+            draw_block(img, yx + dx * (block_size + gap), yy + dy * (block_size + gap), 
                       block_size, BLOCK_YELLOW)
     
     # Green T-shape (bottom-left)
@@ -120,10 +152,10 @@ def create_app_icon(size=1024):
     gy = size - margin - 2 * block_size - gap
     # T shape: XXX
     #           X
-    draw_block(draw, gx, gy, block_size, BLOCK_GREEN)
-    draw_block(draw, gx + block_size + gap, gy, block_size, BLOCK_GREEN)
-    draw_block(draw, gx + 2 * (block_size + gap), gy, block_size, BLOCK_GREEN)
-    draw_block(draw, gx + block_size + gap, gy + block_size + gap, block_size, BLOCK_GREEN)
+    draw_block(img, gx, gy, block_size, BLOCK_GREEN)
+    draw_block(img, gx + block_size + gap, gy, block_size, BLOCK_GREEN)
+    draw_block(img, gx + 2 * (block_size + gap), gy, block_size, BLOCK_GREEN)
+    draw_block(img, gx + block_size + gap, gy + block_size + gap, block_size, BLOCK_GREEN)
     
     return img
 
@@ -131,7 +163,6 @@ def create_app_icon(size=1024):
 def create_app_icon_foreground(size=1024):
     """Create adaptive icon foreground (blocks only, transparent bg)."""
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
     
     # Centered blocks composition
     margin = size // 4
@@ -149,7 +180,7 @@ def create_app_icon_foreground(size=1024):
     for (dx, dy), color in zip(positions, colors):
         x = cx + dx * (block_size * 2 + gap)
         y = cy + dy * (block_size * 2 + gap)
-        draw_block(draw, x, y, block_size * 2, color)
+        draw_block(img, x, y, block_size * 2, color)
     
     return img
 
@@ -161,7 +192,6 @@ def create_splash_logo(size=400):
     height = size
     
     img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
     
     # Draw blocks arrangement
     block_size = height // 4
@@ -174,7 +204,7 @@ def create_splash_logo(size=400):
     colors = [BLOCK_RED, BLOCK_GREEN, BLOCK_BLUE, BLOCK_YELLOW]
     for i, color in enumerate(colors):
         x = start_x + i * (block_size + gap)
-        draw_block(draw, x, start_y, block_size, color)
+        draw_block(img, x, start_y, block_size, color)
     
     return img
 
@@ -182,7 +212,6 @@ def create_splash_logo(size=400):
 def create_splash_icon(size=288):
     """Create Android 12 splash icon."""
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
     
     # Simple 2x2 blocks
     block_size = size // 3
@@ -197,13 +226,162 @@ def create_splash_icon(size=288):
     for (dx, dy), color in zip(positions, colors):
         x = cx + dx * (block_size + gap)
         y = cy + dy * (block_size + gap)
-        draw_block(draw, x, y, block_size, color)
+        draw_block(img, x, y, block_size, color)
     
     return img
 
 
+# Master compositions: name -> (function, size of the highest density)
+MASTERS = {
+    'app_icon': (create_app_icon, 1024),
+    'app_icon_foreground': (create_app_icon_foreground, 1024),
+    'splash_logo': (create_splash_logo, 400),
+    'splash_icon': (create_splash_icon, 288),
+}
+
+ANDROID_DENSITIES = {'mdpi': 1, 'hdpi': 1.5, 'xhdpi': 2, 'xxhdpi': 3, 'xxxhdpi': 4}
+IOS_APP_ICONS = [(20, (1, 2, 3)), (29, (1, 2, 3)), (40, (1, 2, 3)), (50, (1, 2)), (57, (1, 2)),
+                 (60, (2, 3)), (72, (1, 2)), (76, (1, 2)), (83.5, (2,)), (1024, (1,))]
+ICO_SIZES = [(16, 16), (24, 24), (32, 32), (48, 48), (64, 64), (128, 128), (256, 256)]
+
+
+def batch_outputs():
+    """Every derived file: (path relative to the project root, master name or solid RGB color, (w, h))."""
+    res = "android/app/src/main/res"
+    launch = "ios/Runner/Assets.xcassets/LaunchImage.imageset"
+    backgrounds = "ios/Runner/Assets.xcassets/LaunchBackground.imageset"
+    outputs = [
+        ("web/favicon.png", 'app_icon', (16, 16)),
+        ("windows/runner/resources/app_icon.ico", 'app_icon', (256, 256)),
+        (f"{res}/drawable/background.png", GRADIENT_TOP, (1, 1)),
+        (f"{res}/drawable-v21/background.png", GRADIENT_TOP, (1, 1)),
+        (f"{res}/drawable-night/background.png", DARK_BG, (1, 1)),
+        (f"{res}/drawable-night-v21/background.png", DARK_BG, (1, 1)),
+        (f"{backgrounds}/background.png", GRADIENT_TOP, (1, 1)),
+        (f"{backgrounds}/darkbackground.png", DARK_BG, (1, 1)),
+    ]
+    for size in (192, 512):
+        outputs.append((f"web/icons/Icon-{size}.png", 'app_icon', (size, size)))
+        outputs.append((f"web/icons/Icon-maskable-{size}.png", 'app_icon', (size, size)))
+    for scale in range(1, 5):
+        for variant in ("light", "dark"):
+            outputs.append((f"web/splash/img/{variant}-{scale}x.png", 'splash_logo', (200 * scale, 100 * scale)))
+    for density, scale in ANDROID_DENSITIES.items():
+        outputs.append((f"{res}/mipmap-{density}/ic_launcher.png", 'app_icon', (int(48 * scale),) * 2))
+        outputs.append((f"{res}/drawable-{density}/ic_launcher_foreground.png", 'app_icon_foreground',
+                        (int(108 * scale),) * 2))
+        for night in ("", "-night"):
+            outputs.append((f"{res}/drawable{night}-{density}/splash.png", 'splash_logo',
+                            (int(200 * scale), int(100 * scale))))
+            outputs.append((f"{res}/drawable{night}-{density}/android12splash.png", 'splash_icon',
+                            (int(72 * scale),) * 2))
+    for points, scales in IOS_APP_ICONS:
+        for scale in scales:
+            size = int(points * scale)
+            outputs.append((f"ios/Runner/Assets.xcassets/AppIcon.appiconset/Icon-App-{points:g}x{points:g}@{scale}x.png",
+                            'app_icon', (size, size)))
+    for scale in (1, 2, 3):
+        suffix = f"@{scale}x" if scale > 1 else ""
+        for name in ("LaunchImage", "LaunchImageDark"):
+            outputs.append((f"{launch}/{name}{suffix}.png", 'splash_logo', (200 * scale, 100 * scale)))
+    return outputs
+
+
+def master_hash(name):
+    """Hash of everything a master depends on: palette, drawing code and size."""
+    function, size = MASTERS[name]
+    source = [inspect.getsource(f) for f in (function, create_gradient, block_tile, draw_block, draw_l_shape)]
+    payload = json.dumps([PALETTE, source, size], sort_keys=True)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def output_hash(source, size, master_hashes):
+    base = master_hashes[source] if isinstance(source, str) else list(source)
+    return hashlib.sha1(json.dumps([base, size, 'LANCZOS']).encode('utf-8')).hexdigest()
+
+
+def derive(master, source, size, path):
+    """Resample one output from its master (or fill a solid color) and save it."""
+    if isinstance(source, str):
+        if path.suffix == '.ico':
+            master.save(path, sizes=ICO_SIZES)
+            return
+        img = master if master.size == size else master.resize(size, Image.LANCZOS)
+    else:
+        img = Image.new('RGB', size, source)
+    img.save(path, "PNG")
+
+
+def run_batch(root, force=False, jobs=None):
+    """Render stale masters once, then derive stale outputs in parallel. Returns (written, skipped)."""
+    manifest_path = root / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists() and not force:
+        with open(manifest_path, encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    master_hashes = {name: master_hash(name) for name in MASTERS}
+    stale = []
+    skipped = 0
+    for rel, source, size in batch_outputs():
+        digest = output_hash(source, size, master_hashes)
+        if manifest.get(rel) == digest and (root / rel).exists():
+            skipped += 1
+        else:
+            stale.append((rel, source, size, digest))
+
+    # Masters: loaded from assets/branding when unchanged, otherwise rendered once
+    masters = {}
+    branding_dir = root / "assets" / "branding"
+    branding_dir.mkdir(parents=True, exist_ok=True)
+    for name in sorted({source for _, source, _, _ in stale if isinstance(source, str)} | set(MASTERS)):
+        path = branding_dir / f"{name}.png"
+        key = f"assets/branding/{name}.png"
+        if manifest.get(key) == master_hashes[name] and path.exists():
+            if any(source == name for _, source, _, _ in stale):
+                masters[name] = Image.open(path)
+                masters[name].load()
+            continue
+        function, size = MASTERS[name]
+        masters[name] = function(size)
+        masters[name].save(path, "PNG")
+        manifest[key] = master_hashes[name]
+        print(f"  🎨 Rendered master {key}")
+
+    def work(item):
+        rel, source, size, digest = item
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        derive(masters.get(source), source, size, path)
+        return rel, digest
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for rel, digest in pool.map(work, stale):
+            manifest[rel] = digest
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(manifest.items())), f, indent=2)
+    return len(stale), skipped
+
+
 def main():
     """Generate all branding assets."""
+    parser = argparse.ArgumentParser(description="Generate branding assets")
+    parser.add_argument("--batch", action="store_true",
+                        help="Derive every platform icon and splash density from the masters")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest and regenerate everything")
+    parser.add_argument("--root", type=Path, default=PROJECT_ROOT, help="Project root to write into")
+    parser.add_argument("--jobs", type=int, default=None, help="Resampling threads (default: Python's choice)")
+    args = parser.parse_args()
+
+    if args.batch:
+        print("🎨 Generating branding assets (batch)...")
+        written, skipped = run_batch(args.root, args.force, args.jobs)
+        print(f"\n✨ {written} outputs written, {skipped} up to date "
+              f"(manifest: {args.root / MANIFEST_NAME})")
+        return
+
     print("🎨 Generating branding assets...")
     
     # Create branding directory
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Generate level-select thumbnails as one sprite atlas plus an index.
+
+Every exported level (grid, hidden cells, doors, blocks) is drawn into a
+fixed-size thumbnail in the LEGO block style of generate_branding.py, using
+the game's block colors (lib/core/constants/colors.dart). Thumbnails are
+packed row by row into assets/level_thumbnails/level_atlas.png (or .webp);
+level_atlas.json maps each level id to its rectangle, so the level select
+loads a single image instead of building previews at runtime.
+
+The index also stores a content hash per level (level geometry + renderer
+source + thumbnail size). On the next run unchanged levels are cropped out of
+the previous atlas; only new or changed levels are rendered, on a process pool.
+
+Usage:
+    pip install Pillow
+    python scripts/generate_level_thumbnails.py
+    python scripts/generate_level_thumbnails.py --levels assets/levels/levels_27.json --size 160
+    python scripts/generate_level_thumbnails.py --format webp --force
+"""
+
+import argparse
+import hashlib
+import inspect
+import io
+import json
+import math
+import os
+import sys
+from multiprocessing import Pool
+from pathlib import Path
+
+# Fix encoding for Windows console
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+
+from PIL import Image, ImageDraw
+
+from generate_branding import WHITE, block_tile, draw_block
+
+# Project paths
+PROJECT_ROOT = Path(__file__).parent.parent
+TOOLS_DIR = PROJECT_ROOT / "res" / "ColorBlockJam_Analysis" / "tools"
+DEFAULT_LEVELS = PROJECT_ROOT / "assets" / "levels" / "levels_27.json"
+OUTPUT_DIR = PROJECT_ROOT / "assets" / "level_thumbnails"
+
+sys.path.insert(0, str(TOOLS_DIR))
+import level_geometry  # noqa: E402
+from level_diff import level_digest  # noqa: E402
+from level_geometry import block_cells  # noqa: E402
+from level_stream import iter_levels  # noqa: E402
+
+# Same order as GameColors.palette in lib/core/constants/colors.dart
+BLOCK_TYPE_COLORS = [
+    (3, 165, 239),    # 0 - Blue
+    (20, 60, 246),    # 1 - Dark Blue
+    (72, 170, 26),    # 2 - Green
+    (184, 68, 200),   # 3 - Pink
+    (115, 67, 219),   # 4 - Purple
+    (251, 179, 45),   # 5 - Yellow
+    (9, 82, 29),      # 6 - Dark Green
+    (242, 119, 43),   # 7 - Orange
+    (184, 32, 44),    # 8 - Red
+    (15, 172, 174),   # 9 - Cyan
+]
+BOARD_BG = (61, 61, 61)         # #3d3d3d
+BOARD_FRAME = (45, 45, 45)      # #2D2D2D
+BOARD_GRID = (85, 85, 85)       # #555555
+
+DEFAULT_SIZE = 128
+
+
+def block_color(block_type):
+    return BLOCK_TYPE_COLORS[block_type % len(BLOCK_TYPE_COLORS)]
+
+
+def render_level(level, size=DEFAULT_SIZE):
+    """One thumbnail: board with a one-cell door ring, hidden cells left out."""
+    width, height = level['gridWidth'], level['gridHeight']
+    cell = max(2, (size - 2) // (max(width, height) + 2))
+    ox = (size - cell * (width + 2)) // 2 + cell
+    oy = (size - cell * (height + 2)) // 2 + cell
+
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([ox - 2, oy - 2, ox + width * cell + 1, oy + height * cell + 1], fill=BOARD_FRAME)
+    hidden = {(h['row'], h['col']) for h in level.get('hiddenCells', [])}
+    for row in range(height):
+        for col in range(width):
+            if (row, col) in hidden:
+                continue
+            x, y = ox + col * cell, oy + row * cell
+            draw.rectangle([x, y, x + cell - 1, y + cell - 1], fill=BOARD_BG, outline=BOARD_GRID)
+
+    # Doors: a bar on the frame, half a cell deep, along the cells they span
+    depth = max(1, cell // 2)
+    for door in level['doors']:
+        color = block_color(door['blockType'])
+        span = door['partCount'] * cell - 1
+        if door['edge'] in ('left', 'right'):
+            y = oy + door['startRow'] * cell
+            x = ox - depth if door['edge'] == 'left' else ox + width * cell
+            draw.rectangle([x, y, x + depth - 1, y + span], fill=color)
+        else:
+            x = ox + door['startCol'] * cell
+            y = oy - depth if door['edge'] == 'top' else oy + height * cell
+            draw.rectangle([x, y, x + span, y + depth - 1], fill=color)
+
+    # Blocks: one LEGO cell per block cell; a layered block shows its inner
+    # color as a smaller block inside, a frozen one a white ice tile on top
+    ice = Image.new('RGBA', (cell, cell), WHITE + (110,))
+    for block in level['blocks']:
+        cells = block_cells(block['blockGroupType'], block.get('rotationZ', 0), block['gridRow'],
+                            block['gridCol'], height, block.get('needsRowOffset', False))
+        inner = block.get('innerBlockType', -1)
+        for row, col in cells:
+            x, y = ox + col * cell, oy + row * cell
+            draw_block(img, x, y, cell - 1, block_color(block['blockType']))
+            if 0 <= inner <= 9 and cell >= 6:
+                inset = cell // 4
+                draw_block(img, x + inset, y + inset, cell - 1 - 2 * inset, block_color(inner))
+            if block.get('iceCount'):
+                img.alpha_composite(ice, (x, y))
+    return img
+
+
+def renderer_version(size):
+    """Hash of everything a thumbnail depends on besides the level itself (block shapes included)."""
+    source = [inspect.getsource(f) for f in (render_level, block_tile, draw_block, level_geometry)]
+    payload = json.dumps([source, BLOCK_TYPE_COLORS, BOARD_BG, BOARD_FRAME, BOARD_GRID, size])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def render_one(task):
+    """Worker entry point: (level id, PNG bytes of its thumbnail)."""
+    level, size = task
+    buffer = io.BytesIO()
+    render_level(level, size).save(buffer, 'PNG')
+    return level['id'], buffer.getvalue()
+
+
+def load_previous(index_path, atlas_path, version):
+    """Thumbnails of the last run that are still valid: {level id: (digest, image)}."""
+    if not index_path.exists() or not atlas_path.exists():
+        return {}
+    with open(index_path, encoding='utf-8') as f:
+        index = json.load(f)
+    if index.get('renderer') != version:
+        return {}
+    atlas = Image.open(atlas_path).convert('RGBA')
+    return {
+        entry['id']: (entry['hash'], atlas.crop((entry['x'], entry['y'],
+                                                 entry['x'] + entry['w'], entry['y'] + entry['h'])))
+        for entry in index['levels']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render level thumbnails into a sprite atlas")
+    parser.add_argument("--levels", type=Path, default=DEFAULT_LEVELS, help="Exported levels (json/ndjson/pack)")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR, help="Directory for the atlas and index")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Thumbnail edge in pixels")
+    parser.add_argument("--format", choices=("png", "webp"), default="png")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Render every level again")
+    args = parser.parse_args()
+
+    levels = sorted(iter_levels(str(args.levels)), key=lambda level: level['id'])
+    if not levels:
+        print("No levels found.")
+        return 1
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    atlas_path = args.output / f"level_atlas.{args.format}"
+    index_path = args.output / "level_atlas.json"
+    version = renderer_version(args.size)
+    previous = {} if args.force else load_previous(index_path, atlas_path, version)
+
+    digests = {level['id']: level_digest(level) for level in levels}
+    thumbnails = {}
+    for level in levels:
+        cached = previous.get(level['id'])
+        if cached and cached[0] == digests[level['id']]:
+            thumbnails[level['id']] = cached[1]
+    stale = [(level, args.size) for level in levels if level['id'] not in thumbnails]
+
+    print(f"🧩 {len(levels)} levels: {len(stale)} to render, {len(thumbnails)} cached")
+    if stale:
+        with Pool(processes=args.jobs) as pool:
+            for level_id, data in pool.imap_unordered(render_one, stale, chunksize=8):
+                thumbnails[level_id] = Image.open(io.BytesIO(data))
+
+    columns = math.ceil(math.sqrt(len(levels)))
+    rows = math.ceil(len(levels) / columns)
+    atlas = Image.new('RGBA', (columns * args.size, rows * args.size), (0, 0, 0, 0))
+    entries = []
+    for position, level in enumerate(levels):
+        x, y = (position % columns) * args.size, (position // columns) * args.size
+        atlas.paste(thumbnails[level['id']], (x, y))
+        entries.append({'id': level['id'], 'x': x, 'y': y, 'w': args.size, 'h': args.size,
+                        'hash': digests[level['id']]})
+
+    if args.format == 'webp':
+        atlas.save(atlas_path, 'WEBP', lossless=True)
+    else:
+        atlas.save(atlas_path, 'PNG', optimize=True)
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'atlas': atlas_path.name,
+            'thumbSize': args.size,
+            'columns': columns,
+            'renderer': version,
+            'levels': entries,
+        }, f, indent=2)
+    print(f"✅ Saved: {atlas_path} ({atlas.size[0]}x{atlas.size[1]}) and {index_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
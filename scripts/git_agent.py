@@ -7,8 +7,15 @@ Git Agent - автоматичне керування git з осмислени
     python git_agent.py --status     # Тільки показати статус
     python git_agent.py --push       # Commit + push
     python git_agent.py --auto       # Автоматичний режим (commit + push без підтвердження)
+
+Категорії змін задає таблиця CATEGORY_RULES. Нові категорії можна додати без
+змін коду у scripts/git_agent_rules.json (їхні правила перевіряються першими):
+    {"rules": [{"path": "res/**/level_data", "category": "level-data"}],
+     "files": [{"suffix": ".md", "category": "docs"}],
+     "prefixes": {"level-data": "data"}}
 """
 
+import json
 import subprocess
 import sys
 import os
@@ -19,114 +26,229 @@ if sys.platform == 'win32':
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+from functools import lru_cache
 
 # Перейти в корінь проекту
 PROJECT_ROOT = Path(__file__).parent.parent
 os.chdir(PROJECT_ROOT)
+RULES_PATH = PROJECT_ROOT / 'scripts' / 'git_agent_rules.json'
+
+# Правила за папками: шаблон префікса шляху від кореня проекту -> категорія.
+# '*' - одна папка (доступна в категорії як {0}, {1}...), '**' - будь-яка
+# кількість папок. Перемагає перше правило в таблиці, що підходить.
+# lib, scripts і test шукаються на будь-якій глибині (android/app/src/test,
+# web/scripts), у тому ж порядку пріоритетів, що й раніше.
+CATEGORY_RULES = [
+    ('**/lib/**/features/*', 'feature/{0}'),
+    ('**/lib/**/features', 'features'),
+    ('**/lib/**/core/**/models', 'models'),
+    ('**/lib/**/core/**/services', 'services'),
+    ('**/lib/**/core/**/constants', 'constants'),
+    ('**/lib/**/core', 'core'),
+    ('**/lib', 'lib'),
+    ('**/assets', 'assets'),
+    ('**/res/**/tools', 'tools'),
+    ('**/res/**/reports', 'docs'),
+    ('**/res', 'resources'),
+    ('**/scripts', 'scripts'),
+    ('**/test', 'tests'),
+]
+
+# Правила за файлами - для файлів поза папками з CATEGORY_RULES
+FILE_RULES = [
+    ({'suffix': ('.yaml', '.yml', '.json', '.xml')}, 'config'),
+    ({'name': ('.gitignore', 'README.md', 'CHANGELOG.md')}, 'meta'),
+]
 
+COMMIT_PREFIXES = {
+    'feature/menu': 'feat(menu)',
+    'feature/game': 'feat(game)',
+    'feature/level_select': 'feat(level-select)',
+    'models': 'feat(models)',
+    'services': 'feat(services)',
+    'constants': 'refactor(constants)',
+    'core': 'refactor(core)',
+    'lib': 'feat',
+    'assets': 'assets',
+    'tools': 'tools',
+    'docs': 'docs',
+    'resources': 'chore(resources)',
+    'scripts': 'chore(scripts)',
+    'tests': 'test',
+    'config': 'config',
+    'meta': 'chore',
+    'other': 'chore',
+}
 
-def run_git(args: list[str], capture=True) -> tuple[int, str]:
+
+def run_git(args: list[str], capture=True, merge_stderr=True) -> tuple[int, str]:
     """Виконати git команду."""
     cmd = ['git'] + args
     if capture:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return result.returncode, result.stdout + result.stderr
+        result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace')
+        return result.returncode, result.stdout + (result.stderr if merge_stderr else '')
     else:
         result = subprocess.run(cmd)
         return result.returncode, ""
 
 
-def get_status() -> dict:
-    """Отримати статус git репозиторію."""
-    code, output = run_git(['status', '--porcelain'])
-    
+def parse_status(output: str) -> tuple[dict, dict]:
+    """
+    Розібрати вивід `git status --porcelain=v2 -z --branch` одним проходом.
+
+    Записи розділені NUL, тому шляхи з пробілами і лапками приходять як є;
+    у перейменувань (тип 2) старий шлях іде окремим записом після нового.
+    """
     changes = {
         'staged': [],      # Готові до commit
         'modified': [],    # Змінені, але не staged
         'untracked': [],   # Нові файли
         'deleted': [],     # Видалені
     }
-    
-    for line in output.strip().split('\n'):
-        if not line:
+    branch = {'head': None, 'upstream': None, 'ahead': 0, 'behind': 0}
+
+    records = iter(output.split('\0'))
+    for record in records:
+        if not record:
             continue
-        status = line[:2]
-        filename = line[3:]
-        
+        kind = record[0]
+        if kind == '#':
+            key, _, value = record[2:].partition(' ')
+            if key == 'branch.head':
+                branch['head'] = value
+            elif key == 'branch.upstream':
+                branch['upstream'] = value
+            elif key == 'branch.ab':
+                ahead, behind = value.split()
+                branch['ahead'], branch['behind'] = int(ahead), -int(behind)
+            continue
+        if kind == '?':
+            changes['untracked'].append(record[2:])
+            continue
+        if kind == '!':
+            continue
+
+        # 1 XY sub mH mI mW hH hI path
+        # 2 XY sub mH mI mW hH hI Xscore path, потім origPath окремим записом
+        # u XY sub m1 m2 m3 mW h1 h2 h3 path
+        fields = {'1': 8, '2': 9, 'u': 10}[kind]
+        parts = record.split(' ', fields)
+        status, filename = parts[1], parts[fields]
+        if kind == '2':
+            next(records, None)  # origPath
+        if kind == 'u':
+            changes['modified'].append(filename)
+            continue
+
         # Перший символ - staged статус, другий - робоча директорія
-        if status[0] in ('M', 'A', 'D', 'R'):
+        if status[0] in ('M', 'A', 'D', 'R', 'C', 'T'):
             changes['staged'].append(filename)
-        if status[1] == 'M':
+        if status[1] in ('M', 'T'):
             changes['modified'].append(filename)
         elif status[1] == 'D':
             changes['deleted'].append(filename)
-        elif status == '??':
-            changes['untracked'].append(filename)
-    
-    return changes
 
+    return changes, branch
 
-def get_diff_stats() -> dict:
-    """Отримати статистику змін."""
-    code, output = run_git(['diff', '--stat', '--cached'])
-    staged_stats = output
-    
-    code, output = run_git(['diff', '--stat'])
-    unstaged_stats = output
-    
-    return {
-        'staged': staged_stats,
-        'unstaged': unstaged_stats
-    }
+
+def get_status() -> tuple[int, dict, dict]:
+    """Отримати статус і гілку git репозиторію одним викликом git."""
+    code, output = run_git(['status', '--porcelain=v2', '-z', '--branch'], merge_stderr=False)
+    if code != 0:
+        return code, {}, {}
+    changes, branch = parse_status(output)
+    return code, changes, branch
+
+
+class PathCategorizer:
+    """
+    Таблиця правил, скомпільована в префіксне дерево за компонентами шляху.
+    Категорія папки рахується один раз і кешується, тож файл - це
+    rpartition('/') і пошук у словнику.
+    """
+
+    def __init__(self, rules: list, file_rules: list):
+        self.root = {}
+        for priority, (pattern, category) in enumerate(rules):
+            node = self.root
+            for part in pattern.strip('/').split('/'):
+                node = node.setdefault(part, {})
+            node.setdefault(None, []).append((priority, category))
+        self.file_rules = [({key: tuple(values) for key, values in match.items()}, category)
+                           for match, category in file_rules]
+        self.directory_category = lru_cache(maxsize=None)(self._directory_category)
+
+    @staticmethod
+    def _expand(states: list) -> list:
+        """Додати стани '**', що збігаються з нулем папок; (вузол, захоплення, чи це '**')."""
+        expanded = []
+        while states:
+            node, captures, glob = states.pop()
+            expanded.append((node, captures, glob))
+            if '**' in node:
+                states.append((node['**'], captures, True))
+        return expanded
+
+    def _directory_category(self, directory: str):
+        best = None
+        states = self._expand([(self.root, (), False)])
+        parts = directory.split('/') if directory else []
+        for depth in range(len(parts) + 1):
+            for node, captures, _ in states:
+                for priority, category in node.get(None, ()):
+                    if best is None or priority < best[0]:
+                        best = (priority, category, captures)
+            if depth == len(parts):
+                break
+            part = parts[depth]
+            following = []
+            for node, captures, glob in states:
+                if part in node:
+                    following.append((node[part], captures, False))
+                if '*' in node:
+                    following.append((node['*'], captures + (part,), False))
+                if glob:
+                    following.append((node, captures, True))  # '**' поглинає ще одну папку
+            if not following:
+                break
+            states = self._expand(following)
+        if best is None:
+            return None
+        return best[1].format(*best[2])
+
+    def file_category(self, name: str) -> str:
+        suffix = name[name.rfind('.'):] if '.' in name else ''
+        for match, category in self.file_rules:
+            if suffix in match.get('suffix', ()) or name in match.get('name', ()):
+                return category
+        return 'other'
+
+    def categorize(self, files: list[str]) -> dict:
+        categories = defaultdict(list)
+        for f in files:
+            directory, _, name = f.rpartition('/')
+            category = self.directory_category(directory) or self.file_category(name)
+            categories[category].append(f)
+        return dict(categories)
+
+
+@lru_cache(maxsize=None)
+def load_categorizer() -> PathCategorizer:
+    """Вбудовані правила плюс scripts/git_agent_rules.json, якщо він є."""
+    rules, file_rules = list(CATEGORY_RULES), list(FILE_RULES)
+    if RULES_PATH.exists():
+        with open(RULES_PATH, encoding='utf-8') as f:
+            extra = json.load(f)
+        rules = [(r['path'], r['category']) for r in extra.get('rules', [])] + rules
+        file_rules = [({k: ([v] if isinstance(v, str) else v) for k, v in r.items() if k != 'category'},
+                       r['category']) for r in extra.get('files', [])] + file_rules
+        COMMIT_PREFIXES.update(extra.get('prefixes', {}))
+    return PathCategorizer(rules, file_rules)
 
 
 def categorize_changes(files: list[str]) -> dict:
     """Категоризувати зміни за типом/папкою."""
-    categories = defaultdict(list)
-    
-    for f in files:
-        path = Path(f)
-        parts = path.parts
-        
-        if 'lib' in parts:
-            if 'features' in parts:
-                idx = parts.index('features')
-                if idx + 1 < len(parts):
-                    categories[f'feature/{parts[idx+1]}'].append(f)
-                else:
-                    categories['features'].append(f)
-            elif 'core' in parts:
-                if 'models' in parts:
-                    categories['models'].append(f)
-                elif 'services' in parts:
-                    categories['services'].append(f)
-                elif 'constants' in parts:
-                    categories['constants'].append(f)
-                else:
-                    categories['core'].append(f)
-            else:
-                categories['lib'].append(f)
-        elif 'assets' in parts:
-            categories['assets'].append(f)
-        elif 'res' in parts:
-            if 'tools' in parts:
-                categories['tools'].append(f)
-            elif 'reports' in parts:
-                categories['docs'].append(f)
-            else:
-                categories['resources'].append(f)
-        elif 'scripts' in parts:
-            categories['scripts'].append(f)
-        elif 'test' in parts:
-            categories['tests'].append(f)
-        elif path.suffix in ('.yaml', '.yml', '.json', '.xml'):
-            categories['config'].append(f)
-        elif path.name in ('.gitignore', 'README.md', 'CHANGELOG.md'):
-            categories['meta'].append(f)
-        else:
-            categories['other'].append(f)
-    
-    return dict(categories)
+    return load_categorizer().categorize(files)
 
 
 def generate_commit_message(changes: dict) -> str:
@@ -139,8 +261,9 @@ def generate_commit_message(changes: dict) -> str:
     
     categories = categorize_changes(all_files + deleted)
     
-    # Визначити основну категорію
-    main_category = max(categories.keys(), key=lambda k: len(categories[k])) if categories else 'misc'
+    # Категорії за кількістю файлів - один раз для основної категорії і опису
+    ranked = sorted(categories.items(), key=lambda x: -len(x[1]))
+    main_category = ranked[0][0] if ranked else 'misc'
     
     # Визначити тип зміни
     if deleted and not all_files:
@@ -157,27 +280,7 @@ def generate_commit_message(changes: dict) -> str:
         change_type = 'update'
     
     # Побудувати повідомлення
-    prefixes = {
-        'feature/menu': 'feat(menu)',
-        'feature/game': 'feat(game)',
-        'feature/level_select': 'feat(level-select)',
-        'models': 'feat(models)',
-        'services': 'feat(services)',
-        'constants': 'refactor(constants)',
-        'core': 'refactor(core)',
-        'lib': 'feat',
-        'assets': 'assets',
-        'tools': 'tools',
-        'docs': 'docs',
-        'resources': 'chore(resources)',
-        'scripts': 'chore(scripts)',
-        'tests': 'test',
-        'config': 'config',
-        'meta': 'chore',
-        'other': 'chore',
-    }
-    
-    prefix = prefixes.get(main_category, 'chore')
+    prefix = COMMIT_PREFIXES.get(main_category, 'chore')
     
     # Згенерувати опис
     total_files = len(all_files) + len(deleted)
@@ -194,9 +297,9 @@ def generate_commit_message(changes: dict) -> str:
     else:
         # Опис за категоріями
         parts = []
-        for cat, files in sorted(categories.items(), key=lambda x: -len(x[1])):
+        for cat, files in ranked:
             if len(files) == 1:
-                parts.append(Path(files[0]).name)
+                parts.append(files[0].rpartition('/')[2])
             else:
                 parts.append(f"{cat} ({len(files)} files)")
         
@@ -208,7 +311,7 @@ def generate_commit_message(changes: dict) -> str:
     return f"{prefix}: {description}"
 
 
-def print_status(changes: dict, diff_stats: dict):
+def print_status(changes: dict):
     """Вивести статус репозиторію."""
     print("\n" + "="*60)
     print("📊 GIT STATUS")
@@ -284,12 +387,21 @@ def push() -> bool:
         return False
 
 
-def get_unpushed_commits() -> list:
-    """Отримати список непушнутих комітів."""
-    code, output = run_git(['log', 'origin/main..HEAD', '--oneline'])
-    if code == 0 and output.strip():
-        return output.strip().split('\n')
-    return []
+def get_unpushed_commits(branch: dict, limit: int = 5) -> tuple[int, list]:
+    """
+    Кількість непушнутих комітів з заголовка гілки і до `limit` з них.
+    git log запускається лише коли є що показати.
+    """
+    if branch.get('upstream'):
+        ahead = branch['ahead']
+        if not ahead:
+            return 0, []
+        code, output = run_git(['log', f'-{limit}', '--oneline', '@{u}..HEAD'])
+        return ahead, output.strip().split('\n') if code == 0 and output.strip() else []
+    # Без upstream - порівняти з origin/main, як раніше
+    code, output = run_git(['log', 'origin/main..HEAD', '--oneline'], merge_stderr=False)
+    commits = output.strip().split('\n') if code == 0 and output.strip() else []
+    return len(commits), commits[:limit]
 
 
 def main():
@@ -303,31 +415,29 @@ def main():
     print(f"📁 Project: {PROJECT_ROOT}")
     print(f"🕐 {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Перевірити чи це git репозиторій
-    code, _ = run_git(['rev-parse', '--git-dir'])
+    # Отримати статус (заодно перевірка, що це git репозиторій)
+    code, changes, branch = get_status()
     if code != 0:
         print("\n❌ Це не git репозиторій!")
         return 1
     
-    # Отримати статус
-    changes = get_status()
-    diff_stats = get_diff_stats()
-    
-    has_changes = print_status(changes, diff_stats)
+    has_changes = print_status(changes)
     
     # Перевірити непушнуті коміти
-    unpushed = get_unpushed_commits()
-    if unpushed:
-        print(f"\n📤 Непушнуті коміти ({len(unpushed)}):")
-        for c in unpushed[:5]:
+    ahead, unpushed = get_unpushed_commits(branch)
+    if ahead:
+        print(f"\n📤 Непушнуті коміти ({ahead}):")
+        for c in unpushed:
             print(f"   • {c}")
-        if len(unpushed) > 5:
-            print(f"   ... і ще {len(unpushed)-5}")
+        if ahead > len(unpushed):
+            print(f"   ... і ще {ahead-len(unpushed)}")
+    if branch.get('behind'):
+        print(f"\n📥 Відстає від {branch['upstream']} на {branch['behind']} комітів")
     
     if status_only:
         return 0
     
-    if not has_changes and not unpushed:
+    if not has_changes and not ahead:
         print("\n✨ Все синхронізовано з remote!")
         return 0
     
@@ -359,7 +469,7 @@ def main():
     if do_push or auto_mode:
         if not push():
             return 1
-    elif unpushed or has_changes:
+    elif ahead or has_changes:
         if not auto_mode:
             response = input("\n⬆️ Зробити push? [Y/n]: ").strip().lower()
             if response != 'n':